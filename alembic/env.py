@@ -1,18 +1,11 @@
 from __future__ import with_statement
 from logging.config import fileConfig
 
-from sqlalchemy import engine_from_config, create_engine
-from sqlalchemy import pool
-
 from alembic import context
 import sys
 from pathlib import Path
 
 
-from alembic import context
-from sqlalchemy import create_engine
-
-
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -28,6 +21,10 @@ if config.config_file_name is not None:
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
 # target_metadata = None
+# URL и metadata — те же, что у приложения (core.config.DATABASE_URL, db.base.metadata)
+from core.config import DATABASE_URL
+from db.base import metadata, sync_url, create_sync_engine
+import models.user, models.jobs, models.job_stats, models.email_outbox  # noqa: F401  регистрируют таблицы
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
@@ -47,9 +44,9 @@ def run_migrations_offline() -> None:
     script output.
 
     """
-    url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url,
+        url=sync_url(DATABASE_URL),
+        target_metadata=metadata,
 
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
@@ -66,16 +63,7 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
-    from starlette.config import Config
-    config = Config(".env_dev")
-    DATABASE_URL = config("DATABASE_URL", default="sqlite:///./employment_exchange.db")
-
-    # Заменяем aiosqlite+sqlite:// → на sqlite://
-    sync_url = DATABASE_URL.replace("aiosqlite+", "")
-
-    from db.base import metadata  # ← импортируем metadata
-
-    connectable = create_engine(sync_url)
+    connectable = create_sync_engine(DATABASE_URL)
 
     with connectable.connect() as connection:
         context.configure(
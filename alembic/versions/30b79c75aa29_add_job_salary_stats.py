@@ -0,0 +1,39 @@
+"""add job salary stats
+
+Revision ID: 30b79c75aa29
+Revises: fcd8abcfd3eb
+Create Date: 2026-10-18 14:37:52.981046
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '30b79c75aa29'
+down_revision: Union[str, Sequence[str], None] = 'fcd8abcfd3eb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'job_salary_stats',
+        sa.Column('dimension', sa.String(), nullable=False),
+        sa.Column('dimension_value', sa.String(), nullable=False),
+        sa.Column('period', sa.Date(), nullable=False),
+        sa.Column('field', sa.String(), nullable=False),
+        sa.Column('bucket', sa.Integer(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('dimension', 'dimension_value', 'period', 'field', 'bucket'),
+        if_not_exists=True,
+    )
+    # Сводку по уже существующим вакансиям заполняет: python -m commands.rebuild_job_stats
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('job_salary_stats')
@@ -0,0 +1,28 @@
+"""add users (created_at, id) index
+
+Revision ID: 5b8e21d7c4a9
+Revises: 30b79c75aa29
+Create Date: 2026-10-18 15:41:07.502113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e21d7c4a9'
+down_revision: Union[str, Sequence[str], None] = '30b79c75aa29'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_created_at_id', table_name='users')
@@ -1,7 +1,7 @@
 """add experience column to jobs
 
 Revision ID: 9d2936f5605d
-Revises: 
+Revises: 0a1f5e2c9b37
 Create Date: 2026-01-03 12:32:12.234198
 
 """
@@ -13,14 +13,16 @@ import sqlalchemy as sa
 
 # revision identifiers, used by Alembic.
 revision: str = '9d2936f5605d'
-down_revision: Union[str, Sequence[str], None] = None
+down_revision: Union[str, Sequence[str], None] = '0a1f5e2c9b37'
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
     """Upgrade schema."""
-    op.add_column('jobs', sa.Column('experience', sa.Integer(), nullable=True))
+    # В БД, созданной create_all по текущим моделям, колонка уже есть
+    if 'experience' not in {column['name'] for column in sa.inspect(op.get_bind()).get_columns('jobs')}:
+        op.add_column('jobs', sa.Column('experience', sa.Integer(), nullable=True))
 
 
 def downgrade() -> None:
@@ -22,7 +22,9 @@ def upgrade() -> None:
     """Upgrade schema."""
     # ### commands auto generated by Alembic - please adjust! ###
 
-    op.add_column('users', sa.Column('is_verified', sa.Boolean(), nullable=False, server_default='0'))
+    # Модель users содержала is_verified ещё до миграций: в БД от старого create_all колонка уже есть
+    if 'is_verified' not in {column['name'] for column in sa.inspect(op.get_bind()).get_columns('users')}:
+        op.add_column('users', sa.Column('is_verified', sa.Boolean(), nullable=False, server_default='0'))
 
 
 
@@ -0,0 +1,65 @@
+"""add jobs full-text index
+
+Revision ID: c1185db5dfbe
+Revises: fbdfdf83c39f
+Create Date: 2026-10-18 11:04:27.530917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c1185db5dfbe'
+down_revision: Union[str, Sequence[str], None] = 'fbdfdf83c39f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+JOBS_TSVECTOR = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5("
+            "title, description, content='jobs', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS jobs_fts_ai AFTER INSERT ON jobs BEGIN "
+            "INSERT INTO jobs_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS jobs_fts_ad AFTER DELETE ON jobs BEGIN "
+            "INSERT INTO jobs_fts(jobs_fts, rowid, title, description) "
+            "VALUES ('delete', old.id, old.title, old.description); END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS jobs_fts_au AFTER UPDATE OF title, description ON jobs BEGIN "
+            "INSERT INTO jobs_fts(jobs_fts, rowid, title, description) "
+            "VALUES ('delete', old.id, old.title, old.description); "
+            "INSERT INTO jobs_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END"
+        )
+        # Индексируем уже существующие вакансии
+        op.execute("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')")
+    elif dialect == 'postgresql':
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_jobs_fts ON jobs USING GIN (({JOBS_TSVECTOR}))")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS jobs_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS jobs_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS jobs_fts_ai")
+        op.execute("DROP TABLE IF EXISTS jobs_fts")
+    elif dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_jobs_fts")
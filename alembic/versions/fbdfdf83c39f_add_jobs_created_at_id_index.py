@@ -0,0 +1,28 @@
+"""add jobs (created_at, id) index
+
+Revision ID: fbdfdf83c39f
+Revises: 9eca03f167bd
+Create Date: 2026-10-18 10:12:40.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fbdfdf83c39f'
+down_revision: Union[str, Sequence[str], None] = '9eca03f167bd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_jobs_created_at_id', 'jobs', ['created_at', 'id'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_jobs_created_at_id', table_name='jobs')
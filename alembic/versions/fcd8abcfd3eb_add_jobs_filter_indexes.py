@@ -0,0 +1,32 @@
+"""add jobs filter indexes
+
+Revision ID: fcd8abcfd3eb
+Revises: c1185db5dfbe
+Create Date: 2026-10-18 12:21:05.604271
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fcd8abcfd3eb'
+down_revision: Union[str, Sequence[str], None] = 'c1185db5dfbe'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_jobs_user_id_created_at_id', 'jobs', ['user_id', 'created_at', 'id'], unique=False, if_not_exists=True)
+    op.create_index('ix_jobs_is_active_created_at_id', 'jobs', ['is_active', 'created_at', 'id'], unique=False, if_not_exists=True)
+    op.create_index('ix_jobs_is_active_salary_to', 'jobs', ['is_active', 'salary_to'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_jobs_is_active_salary_to', table_name='jobs')
+    op.drop_index('ix_jobs_is_active_created_at_id', table_name='jobs')
+    op.drop_index('ix_jobs_user_id_created_at_id', table_name='jobs')
@@ -1,22 +1,36 @@
 from datetime import datetime, timedelta, timezone
 from typing import Optional
-from jose import jwt, JWTError
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel
-from schemas import User
+from schemas import CurrentUser
 from starlette.config import Config
+from core.config import (
+    PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE, ARGON2_TIME_COST, ARGON2_MEMORY_COST, ARGON2_PARALLELISM,
+    TOKEN_CACHE_MAXSIZE, TOKEN_CACHE_MAX_TTL_SECONDS,
+)
+from utils.hashing import PasswordHasher
+from utils.token_cache import TokenCache
 import jwt
+from jwt import PyJWTError
 
 
 config = Config(".env_dev")
 SECRET_KEY = config("SECRET_KEY", default="your-super-secret-test-key-change-in-prod")
 ALGORITHM = config("ALGORITHM", default="HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(config("ACCESS_TOKEN_EXPIRE_MINUTES", cast=int, default="30"))
+# Срок токена, если create_access_token вызван без expires_delta
+DEFAULT_ACCESS_TOKEN_EXPIRE = timedelta(minutes=15)
 
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__time_cost=ARGON2_TIME_COST,
+    argon2__memory_cost=ARGON2_MEMORY_COST,
+    argon2__parallelism=ARGON2_PARALLELISM,
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
 
@@ -28,10 +42,28 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    # Хеш создан с параметрами, отличными от текущих ARGON2_*
+    return pwd_context.needs_update(hashed_password)
+
+
+# Argon2 намеренно медленный: в обработчиках запросов хешируем только через пул, не блокируя event loop
+password_hasher = PasswordHasher(pwd_context, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.verify(plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hasher.hash(password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=15))
-    to_encode.update({"exp": expire})
+    now = datetime.now(timezone.utc)
+    # iat нужен для отзыва всех токенов пользователя, выданных до заданного момента
+    to_encode.update({"exp": now + (expires_delta or DEFAULT_ACCESS_TOKEN_EXPIRE), "iat": now})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
@@ -48,7 +80,7 @@ def verify_verification_token(token: str) -> str:
         if email is None:
             raise ValueError("Invalid token")
         return email
-    except JWTError:
+    except PyJWTError:
         raise ValueError("Invalid or expired token")
 
 
@@ -56,7 +88,19 @@ class TokenData(BaseModel):
     email: str = None
 
 
-def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
+# Проверенные токены: повторные запросы с тем же токеном не проверяют подпись и не собирают модель
+# Отзыв пользователя помнится, пока живут выданные до него токены
+token_cache = TokenCache(
+    TOKEN_CACHE_MAXSIZE, TOKEN_CACHE_MAX_TTL_SECONDS,
+    token_lifetime=max(timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES), DEFAULT_ACCESS_TOKEN_EXPIRE).total_seconds(),
+)
+
+
+def get_current_user(token: str = Depends(oauth2_scheme)) -> CurrentUser:
+    user = token_cache.get(token)
+    if user is not None:
+        return user
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -64,40 +108,26 @@ def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     )
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-        return User(
-            id=int(user_id),
+        user = CurrentUser(
+            id=int(payload["sub"]),
             email=payload.get("email"),
             name=payload.get("name"),
-            is_company=payload.get("is_company"),
-            created_at=payload.get("created_at"),
-            updated_at=payload.get("updated_at")
+            is_company=bool(payload.get("is_company")),
         )
-    except JWTError:
+    except (PyJWTError, KeyError, ValueError):
         raise credentials_exception
 
-
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
-    to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=15))
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    if token_cache.is_revoked(token, user.id, payload.get("iat")):
+        raise credentials_exception
+    token_cache.set(token, user.id, user, payload.get("exp", 0))
+    return user
 
 
-def create_verification_token(email: str):
-    expire = datetime.now(timezone.utc) + timedelta(hours=24)
-    to_encode = {"sub": email, "exp": expire}
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+def revoke_access_token(token: str) -> None:
+    # Подпись уже проверена get_current_user, exp нужен лишь чтобы знать, сколько помнить отзыв
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options={"verify_exp": False})
+    token_cache.revoke_token(token, payload.get("exp", 0))
 
 
-def verify_verification_token(token: str) -> str:
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise ValueError("Invalid token")
-        return email
-    except JWTError:
-        raise ValueError("Invalid or expired token")
\ No newline at end of file
+def revoke_user_tokens(user_id: int) -> None:
+    token_cache.revoke_user(user_id)
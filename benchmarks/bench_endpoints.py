@@ -0,0 +1,247 @@
+"""
+Пропускная способность и задержки основных эндпоинтов на больших наборах данных.
+
+    python -m benchmarks.bench_endpoints [--sizes 1k,100k,1m] [--requests 500] [--concurrency 16]
+                                         [--output benchmarks/results/latest.json]
+                                         [--baseline benchmarks/baseline.json] [--save-baseline] [--tolerance 0.25]
+
+Приложение (main.app) вызывается в процессе через httpx и ASGITransport — так же, как в tests/conftest.py,
+без сети и uvicorn. Для каждого размера создаётся временная SQLite-база с size пользователей и size вакансий
+(у всех пользователей один заранее посчитанный хеш пароля) и подключается через db.base.build_database —
+с тем же пулом и PRAGMA-профилем, что в проде.
+
+Сценарии: GET /jobs/, GET /jobs/{id}, POST /jobs/, POST /login, GET /users/. Для каждого печатаются
+запросы в секунду и p50/p95/p99. Результаты сохраняются в JSON (--output) и сравниваются с базовыми (--baseline):
+регрессия — p95 выросла или пропускная способность упала больше чем на tolerance. При регрессиях код выхода 1.
+--save-baseline записывает текущий прогон как новую базу.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from httpx import AsyncClient, ASGITransport
+from main import app
+from auth import create_access_token, get_password_hash, token_cache
+from db.base import build_database, create_sync_engine, metadata
+from dependencies import get_database, job_cache, user_cache
+from models.jobs import jobs
+from models.user import users
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, "results", "latest.json")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+PASSWORD = "benchmark-password"
+SEED_BATCH = 10_000
+# Вход упирается в Argon2 — для него запросов в 10 раз меньше, иначе прогон растягивается на минуты
+LOGIN_REQUESTS_DIVISOR = 10
+
+
+def user_row(i: int, hashed_password: str, now: datetime) -> dict:
+    created = now - timedelta(seconds=i)
+    return {
+        "id": i, "email": f"user{i}@example.com", "name": f"User {i}", "hashed_password": hashed_password,
+        "is_company": i % 10 == 1, "is_verified": True, "created_at": created, "updated_at": created,
+    }
+
+
+def job_row(i: int, users_count: int, now: datetime) -> dict:
+    created = now - timedelta(seconds=i)
+    salary_from = 50_000 + (i * 7919) % 200_000
+    return {
+        "id": i, "user_id": (i % users_count) + 1, "title": f"Python developer {i}",
+        "description": "Backend services with FastAPI and SQLAlchemy", "salary_from": salary_from,
+        "salary_to": salary_from + 50_000, "is_active": i % 5 != 0, "created_at": created, "updated_at": created,
+    }
+
+
+def seed(path: str, size: int) -> None:
+    engine = create_sync_engine(f"sqlite:///{path}")
+    metadata.create_all(engine)
+    # Argon2 — один раз на весь набор
+    hashed_password = get_password_hash(PASSWORD)
+    now = datetime.now(timezone.utc)
+    with engine.begin() as connection:
+        for start in range(1, size + 1, SEED_BATCH):
+            stop = min(start + SEED_BATCH, size + 1)
+            connection.execute(users.insert(), [user_row(i, hashed_password, now) for i in range(start, stop)])
+        for start in range(1, size + 1, SEED_BATCH):
+            stop = min(start + SEED_BATCH, size + 1)
+            connection.execute(jobs.insert(), [job_row(i, size, now) for i in range(start, stop)])
+    engine.dispose()
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    # values отсортированы; ближайший ранг
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def scenarios(size: int, token: str) -> dict:
+    headers = {"Authorization": f"Bearer {token}"}
+    job = {"user_id": 1, "title": "Benchmark job", "description": "Benchmark", "salary_from": 1, "salary_to": 2}
+
+    def login(client: AsyncClient):
+        user_id = random.randint(1, size)
+        return client.post("/login", data={"username": f"user{user_id}@example.com", "password": PASSWORD})
+
+    return {
+        "GET /jobs/": (1, lambda client: client.get("/jobs/", params={"limit": 20})),
+        "GET /jobs/{id}": (1, lambda client: client.get(f"/jobs/{random.randint(1, size)}")),
+        "POST /jobs/": (1, lambda client: client.post("/jobs/", json=job, headers=headers)),
+        "POST /login": (LOGIN_REQUESTS_DIVISOR, login),
+        "GET /users/": (1, lambda client: client.get("/users/", params={"limit": 50})),
+    }
+
+
+async def measure(client: AsyncClient, make_request, requests: int, concurrency: int) -> dict:
+    # Прогрев: компиляция запросов SQLAlchemy, схемы pydantic, соединения пула
+    for _ in range(min(requests, concurrency)):
+        await make_request(client)
+    job_cache.clear()
+    user_cache.clear()
+
+    latencies, errors = [], 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            response = await make_request(client)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+async def run_size(path: str, size: int, requests: int, concurrency: int) -> dict:
+    database = build_database(f"sqlite+aiosqlite:///{path}")
+    await database.connect()
+    app.dependency_overrides[get_database] = lambda: database
+    token = create_access_token(data={"sub": "1", "email": "user1@example.com", "name": "User 1", "is_company": True})
+    results = {}
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+            for name, (divisor, make_request) in scenarios(size, token).items():
+                job_cache.clear()
+                user_cache.clear()
+                token_cache.clear()
+                results[name] = await measure(client, make_request, max(1, requests // divisor), concurrency)
+    finally:
+        app.dependency_overrides.pop(get_database, None)
+        await database.disconnect()
+    return results
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for size, scenarios_results in current["results"].items():
+        for name, result in scenarios_results.items():
+            base = baseline.get("results", {}).get(size, {}).get(name)
+            if base is None:
+                continue
+            p95_change = result["p95_ms"] / base["p95_ms"] - 1 if base["p95_ms"] else 0.0
+            rps_change = result["rps"] / base["rps"] - 1 if base["rps"] else 0.0
+            mark = ""
+            if p95_change > tolerance or rps_change < -tolerance:
+                mark = "  РЕГРЕССИЯ"
+                regressions.append(f"{size} {name}")
+            print(f"{size:>5} {name:<15} p95 {base['p95_ms']:8.1f} -> {result['p95_ms']:8.1f} мс ({p95_change:+.0%})"
+                  f"  rps {base['rps']:8.1f} -> {result['rps']:8.1f} ({rps_change:+.0%}){mark}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Нагрузочный прогон эндпоинтов на больших наборах данных")
+    parser.add_argument("--sizes", default=",".join(SIZES), help=f"Размеры наборов через запятую: {', '.join(SIZES)}")
+    parser.add_argument("--requests", type=int, default=500, help="Запросов на сценарий (для /login — в 10 раз меньше)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Одновременных клиентов")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Куда сохранить результаты (JSON)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Базовые результаты для сравнения")
+    parser.add_argument("--save-baseline", action="store_true", help="Сохранить прогон как новую базу")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Допустимое ухудшение p95 и rps, доля")
+    args = parser.parse_args()
+
+    sizes = [size.strip().lower() for size in args.sizes.split(",") if size.strip()]
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        parser.error(f"Неизвестные размеры: {', '.join(unknown)}")
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "results": {},
+    }
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bench.db")
+            started = time.perf_counter()
+            seed(path, SIZES[size])
+            print(f"{size}: {SIZES[size]} пользователей и вакансий за {time.perf_counter() - started:.1f} с")
+            report["results"][size] = asyncio.run(run_size(path, SIZES[size], args.requests, args.concurrency))
+        for name, result in report["results"][size].items():
+            print(f"{size:>5} {name:<15} {result['rps']:8.1f} req/s  p50 {result['p50_ms']:7.1f}  "
+                  f"p95 {result['p95_ms']:7.1f}  p99 {result['p99_ms']:7.1f} мс  ошибок {result['errors']}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2, ensure_ascii=False)
+    print(f"Результаты: {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+        print(f"База обновлена: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"Базы {args.baseline} нет — сравнение пропущено (--save-baseline, чтобы создать)")
+        return
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    print(f"Сравнение с базой {baseline['meta'].get('revision') or '?'} ({baseline['meta'].get('created_at')}):")
+    regressions = compare(report, baseline, args.tolerance)
+    if regressions:
+        print(f"Регрессии: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Накладные расходы метрик на один HTTP-запрос и один запрос к БД.
+
+    python -m benchmarks.bench_metrics [--iterations 200000]
+
+http — одно и то же пустое ASGI-приложение (маршрутизатор уже положил route в scope и отправил ответ)
+вызывается напрямую и через MetricsMiddleware; разница на запрос — цена метрик HTTP.
+db — InstrumentedDatabase.fetch_all с заглушкой вместо драйвера, без гистограммы и с db_query_duration;
+разница — цена определения метода репозитория и записи в гистограмму.
+Лучшее из пяти прогонов, чтобы не мерить шум планировщика.
+"""
+import argparse
+import asyncio
+import time
+from db.instrumentation import InstrumentedDatabase
+from utils.metrics import Histogram, MetricsMiddleware
+
+REPEAT = 5
+
+
+class _Route:
+    path = "/jobs/{job_id}"
+
+
+async def bare_app(scope, receive, send):
+    scope["route"] = _Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def send(message):
+    pass
+
+
+async def time_http(app, iterations: int) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            await app({"type": "http", "method": "GET", "path": "/jobs/1"}, receive, send)
+        best = min(best, time.perf_counter() - started)
+    return best / iterations
+
+
+async def driver(query, values=None):
+    return []
+
+
+class StubDatabase(InstrumentedDatabase):
+    # Те же кадры, что у настоящего fetch_all, только без соединения
+    async def fetch_all(self, query, values=None):
+        return await self._timed(driver, query, values)
+
+
+class BenchRepository:
+    def __init__(self, database: InstrumentedDatabase):
+        self.database = database
+
+    async def get_jobs_page(self):
+        return await self.database.fetch_all("SELECT 1")
+
+
+async def time_db(database: InstrumentedDatabase, iterations: int) -> float:
+    repository = BenchRepository(database)
+    best = float("inf")
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            await repository.get_jobs_page()
+        best = min(best, time.perf_counter() - started)
+    return best / iterations
+
+
+async def main(iterations: int) -> None:
+    bare = await time_http(bare_app, iterations)
+    wrapped = await time_http(MetricsMiddleware(bare_app), iterations)
+    print(f"http: без метрик {bare * 1e6:6.2f} мкс, с метриками {wrapped * 1e6:6.2f} мкс, "
+          f"накладные {(wrapped - bare) * 1e6:5.2f} мкс на запрос")
+
+    url = "sqlite+aiosqlite:///:memory:"
+    plain = await time_db(StubDatabase(url), iterations)
+    histogram = Histogram("bench_db_query_duration_seconds", "Benchmark", ("method",))
+    measured = await time_db(StubDatabase(url, query_metrics=histogram), iterations)
+    print(f"db:   без метрик {plain * 1e6:6.2f} мкс, с метриками {measured * 1e6:6.2f} мкс, "
+          f"накладные {(measured - plain) * 1e6:5.2f} мкс на запрос к БД")
+    assert histogram.count("BenchRepository.get_jobs_page") == iterations * REPEAT
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Накладные расходы метрик Prometheus")
+    parser.add_argument("--iterations", type=int, default=200_000, help="Вызовов в одном прогоне")
+    asyncio.run(main(parser.parse_args().iterations))
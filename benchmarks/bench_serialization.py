@@ -0,0 +1,81 @@
+"""
+Сравнение путей сериализации списка на 10 000 строк.
+
+    python -m benchmarks.bench_serialization
+
+baseline — как было: Job(**row) на строку, затем FastAPI валидирует ответ по response_model,
+превращает модели в dict и кодирует их json.dumps (JSONResponse).
+fast — все строки валидируются одним вызовом закэшированного TypeAdapter и сразу кодируются в JSON-байты.
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from schemas import Job
+from utils.serialization import FastJSONResponse, get_adapter, model_response
+
+ROWS = 10_000
+REPEAT = 5
+
+
+def make_rows(count: int) -> list[dict]:
+    now = datetime(2026, 1, 1)
+    return [
+        {
+            "id": i,
+            "user_id": i % 500 + 1,
+            "title": f"Python разработчик {i}",
+            "description": "Пишем сервисы на FastAPI и SQLAlchemy. " * 5,
+            "salary_from": 100000 + i,
+            "salary_to": 150000 + i,
+            "is_active": i % 3 != 0,
+            "created_at": now - timedelta(minutes=i),
+            "updated_at": now - timedelta(minutes=i),
+        }
+        for i in range(count)
+    ]
+
+
+async def baseline(rows: list[dict], field) -> bytes:
+    jobs = [Job(**row) for row in rows]
+    content = await serialize_response(field=field, response_content=jobs)
+    return JSONResponse(content).body
+
+
+async def fast(rows: list[dict]) -> bytes:
+    jobs = get_adapter(list[Job]).validate_python(rows)
+    return model_response(list[Job], jobs).body
+
+
+async def default_class(rows: list[dict], field) -> bytes:
+    # Остальные маршруты: та же валидация FastAPI, но кодирование через FastJSONResponse
+    jobs = [Job(**row) for row in rows]
+    content = await serialize_response(field=field, response_content=jobs)
+    return FastJSONResponse(content).body
+
+
+async def measure(name: str, make_coro) -> float:
+    await make_coro()  # прогрев: схемы TypeAdapter и кэши pydantic
+    best = float("inf")
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        await make_coro()
+        best = min(best, time.perf_counter() - started)
+    print(f"{name:<14} {best * 1000:8.1f} ms")
+    return best
+
+
+async def main():
+    rows = make_rows(ROWS)
+    field = create_model_field(name="Response_read_jobs", type_=list[Job], mode="serialization")
+    print(f"{ROWS} строк, лучшее из {REPEAT}")
+    slow = await measure("baseline", lambda: baseline(rows, field))
+    medium = await measure("default_class", lambda: default_class(rows, field))
+    quick = await measure("fast", lambda: fast(rows))
+    print(f"fast быстрее baseline в {slow / quick:.1f}x, default_class — в {slow / medium:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,120 @@
+"""
+Пропускная способность SQLite при смешанной нагрузке чтения и записи.
+
+    python -m benchmarks.bench_sqlite_concurrency [--workers 16] [--seconds 5] [--write-ratio 0.2]
+
+Каждый воркер в цикле читает первую страницу /jobs/ (JobRepository.get_jobs_page) или создаёт вакансию
+(JobRepository.create_job — транзакция с обновлением сводки зарплат). База — временный файл, заполненный заранее.
+
+Варианты:
+  databases        — как было: databases.Database, новое соединение на каждый запрос, отложенный BEGIN;
+  пул, rollback    — db.base: соединения переиспользуются, BEGIN IMMEDIATE, журнал отката;
+  пул, WAL-профиль — то же плюс PRAGMA из db.sqlite (WAL, synchronous=NORMAL, mmap, cache, busy_timeout).
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timezone
+from databases import Database
+from sqlalchemy import create_engine
+from db.base import metadata
+from db.instrumentation import InstrumentedDatabase
+from db.sqlite import apply_sqlite_profile
+from models.jobs import jobs
+from models.user import users
+from repositories.job_repository import JobRepository
+from schemas import JobCreate
+
+SEED_JOBS = 2000
+
+
+def prepare(path: str) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    metadata.create_all(engine)
+    now = datetime.now(timezone.utc)
+    with engine.begin() as connection:
+        connection.execute(users.insert().values(
+            id=1, email="bench@example.com", name="Bench", hashed_password="x",
+            is_company=True, is_verified=True, created_at=now, updated_at=now,
+        ))
+        connection.execute(jobs.insert(), [
+            {"user_id": 1, "title": f"Python developer {i}", "description": "Benchmark", "salary_from": 100000,
+             "salary_to": 150000, "is_active": True, "created_at": now, "updated_at": now}
+            for i in range(SEED_JOBS)
+        ])
+    engine.dispose()
+
+
+def build(variant: str, path: str, workers: int) -> Database:
+    url = f"sqlite+aiosqlite:///{path}"
+    if variant == "databases":
+        return Database(url)
+    on_connect = apply_sqlite_profile if variant == "пул, WAL-профиль" else None
+    return InstrumentedDatabase(url, pool_max_size=workers, on_connect=on_connect)
+
+
+async def run(variant: str, path: str, workers: int, seconds: float, write_ratio: float) -> dict:
+    database = build(variant, path, workers)
+    await database.connect()
+    repository = JobRepository(database)
+    job = JobCreate(user_id=1, title="Benchmark job", description="Benchmark", salary_from=1, salary_to=2)
+    latencies = {"read": [], "write": []}
+    errors = 0
+    deadline = time.perf_counter() + seconds
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            kind = "write" if random.random() < write_ratio else "read"
+            started = time.perf_counter()
+            try:
+                if kind == "write":
+                    await repository.create_job(job)
+                else:
+                    await repository.get_jobs_page(20)
+            except Exception:
+                errors += 1
+                continue
+            latencies[kind].append(time.perf_counter() - started)
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(workers)))
+    finally:
+        await database.disconnect()
+
+    result = {"errors": errors}
+    for kind, values in latencies.items():
+        values.sort()
+        result[kind] = {
+            "ops": len(values) / seconds,
+            "p50_ms": statistics.median(values) * 1000 if values else 0.0,
+            "p99_ms": values[int(len(values) * 0.99)] * 1000 if values else 0.0,
+        }
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Смешанная нагрузка на SQLite: databases по умолчанию против профиля")
+    parser.add_argument("--workers", type=int, default=16, help="Одновременных клиентов")
+    parser.add_argument("--seconds", type=float, default=5, help="Длительность каждого прогона")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="Доля записей")
+    args = parser.parse_args()
+
+    for variant in ("databases", "пул, rollback", "пул, WAL-профиль"):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bench.db")
+            prepare(path)
+            result = asyncio.run(run(variant, path, args.workers, args.seconds, args.write_ratio))
+        # Ошибки — "database is locked": отложенный BEGIN не ждёт блокировку записи
+        print(f"{variant:>17}: ошибок {result['errors']}")
+        for kind in ("read", "write"):
+            stats = result[kind]
+            print(f"{'':>17}  {kind:<5} {stats['ops']:8.1f} оп/с  p50 {stats['p50_ms']:7.1f} мс  p99 {stats['p99_ms']:7.1f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Подбирает параметры Argon2 под текущее железо так, чтобы проверка пароля занимала около target-ms.
+
+    python -m commands.calibrate_argon2 [--target-ms 250] [--memory-kib 65536] [--parallelism 4] [--write .env_dev]
+
+Запускать на той же машине (или том же типе инстанса), где работает API. Сначала увеличивается
+time_cost при заданном объёме памяти; если уже time_cost=1 слишком медленный — память уменьшается вдвое.
+Результат печатается строками ARGON2_*=..., с --write они дописываются/обновляются в env-файле.
+Старые хеши пересчитываются с новыми параметрами при следующем входе пользователя.
+"""
+import argparse
+import os
+import statistics
+import time
+from passlib.context import CryptContext
+
+# Нижняя граница памяти: меньше 8 МиБ Argon2 теряет смысл против перебора на GPU
+MIN_MEMORY_KIB = 8192
+MAX_TIME_COST = 20
+
+
+def measure_ms(time_cost: int, memory_kib: int, parallelism: int, samples: int) -> float:
+    context = CryptContext(
+        schemes=["argon2"],
+        argon2__time_cost=time_cost,
+        argon2__memory_cost=memory_kib,
+        argon2__parallelism=parallelism,
+    )
+    hashed = context.hash("calibration-password")
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        context.verify("calibration-password", hashed)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(target_ms: float, memory_kib: int, parallelism: int, samples: int) -> tuple[int, int, float]:
+    while True:
+        elapsed = measure_ms(1, memory_kib, parallelism, samples)
+        if elapsed <= target_ms or memory_kib // 2 < MIN_MEMORY_KIB:
+            break
+        memory_kib //= 2
+
+    time_cost = 1
+    while time_cost < MAX_TIME_COST:
+        candidate = measure_ms(time_cost + 1, memory_kib, parallelism, samples)
+        if candidate > target_ms:
+            break
+        time_cost, elapsed = time_cost + 1, candidate
+    return time_cost, memory_kib, elapsed
+
+
+def write_env(path: str, values: dict[str, int]) -> None:
+    lines = []
+    if os.path.exists(path):
+        with open(path) as env_file:
+            lines = [line for line in env_file.read().splitlines() if line.split("=", 1)[0].strip() not in values]
+    lines += [f"{key}={value}" for key, value in values.items()]
+    with open(path, "w") as env_file:
+        env_file.write("\n".join(lines) + "\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Калибровка параметров Argon2")
+    parser.add_argument("--target-ms", type=float, default=250, help="Желаемое время проверки пароля, мс")
+    parser.add_argument("--memory-kib", type=int, default=65536, help="Начальный объём памяти, КиБ")
+    parser.add_argument("--parallelism", type=int, default=4, help="Число дорожек Argon2")
+    parser.add_argument("--samples", type=int, default=5, help="Замеров на каждую точку (берётся медиана)")
+    parser.add_argument("--write", metavar="ENV_FILE", help="Записать результат в env-файл")
+    args = parser.parse_args()
+
+    time_cost, memory_kib, elapsed = calibrate(args.target_ms, args.memory_kib, args.parallelism, args.samples)
+    values = {
+        "ARGON2_TIME_COST": time_cost,
+        "ARGON2_MEMORY_COST": memory_kib,
+        "ARGON2_PARALLELISM": args.parallelism,
+    }
+    print(f"# проверка пароля ~{elapsed:.0f} мс при цели {args.target_ms:.0f} мс")
+    for key, value in values.items():
+        print(f"{key}={value}")
+    if args.write:
+        write_env(args.write, values)
+        print(f"# записано в {args.write}")
+
+
+if __name__ == "__main__":
+    main()
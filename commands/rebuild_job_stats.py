@@ -0,0 +1,33 @@
+"""
+Пересобирает сводку зарплат (job_salary_stats) по текущему содержимому jobs.
+
+    python -m commands.rebuild_job_stats [--batch-size 1000]
+
+Нужна после миграции, добавившей сводку, и если данные в jobs менялись в обход JobRepository.
+"""
+import argparse
+import asyncio
+import time
+from db.base import database
+from repositories.job_repository import JobRepository
+
+
+async def rebuild(batch_size: int) -> None:
+    await database.connect()
+    try:
+        started = time.perf_counter()
+        processed = await JobRepository(database).rebuild_stats(batch_size)
+        print(f"Сводка пересобрана: {processed} активных вакансий за {time.perf_counter() - started:.1f} с")
+    finally:
+        await database.disconnect()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Пересборка сводки зарплат вакансий")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Сколько вакансий читать за один запрос")
+    args = parser.parse_args()
+    asyncio.run(rebuild(args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+Заполняет users и jobs синтетическими данными для нагрузочных прогонов и воспроизведения проблем на объёмах прода.
+
+    python -m commands.seed_data [--users 100000] [--jobs 1000000] [--seed 42] [--employer-share 0.1]
+                                 [--days 365] [--until 2026-01-01] [--batch-size 20000] [--password seed-password] [--drop-indexes] [--skip-stats]
+
+Данные детерминированы: одни и те же --seed и --until на пустой БД дают те же строки (кроме соли хеша пароля). Работодатели владеют
+вакансиями неравномерно (распределение Ципфа: у крупных — тысячи, у большинства — единицы), зарплаты
+логнормальные, названия и описания — на русском и английском. Новые строки получают id после уже
+существующих, так что команду можно запускать повторно; в Postgres после загрузки последовательности id
+сдвигаются за max(id).
+
+Вставка — executemany пачками по --batch-size, каждая пачка в своей транзакции, через синхронный движок
+(db.base.create_sync_engine) без ORM и без databases. С --drop-indexes индексы jobs и полнотекстовый индекс
+на время загрузки снимаются и строятся заново в конце — только если jobs пуста, живую БД команда не трогает.
+У всех пользователей один хеш пароля, посчитанный заранее: Argon2 на каждую строку занял бы часы. Email всех пользователей подтверждён.
+После вставки собирается статистика планировщика (ANALYZE), и сводка зарплат пересобирается (commands.rebuild_job_stats), если не указан --skip-stats.
+"""
+import argparse
+import asyncio
+import itertools
+import math
+import random
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event, func, select
+from auth import get_password_hash
+from commands.rebuild_job_stats import rebuild
+from db.base import create_sync_engine
+from models.jobs import (
+    jobs, JOBS_FTS_TABLE, POSTGRES_FTS_DDL, POSTGRES_FTS_INDEX, SQLITE_FTS_DDL, SQLITE_FTS_TRIGGERS,
+)
+from models.user import users
+
+FIRST_NAMES = [
+    "Александр", "Мария", "Дмитрий", "Анна", "Сергей", "Елена", "Иван", "Ольга", "Никита", "Татьяна",
+    "John", "Emily", "Michael", "Sarah", "David", "Laura", "James", "Anna", "Robert", "Olivia",
+]
+LAST_NAMES = [
+    "Иванов", "Смирнова", "Кузнецов", "Попова", "Соколов", "Лебедева", "Козлов", "Новикова", "Морозов", "Волкова",
+    "Smith", "Johnson", "Brown", "Taylor", "Miller", "Wilson", "Moore", "Clark", "Walker", "Young",
+]
+COMPANY_PREFIXES = ["ООО", "АО", "ПАО", "Group", "Labs", "Systems", "Tech", "Soft"]
+COMPANY_WORDS = [
+    "Вектор", "Альфа", "Север", "Горизонт", "Технопарк", "Стрела", "Orbit", "Nimbus", "Quantum", "Pixel",
+    "Atlas", "Vertex", "Нева", "Байкал", "Восток", "Spark", "Harbor", "Summit", "Кристалл", "Меридиан",
+]
+LEVELS = ["Junior", "Middle", "Senior", "Lead", "Стажёр", "Ведущий", "Старший", "Главный"]
+ROLES = [
+    "Python-разработчик", "Backend-разработчик", "Frontend-разработчик", "Аналитик данных", "DevOps-инженер",
+    "Тестировщик", "Менеджер проектов", "Дизайнер интерфейсов", "Бухгалтер", "Менеджер по продажам",
+    "Python developer", "Backend engineer", "Data scientist", "Site reliability engineer", "QA engineer",
+    "Product manager", "UX designer", "Mobile developer", "Support engineer", "Sales manager",
+]
+SENTENCES = [
+    "Разрабатываем высоконагруженные сервисы на FastAPI и PostgreSQL.",
+    "Гибкий график, возможна удалённая работа.",
+    "Официальное трудоустройство, ДМС с первого месяца.",
+    "Требуется опыт работы с SQL и системами контроля версий.",
+    "Команда из десяти человек, код-ревью и автотесты обязательны.",
+    "Обучение за счёт компании и конференции два раза в год.",
+    "Работа с клиентами и ведение отчётности в CRM.",
+    "Офис в пяти минутах от метро, бесплатные обеды.",
+    "We build high-load services with Python, FastAPI and PostgreSQL.",
+    "Flexible schedule and fully remote work are possible.",
+    "Experience with Docker, Kubernetes and CI/CD pipelines is a plus.",
+    "You will own features end to end, from design to production.",
+    "We value code review, automated tests and clear documentation.",
+    "Relocation package and visa support are available.",
+    "Strong communication skills and English at B2 level required.",
+    "Competitive salary, annual bonus and stock options.",
+]
+# Логнормальные зарплаты: медиана около 120 000, длинный хвост вверх
+SALARY_MEDIAN = 120_000
+SALARY_SIGMA = 0.6
+SALARY_STEP = 5_000
+# Показатель распределения Ципфа для числа вакансий у работодателя
+EMPLOYER_SKEW = 1.1
+# Доля активных вакансий и требуемый опыт в годах (None — не указан)
+ACTIVE_SHARE = 0.8
+EXPERIENCE_YEARS = (None, 0, 1, 1, 3, 3, 5, 6)
+# Описания собираются из SENTENCES заранее — столько разных вариантов
+DESCRIPTION_VARIANTS = 512
+
+
+def next_id(connection, table) -> int:
+    return (connection.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+
+
+def user_rows(rng: random.Random, first_id: int, count: int, employer_share: float, hashed_password: str,
+              now: datetime, days: int):
+    for user_id in range(first_id, first_id + count):
+        is_company = rng.random() < employer_share
+        if is_company:
+            name = f"{rng.choice(COMPANY_PREFIXES)} {rng.choice(COMPANY_WORDS)} {user_id}"
+        else:
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {user_id}"
+        created_at = now - timedelta(seconds=rng.randrange(days * 86400))
+        yield {
+            "id": user_id, "email": f"user{user_id}@example.com", "name": name, "hashed_password": hashed_password,
+            "is_company": is_company, "is_verified": True, "created_at": created_at, "updated_at": created_at,
+        }
+
+
+def job_rows(rng: random.Random, first_id: int, count: int, employers: list[int], now: datetime, days: int,
+             batch_size: int):
+    # Вес работодателя по рангу — 1 / rank^s; порядок рангов перемешан, чтобы крупные не шли подряд по id
+    ranked = employers[:]
+    rng.shuffle(ranked)
+    cum_weights = list(itertools.accumulate(1 / rank ** EMPLOYER_SKEW for rank in range(1, len(ranked) + 1)))
+    titles = [f"{level} {role}" for level in LEVELS for role in ROLES]
+    descriptions = [" ".join(rng.sample(SENTENCES, rng.randint(2, 4))) for _ in range(DESCRIPTION_VARIANTS)]
+    salary_mu = math.log(SALARY_MEDIAN)
+    period = days * 86400
+
+    for start in range(first_id, first_id + count, batch_size):
+        ids = range(start, min(start + batch_size, first_id + count))
+        # Владельцы выбираются одним вызовом на пачку: bisect по cum_weights на строку — основная цена генерации
+        owners = rng.choices(ranked, cum_weights=cum_weights, k=len(ids))
+        batch = []
+        for job_id, user_id in zip(ids, owners):
+            salary_from = max(SALARY_STEP, round(rng.lognormvariate(salary_mu, SALARY_SIGMA) / SALARY_STEP) * SALARY_STEP)
+            created_at = now - timedelta(seconds=rng.randrange(period))
+            batch.append({
+                "id": job_id,
+                "user_id": user_id,
+                "title": rng.choice(titles),
+                "description": rng.choice(descriptions),
+                "salary_from": salary_from,
+                "salary_to": round(salary_from * rng.uniform(1.1, 1.6) / SALARY_STEP) * SALARY_STEP,
+                "experience": rng.choice(EXPERIENCE_YEARS),
+                "is_active": rng.random() < ACTIVE_SHARE,
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+        yield batch
+
+
+def sequence_resets() -> list:
+    """
+    Строки вставлены с явными id, а serial-последовательности Postgres об этом не знают: без сдвига
+    следующая регистрация или POST /jobs/ получит id 1 и упадёт на первичном ключе.
+    На пустой таблице setval(..., 1, false) — следующий id будет 1.
+    """
+    return [
+        select(func.setval(
+            func.pg_get_serial_sequence(table.name, "id"),
+            func.coalesce(func.max(table.c.id), 1),
+            func.max(table.c.id).is_not(None),
+        ))
+        for table in (users, jobs)
+    ]
+
+
+def insert_batches(engine, table, batches) -> int:
+    inserted = 0
+    for batch in batches:
+        with engine.begin() as connection:
+            connection.execute(table.insert(), batch)
+        inserted += len(batch)
+    return inserted
+
+
+@contextmanager
+def jobs_indexes_dropped(engine):
+    """
+    Снимает индексы jobs и полнотекстовый индекс на время загрузки и строит их заново в конце: одна
+    сортировка на индекс вместо обновления шести B-деревьев и FTS-триггера на каждой строке.
+    Параллельные записи в jobs во время загрузки не попадут в полнотекстовый поиск.
+    """
+    dialect = engine.dialect.name
+    with engine.begin() as connection:
+        for index in jobs.indexes:
+            index.drop(connection, checkfirst=True)
+        if dialect == "sqlite":
+            for trigger in SQLITE_FTS_TRIGGERS:
+                connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+        elif dialect == "postgresql":
+            connection.exec_driver_sql(f"DROP INDEX IF EXISTS {POSTGRES_FTS_INDEX}")
+    try:
+        yield
+    finally:
+        started = time.perf_counter()
+        with engine.begin() as connection:
+            for index in jobs.indexes:
+                index.create(connection, checkfirst=True)
+            if dialect == "sqlite":
+                for statement in SQLITE_FTS_DDL:
+                    connection.exec_driver_sql(statement)
+                connection.exec_driver_sql(f"INSERT INTO {JOBS_FTS_TABLE}({JOBS_FTS_TABLE}) VALUES ('rebuild')")
+            elif dialect == "postgresql":
+                for statement in POSTGRES_FTS_DDL:
+                    connection.exec_driver_sql(statement)
+        print(f"Индексы jobs построены за {time.perf_counter() - started:.1f} с")
+
+
+def seed(args) -> None:
+    engine = create_sync_engine()
+    if engine.dialect.name == "sqlite":
+        # Загрузку можно повторить с нуля — durability на время вставки не нужна
+        @event.listens_for(engine, "connect")
+        def bulk_load_pragmas(connection, record):
+            connection.execute("PRAGMA synchronous=OFF")
+            connection.execute("PRAGMA cache_size=-262144")
+
+    rng = random.Random(args.seed)
+    now = args.until
+    hashed_password = get_password_hash(args.password)
+    try:
+        with engine.connect() as connection:
+            first_user_id = next_id(connection, users)
+            first_job_id = next_id(connection, jobs)
+
+        started = time.perf_counter()
+        rows = user_rows(rng, first_user_id, args.users, args.employer_share, hashed_password, now, args.days)
+        batches = iter(lambda: list(itertools.islice(rows, args.batch_size)), [])
+        inserted = insert_batches(engine, users, batches)
+        print(f"Пользователи: {inserted} за {time.perf_counter() - started:.1f} с")
+
+        with engine.connect() as connection:
+            employers = list(connection.execute(select(users.c.id).where(users.c.is_company)).scalars())
+        if args.jobs and not employers:
+            raise SystemExit("Нет работодателей: увеличьте --users или --employer-share")
+
+        started = time.perf_counter()
+        batches = job_rows(rng, first_job_id, args.jobs, employers, now, args.days, args.batch_size)
+        # Индексы снимаются только по явному флагу и только на пустой jobs: в живой БД записи,
+        # сделанные во время загрузки, пропали бы из полнотекстового поиска
+        drop_indexes = args.drop_indexes and first_job_id == 1
+        if args.drop_indexes and not drop_indexes:
+            print("jobs не пуста — индексы не снимаются")
+        with jobs_indexes_dropped(engine) if drop_indexes else nullcontext():
+            inserted = insert_batches(engine, jobs, batches)
+        print(f"Вакансии: {inserted} за {time.perf_counter() - started:.1f} с")
+
+        # Статистика планировщика после массовой загрузки. Без неё SQLite для keyset-обхода
+        # "is_active AND id > ? ORDER BY id" (пересборка сводки, выгрузка) выбирает индекс по is_active
+        # и сортирует всю таблицу на каждой пачке
+        with engine.begin() as connection:
+            if engine.dialect.name == "postgresql":
+                for query in sequence_resets():
+                    connection.execute(query)
+            connection.exec_driver_sql("ANALYZE")
+    finally:
+        engine.dispose()
+
+    if not args.skip_stats:
+        asyncio.run(rebuild(args.stats_batch_size))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Генерация синтетических пользователей и вакансий")
+    parser.add_argument("--users", type=int, default=100_000, help="Сколько пользователей добавить")
+    parser.add_argument("--jobs", type=int, default=1_000_000, help="Сколько вакансий добавить")
+    parser.add_argument("--seed", type=int, default=42, help="Зерно генератора")
+    parser.add_argument("--employer-share", type=float, default=0.1, help="Доля работодателей среди пользователей")
+    parser.add_argument("--days", type=int, default=365, help="За сколько дней до --until распределить created_at")
+    parser.add_argument("--until", type=lambda value: datetime.fromisoformat(value).replace(tzinfo=timezone.utc),
+                        default=datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0),
+                        help="Самая поздняя дата создания (ISO, по умолчанию — начало текущих суток UTC)")
+    parser.add_argument("--batch-size", type=int, default=20_000, help="Строк в одном executemany и транзакции")
+    parser.add_argument("--password", default="seed-password", help="Пароль всех созданных пользователей")
+    parser.add_argument("--drop-indexes", action="store_true",
+                        help="Снять индексы jobs на время загрузки (быстрее; только для пустой jobs)")
+    parser.add_argument("--skip-stats", action="store_true", help="Не пересобирать сводку зарплат")
+    parser.add_argument("--stats-batch-size", type=int, default=10_000, help="Пачка чтения при пересборке сводки")
+    return parser
+
+
+def main() -> None:
+    seed(build_parser().parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -8,9 +8,14 @@ import uuid
 from httpx import AsyncClient, ASGITransport
 from sqlalchemy import create_engine
 from sqlalchemy.pool import StaticPool
-from databases import Database
+from contextlib import contextmanager
 from main import app
 from db.base import metadata
+from db.instrumentation import InstrumentedDatabase, capture_queries
+import dependencies
+from dependencies import get_database, job_cache, user_cache
+from auth import token_cache
+from utils.metrics import db_query_duration
 
 
 # Уникальное имя файла БД для каждого запуска
@@ -23,7 +28,30 @@ engine = create_engine(
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
-database = Database(DATABASE_URL)
+database = InstrumentedDatabase(DATABASE_URL, query_metrics=db_query_duration)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Падает, если внутри блока выполнено больше max_queries запросов к БД:
+
+        with query_budget(2):
+            await client.get("/jobs/1")
+    """
+    @contextmanager
+    def budget(max_queries: int):
+        with capture_queries() as log:
+            yield log
+        assert log.count <= max_queries, (
+            f"{log.count} queries, budget {max_queries}:\n" + "\n".join(query.sql for query in log.queries)
+        )
+    return budget
 
 
 @pytest.fixture(autouse=True, scope="function")
@@ -41,13 +69,22 @@ async def setup_database():
 
     # Создаём таблицы
     metadata.create_all(engine)
+    # StaticPool держит соединение к уже удалённому файлу — сбрасываем его
+    engine.dispose()
 
     # Подключаемся к БД
     await database.connect()
     app.state.database = database
+    app.dependency_overrides[get_database] = lambda: database
+    # id в новой БД начинаются заново — кэш прошлого теста недействителен
+    job_cache.clear()
+    user_cache.clear()
+    token_cache.clear()
 
     yield
 
+    app.dependency_overrides.pop(get_database, None)
+
     # Отключаемся
     if database.is_connected:
         await database.disconnect()
@@ -63,4 +100,11 @@ async def setup_database():
 @pytest.fixture
 async def client():
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
-        yield ac
\ No newline at end of file
+        yield ac
+
+
+@pytest.fixture
+def internal_headers(monkeypatch):
+    # /internal/* без INTERNAL_API_TOKEN закрыты — в тестах токен задаётся явно
+    monkeypatch.setattr(dependencies, "INTERNAL_API_TOKEN", "internal-secret")
+    return {"X-Internal-Token": "internal-secret"}
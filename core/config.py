@@ -1,6 +1,84 @@
+import os
 from starlette.config import Config
+from starlette.datastructures import CommaSeparatedStrings
 
 
 config = Config(".env_dev")
 
-DATABASE_URL = config("DATABASE_URL", cast=str, default="sqlite:///./employment_exchange")
\ No newline at end of file
+DATABASE_URL = config("DATABASE_URL", cast=str, default="sqlite:///./employment_exchange")
+# Что делать со схемой при старте: check — сверить ревизию БД с головой миграций Alembic и упасть
+# при расхождении; create_all — создать недостающие таблицы и отметить БД головой (локальная разработка);
+# none — ничего
+DB_STARTUP_MODE = config("DB_STARTUP_MODE", cast=str, default="check")
+# Реплики для чтения через запятую; чтения списков и карточек идут на них по кругу
+DATABASE_REPLICA_URLS = config("DATABASE_REPLICA_URLS", cast=CommaSeparatedStrings, default="")
+# Пул соединений: размер на один процесс, ожидание свободного соединения, таймаут запроса
+# и время жизни простаивающего соединения (для asyncpg; у SQLite пула нет — действует только предел,
+# ожидание блокировок задаёт SQLITE_BUSY_TIMEOUT_MS)
+DB_POOL_MIN_SIZE = config("DB_POOL_MIN_SIZE", cast=int, default=1)
+DB_POOL_MAX_SIZE = config("DB_POOL_MAX_SIZE", cast=int, default=10)
+DB_POOL_ACQUIRE_TIMEOUT_SECONDS = config("DB_POOL_ACQUIRE_TIMEOUT_SECONDS", cast=float, default=10)
+DB_STATEMENT_TIMEOUT_SECONDS = config("DB_STATEMENT_TIMEOUT_SECONDS", cast=float, default=30)
+DB_CONNECTION_RECYCLE_SECONDS = config("DB_CONNECTION_RECYCLE_SECONDS", cast=float, default=300)
+# Профиль SQLite, применяется к каждому соединению (см. db.sqlite).
+# cache_size < 0 — в КиБ; busy_timeout — сколько ждать снятия блокировки писателем, мс
+SQLITE_JOURNAL_MODE = config("SQLITE_JOURNAL_MODE", cast=str, default="WAL")
+SQLITE_SYNCHRONOUS = config("SQLITE_SYNCHRONOUS", cast=str, default="NORMAL")
+SQLITE_MMAP_SIZE = config("SQLITE_MMAP_SIZE", cast=int, default=256 * 1024 * 1024)
+SQLITE_CACHE_SIZE = config("SQLITE_CACHE_SIZE", cast=int, default=-64 * 1024)
+SQLITE_BUSY_TIMEOUT_MS = config("SQLITE_BUSY_TIMEOUT_MS", cast=int, default=5000)
+SQLITE_FOREIGN_KEYS = config("SQLITE_FOREIGN_KEYS", cast=bool, default=True)
+# Режим отладки: трассировки в ответах 500 и заголовки X-DB-Queries / Server-Timing
+DEBUG = config("DEBUG", cast=bool, default=False)
+# Метрики Prometheus на /metrics: запросы по маршрутам, запросы к БД по методам репозиториев, Argon2, кэши
+METRICS_ENABLED = config("METRICS_ENABLED", cast=bool, default=True)
+# Доступ к служебным эндпоинтам /internal/*: заголовок X-Internal-Token с этим значением.
+# Пустое значение — эндпоинты отвечают 403 всем
+INTERNAL_API_TOKEN = config("INTERNAL_API_TOKEN", cast=str, default="")
+# Журнал медленных запросов к БД (см. db.slow_queries): запросы дольше порога пишутся в лог с вызвавшим
+# методом репозитория, план EXPLAIN снимается один раз на форму запроса; худшие — на /internal/slow-queries.
+# Порог 0 — журнал выключен
+SLOW_QUERY_THRESHOLD_MS = config("SLOW_QUERY_THRESHOLD_MS", cast=float, default=200)
+SLOW_QUERY_MAX_STORED = config("SLOW_QUERY_MAX_STORED", cast=int, default=100)
+SLOW_QUERY_EXPLAIN = config("SLOW_QUERY_EXPLAIN", cast=bool, default=True)
+# Профилирование отдельных запросов (см. utils.profiling): по заголовку X-Profile с PROFILING_TOKEN
+# или случайной доле PROFILING_SAMPLE_RATE. Режим cprofile (pstats) или sample (свёрнутые стеки для flamegraph).
+# Профили хранятся в памяти процесса и отдаются на /internal/profiles (доступ — как ко всему /internal);
+# без PROFILING_TOKEN приложение с PROFILING_ENABLED не стартует
+PROFILING_ENABLED = config("PROFILING_ENABLED", cast=bool, default=False)
+PROFILING_TOKEN = config("PROFILING_TOKEN", cast=str, default="")
+PROFILING_SAMPLE_RATE = config("PROFILING_SAMPLE_RATE", cast=float, default=0.0)
+PROFILING_MODE = config("PROFILING_MODE", cast=str, default="cprofile")
+PROFILING_SAMPLE_INTERVAL_MS = config("PROFILING_SAMPLE_INTERVAL_MS", cast=float, default=5)
+PROFILING_MAX_STORED = config("PROFILING_MAX_STORED", cast=int, default=20)
+# Кэш чтения вакансий и пользователей (0 — выключен)
+CACHE_MAXSIZE = config("CACHE_MAXSIZE", cast=int, default=10000)
+CACHE_TTL_SECONDS = config("CACHE_TTL_SECONDS", cast=float, default=60)
+
+# Хеширование паролей (Argon2) в отдельном пуле потоков: размер пула и предел очереди (0 — без предела)
+PASSWORD_HASH_WORKERS = config("PASSWORD_HASH_WORKERS", cast=int, default=min(4, os.cpu_count() or 1))
+PASSWORD_HASH_MAX_QUEUE = config("PASSWORD_HASH_MAX_QUEUE", cast=int, default=256)
+
+# Параметры Argon2 (подбираются под железо командой commands.calibrate_argon2).
+# Хеши с другими параметрами пересчитываются при следующем успешном входе
+ARGON2_TIME_COST = config("ARGON2_TIME_COST", cast=int, default=3)
+ARGON2_MEMORY_COST = config("ARGON2_MEMORY_COST", cast=int, default=65536)
+ARGON2_PARALLELISM = config("ARGON2_PARALLELISM", cast=int, default=4)
+
+# Кэш проверенных access-токенов (0 — выключен); запись живёт до exp токена, но не дольше TTL
+TOKEN_CACHE_MAXSIZE = config("TOKEN_CACHE_MAXSIZE", cast=int, default=10000)
+TOKEN_CACHE_MAX_TTL_SECONDS = config("TOKEN_CACHE_MAX_TTL_SECONDS", cast=float, default=3600)
+
+# Почта: без SMTP_HOST письма только пишутся в лог. Отправляет фоновый воркер из таблицы email_outbox
+BASE_URL = config("BASE_URL", cast=str, default="http://127.0.0.1:8000")
+EMAIL_FROM = config("EMAIL_FROM", cast=str, default="noreply@example.com")
+SMTP_HOST = config("SMTP_HOST", cast=str, default="")
+SMTP_PORT = config("SMTP_PORT", cast=int, default=25)
+SMTP_USERNAME = config("SMTP_USERNAME", cast=str, default="")
+SMTP_PASSWORD = config("SMTP_PASSWORD", cast=str, default="")
+SMTP_STARTTLS = config("SMTP_STARTTLS", cast=bool, default=False)
+SMTP_POOL_SIZE = config("SMTP_POOL_SIZE", cast=int, default=2)
+EMAIL_BATCH_SIZE = config("EMAIL_BATCH_SIZE", cast=int, default=50)
+EMAIL_POLL_INTERVAL_SECONDS = config("EMAIL_POLL_INTERVAL_SECONDS", cast=float, default=1)
+EMAIL_MAX_ATTEMPTS = config("EMAIL_MAX_ATTEMPTS", cast=int, default=5)
+EMAIL_RETRY_BASE_SECONDS = config("EMAIL_RETRY_BASE_SECONDS", cast=float, default=5)
@@ -1,10 +1,63 @@
-from databases import Database
 from sqlalchemy import create_engine, MetaData
-from core.config import DATABASE_URL
+from sqlalchemy.engine import Engine
+from databases import DatabaseURL
+from core.config import (
+    DATABASE_URL, DATABASE_REPLICA_URLS, DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_ACQUIRE_TIMEOUT_SECONDS,
+    DB_STATEMENT_TIMEOUT_SECONDS, DB_CONNECTION_RECYCLE_SECONDS, METRICS_ENABLED,
+    SLOW_QUERY_THRESHOLD_MS, SLOW_QUERY_MAX_STORED, SLOW_QUERY_EXPLAIN,
+)
+from db.instrumentation import InstrumentedDatabase
+from db.replicas import ReplicaSet
+from db.slow_queries import SlowQueryLog
+from db.sqlite import apply_sqlite_profile
+from utils.metrics import db_query_duration
 
 
-database = Database(DATABASE_URL)
+# Общий для основной БД и реплик; запись помнит метод репозитория, а не базу
+slow_query_log = (
+    SlowQueryLog(SLOW_QUERY_THRESHOLD_MS / 1000, SLOW_QUERY_MAX_STORED, explain=SLOW_QUERY_EXPLAIN)
+    if SLOW_QUERY_THRESHOLD_MS > 0 else None
+)
+
+
+def backend_options(url: str) -> dict:
+    # Параметры, которые понимает драйвер конкретного бэкенда databases
+    dialect = DatabaseURL(url).dialect
+    if dialect == "postgresql":
+        return {
+            "min_size": DB_POOL_MIN_SIZE,
+            "max_size": DB_POOL_MAX_SIZE,
+            "command_timeout": DB_STATEMENT_TIMEOUT_SECONDS,
+            "max_inactive_connection_lifetime": DB_CONNECTION_RECYCLE_SECONDS,
+            "server_settings": {"statement_timeout": str(int(DB_STATEMENT_TIMEOUT_SECONDS * 1000))},
+        }
+    return {}
+
+
+def build_database(url: str) -> InstrumentedDatabase:
+    # Каждый запрос к БД попадает в журнал текущего HTTP-запроса (см. db.instrumentation)
+    return InstrumentedDatabase(
+        url,
+        pool_max_size=DB_POOL_MAX_SIZE,
+        acquire_timeout=DB_POOL_ACQUIRE_TIMEOUT_SECONDS,
+        on_connect=apply_sqlite_profile if DatabaseURL(url).dialect == "sqlite" else None,
+        query_metrics=db_query_duration if METRICS_ENABLED else None,
+        slow_queries=slow_query_log,
+        **backend_options(url),
+    )
+
+
+database = build_database(DATABASE_URL)
+replicas = ReplicaSet([build_database(url) for url in DATABASE_REPLICA_URLS])
 metadata = MetaData()
-engine = create_engine(
-    DATABASE_URL,
-)
\ No newline at end of file
+
+
+def sync_url(url: str) -> str:
+    # Синхронный драйвер для того же URL: sqlite+aiosqlite:// -> sqlite://, postgresql+asyncpg:// -> postgresql://
+    parsed = DatabaseURL(url)
+    return str(parsed.replace(driver="")) if parsed.driver else url
+
+
+def create_sync_engine(url: str = DATABASE_URL) -> Engine:
+    # Только для create_all и Alembic; приложение работает через database
+    return create_engine(sync_url(url), pool_recycle=DB_CONNECTION_RECYCLE_SECONDS)
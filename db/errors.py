@@ -0,0 +1,21 @@
+import sqlite3
+
+
+# Нарушения ограничений (UNIQUE, FOREIGN KEY) у поддерживаемых драйверов
+INTEGRITY_ERRORS: tuple = (sqlite3.IntegrityError,)
+# Обращение к несуществующей таблице. У SQLite это OperationalError с текстом "no such table",
+# тот же класс что и у "database is locked" — поэтому проверка через is_undefined_table
+UNDEFINED_TABLE_ERRORS: tuple = ()
+
+try:
+    import asyncpg
+    INTEGRITY_ERRORS += (asyncpg.exceptions.IntegrityConstraintViolationError,)
+    UNDEFINED_TABLE_ERRORS += (asyncpg.exceptions.UndefinedTableError,)
+except ImportError:
+    pass
+
+
+def is_undefined_table(error: BaseException) -> bool:
+    if isinstance(error, sqlite3.OperationalError):
+        return str(error).startswith("no such table")
+    return isinstance(error, UNDEFINED_TABLE_ERRORS)
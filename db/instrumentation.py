@@ -0,0 +1,238 @@
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Iterator, Optional, Union
+from databases import Database
+from databases.core import Connection
+from sqlalchemy.sql import ClauseElement
+from starlette.datastructures import MutableHeaders
+from db.pool import PoolStats, PooledConnection
+from db.slow_queries import SlowQueryLog, explain_statement, format_plan
+from utils.metrics import Histogram
+
+
+@dataclass
+class QueryRecord:
+    statement: Union[ClauseElement, str]
+    duration: float
+    rows: Optional[int]
+
+    @property
+    def sql(self) -> str:
+        # Текст компилируется только по требованию — запись запроса не должна стоить компиляции
+        return str(self.statement)
+
+
+@dataclass
+class QueryLog:
+    """
+    Запросы, выполненные в рамках одного HTTP-запроса (или блока capture_queries).
+    Вложенный журнал дублирует записи в родительский.
+    """
+    parent: Optional["QueryLog"] = None
+    queries: list[QueryRecord] = field(default_factory=list)
+
+    def record(self, query: QueryRecord) -> None:
+        self.queries.append(query)
+        if self.parent is not None:
+            self.parent.record(query)
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def duration(self) -> float:
+        return sum(query.duration for query in self.queries)
+
+
+_current_log: ContextVar[Optional[QueryLog]] = ContextVar("query_log", default=None)
+
+
+def current_query_log() -> Optional[QueryLog]:
+    return _current_log.get()
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryLog]:
+    """Собирает все запросы к БД внутри блока, включая запросы вложенных HTTP-обработчиков."""
+    log = QueryLog(parent=_current_log.get())
+    token = _current_log.set(log)
+    try:
+        yield log
+    finally:
+        _current_log.reset(token)
+
+
+def _caller(depth: int) -> str:
+    # Метод репозитория, вызвавший запрос: имя из кода кадра, без inspect и без разбора стека
+    try:
+        return sys._getframe(depth + 1).f_code.co_qualname
+    except ValueError:
+        return "unknown"
+
+
+def _row_count(result: Any) -> Optional[int]:
+    if isinstance(result, list):
+        return len(result)
+    return None
+
+
+class InstrumentedDatabase(Database):
+    """
+    databases.Database, который пишет каждый запрос, его длительность и число строк
+    в журнал текущего запроса. Без журнала и метрик накладные расходы — один ContextVar.get.
+    Соединения выдаются через PoolStats: не больше pool_max_size одновременно, с таймаутом ожидания.
+    on_connect вызывается с драйверным соединением при его открытии (профиль PRAGMA для SQLite).
+    С query_metrics длительность каждого запроса попадает в гистограмму с меткой вызвавшего метода
+    репозитория (JobRepository.get_jobs_page) — и вне журнала тоже.
+    С slow_queries запросы дольше порога попадают в журнал медленных запросов вместе с планом
+    (EXPLAIN снимается один раз на форму запроса, см. db.slow_queries).
+    """
+
+    # SQLite-транзакции начинаются с BEGIN IMMEDIATE (см. db.sqlite)
+    SUPPORTED_BACKENDS = {**Database.SUPPORTED_BACKENDS, "sqlite": "db.sqlite:SQLiteBackend"}
+
+    def __init__(
+        self,
+        url,
+        *,
+        pool_max_size: int = 10,
+        acquire_timeout: Optional[float] = None,
+        on_connect: Optional[Callable[[Any], Awaitable[None]]] = None,
+        query_metrics: Optional[Histogram] = None,
+        slow_queries: Optional[SlowQueryLog] = None,
+        **options,
+    ):
+        super().__init__(url, **options)
+        self.pool = PoolStats(pool_max_size, acquire_timeout)
+        self.query_metrics = query_metrics
+        self.slow_queries = slow_queries
+        if hasattr(self._backend, "configure_pool"):
+            self._backend.configure_pool(max_idle=pool_max_size, on_connect=on_connect)
+
+    def connection(self) -> Connection:
+        if self._global_connection is not None:
+            return self._global_connection
+        if not self._connection:
+            self._connection = PooledConnection(self, self._backend, self.pool)
+        return self._connection
+
+    def pool_stats(self) -> dict:
+        stats = self.pool.stats()
+        # Простаивающие соединения: пул asyncpg или открытые соединения db.sqlite.SQLitePool
+        backend_pool = getattr(self._backend, "_pool", None)
+        if hasattr(backend_pool, "get_idle_size"):
+            stats["idle"] = backend_pool.get_idle_size()
+        else:
+            stats["idle"] = len(getattr(backend_pool, "_idle", ()))
+        stats["size"] = backend_pool.get_size() if hasattr(backend_pool, "get_size") else stats["in_use"]
+        return stats
+
+    async def _explain(self, query, values) -> str:
+        # Мимо _timed: сам EXPLAIN не попадает ни в журнал, ни в метрики, ни в медленные запросы
+        dialect = self.url.dialect
+        if isinstance(values, list):
+            values = values[0] if values else None
+        statement = explain_statement(query, dialect)
+        try:
+            if self.connection()._transaction_stack:
+                # Внутри транзакции вызывающего — в savepoint: упавший EXPLAIN в Postgres иначе обрывает всю транзакцию
+                async with self.transaction():
+                    plan_rows = await super().fetch_all(statement, values)
+            else:
+                plan_rows = await super().fetch_all(statement, values)
+        except Exception as error:
+            return f"EXPLAIN failed: {error}"
+        return format_plan(plan_rows, dialect)
+
+    async def _timed(self, method, query, *args, rows=_row_count, **kwargs):
+        log = _current_log.get()
+        metrics = self.query_metrics
+        slow_queries = self.slow_queries
+        if log is None and metrics is None and slow_queries is None:
+            return await method(query, *args, **kwargs)
+        # Кадры: _timed <- execute/fetch_* <- метод репозитория
+        caller = _caller(2) if metrics is not None else None
+        started = time.perf_counter()
+        result = await method(query, *args, **kwargs)
+        duration = time.perf_counter() - started
+        if log is not None:
+            log.record(QueryRecord(query, duration, rows(result)))
+        if metrics is not None:
+            metrics.observe(duration, caller)
+        if slow_queries is not None and duration >= slow_queries.threshold:
+            values = args[0] if args else None
+            slow = slow_queries.record(query, values, duration, caller or _caller(2))
+            if slow_queries.needs_plan(slow):
+                slow_queries.set_plan(slow, await self._explain(query, values))
+        return result
+
+    async def execute(self, query, values=None):
+        return await self._timed(super().execute, query, values, rows=lambda result: None)
+
+    async def execute_many(self, query, values):
+        return await self._timed(super().execute_many, query, values, rows=lambda result: len(values))
+
+    async def fetch_all(self, query, values=None):
+        return await self._timed(super().fetch_all, query, values)
+
+    async def fetch_one(self, query, values=None):
+        return await self._timed(super().fetch_one, query, values, rows=lambda row: int(row is not None))
+
+    async def fetch_val(self, query, values=None, column=0):
+        return await self._timed(super().fetch_val, query, values, column=column, rows=lambda value: None)
+
+    async def iterate(self, query, values=None):
+        log = _current_log.get()
+        metrics = self.query_metrics
+        slow_queries = self.slow_queries
+        if log is None and metrics is None and slow_queries is None:
+            async for record in super().iterate(query, values):
+                yield record
+            return
+        caller = _caller(1) if metrics is not None or slow_queries is not None else None
+        started = time.perf_counter()
+        rows = 0
+        try:
+            async for record in super().iterate(query, values):
+                rows += 1
+                yield record
+        finally:
+            # В длительность входит и время обработки строк потребителем — так честнее для стриминга
+            duration = time.perf_counter() - started
+            if log is not None:
+                log.record(QueryRecord(query, duration, rows))
+            if metrics is not None:
+                metrics.observe(duration, caller)
+            # Без плана: в finally генератора нельзя надёжно ждать ещё одного запроса
+            if slow_queries is not None and duration >= slow_queries.threshold:
+                slow_queries.record(query, values, duration, caller)
+
+
+class QueryLogMiddleware:
+    """
+    ASGI-middleware: открывает журнал запросов к БД на каждый HTTP-запрос.
+    С expose_headers=True добавляет в ответ X-DB-Queries и Server-Timing (только для отладки).
+    """
+
+    def __init__(self, app, expose_headers: bool = False):
+        self.app = app
+        self.expose_headers = expose_headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with capture_queries() as log:
+            async def send_with_headers(message):
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers.append("X-DB-Queries", str(log.count))
+                    headers.append("Server-Timing", f'db;dur={log.duration * 1000:.1f};desc="{log.count} queries"')
+                await send(message)
+
+            await self.app(scope, receive, send_with_headers if self.expose_headers else send)
@@ -0,0 +1,57 @@
+import os
+from sqlalchemy import Column, MetaData, String, Table, select
+from db.errors import is_undefined_table
+
+
+ALEMBIC_DIR = os.path.join(os.path.dirname(__file__), "..", "alembic")
+
+# Таблица, в которой Alembic хранит применённую ревизию
+alembic_version = Table(
+    "alembic_version",
+    MetaData(),
+    Column("version_num", String(32), primary_key=True),
+)
+
+
+class MigrationStateError(RuntimeError):
+    """Схема БД не совпадает с головой миграций: приложение не стартует."""
+
+
+def expected_heads() -> set[str]:
+    # Alembic импортируется только здесь: ~60 мс, и только при старте в режиме check
+    from alembic.script import ScriptDirectory
+    return set(ScriptDirectory(ALEMBIC_DIR).get_heads())
+
+
+async def current_revisions(database) -> set[str]:
+    try:
+        rows = await database.fetch_all(select(alembic_version.c.version_num))
+    except Exception as error:
+        # Таблицы alembic_version нет — миграции не применялись; остальные ошибки (блокировка, сеть) — наверх
+        if not is_undefined_table(error):
+            raise
+        return set()
+    return {row["version_num"] for row in rows}
+
+
+async def check_migration_state(database) -> None:
+    """Одним запросом сверяет ревизию в БД с головой миграций, без рефлексии таблиц."""
+    expected = expected_heads()
+    current = await current_revisions(database)
+    if current != expected:
+        raise MigrationStateError(
+            f"Database revision {', '.join(sorted(current)) or 'none'} does not match migration head "
+            f"{', '.join(sorted(expected))}: run `alembic upgrade head`"
+        )
+
+
+async def stamp_head(database) -> None:
+    """Отмечает БД, созданную через metadata.create_all, как мигрированную до головы."""
+    await database.execute(
+        "CREATE TABLE IF NOT EXISTS alembic_version "
+        "(version_num VARCHAR(32) NOT NULL, CONSTRAINT alembic_version_pkc PRIMARY KEY (version_num))"
+    )
+    async with database.transaction():
+        await database.execute(alembic_version.delete())
+        for revision in sorted(expected_heads()):
+            await database.execute(alembic_version.insert().values(version_num=revision))
@@ -0,0 +1,97 @@
+import asyncio
+import bisect
+import time
+from typing import Optional
+from databases.core import Connection
+
+
+# Границы корзин гистограммы времени получения соединения, мс (последняя корзина — всё, что дольше)
+ACQUIRE_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class PoolTimeout(Exception):
+    """Свободное соединение с БД не освободилось за DB_POOL_ACQUIRE_TIMEOUT_SECONDS."""
+
+
+class PoolStats:
+    """
+    Ограничитель и счётчики соединений. Одинаково работает поверх пула asyncpg и поверх
+    SQLite-бэкенда, который на каждый захват открывает новое соединение и своего пула не имеет.
+    """
+
+    def __init__(self, max_size: int, acquire_timeout: Optional[float]):
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.in_use = 0
+        self.waiting = 0
+        self.acquired = 0
+        self.timeouts = 0
+        self.acquire_seconds_total = 0.0
+        self.acquire_histogram = [0] * (len(ACQUIRE_BUCKETS_MS) + 1)
+
+    @property
+    def slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_size)
+        return self._slots
+
+    def observe_acquire(self, seconds: float) -> None:
+        self.acquired += 1
+        self.acquire_seconds_total += seconds
+        self.acquire_histogram[bisect.bisect_left(ACQUIRE_BUCKETS_MS, seconds * 1000)] += 1
+
+    def stats(self) -> dict:
+        labels = [f"le_{bound}ms" for bound in ACQUIRE_BUCKETS_MS] + ["inf"]
+        return {
+            "max_size": self.max_size,
+            "acquire_timeout": self.acquire_timeout,
+            "in_use": self.in_use,
+            "waiting": self.waiting,
+            "acquired": self.acquired,
+            "timeouts": self.timeouts,
+            "acquire_seconds_total": self.acquire_seconds_total,
+            "acquire_ms_histogram": dict(zip(labels, self.acquire_histogram)),
+        }
+
+
+class PooledConnection(Connection):
+    """
+    Connection из databases, который берёт слот у PoolStats перед захватом соединения бэкенда:
+    не больше max_size соединений одновременно, ожидание ограничено acquire_timeout.
+    """
+
+    def __init__(self, database, backend, pool: PoolStats):
+        super().__init__(database, backend)
+        self._pool_stats = pool
+
+    async def __aenter__(self) -> "Connection":
+        if self._connection_counter:
+            # Соединение уже захвачено этой задачей (вложенный запрос или транзакция)
+            return await super().__aenter__()
+
+        pool = self._pool_stats
+        pool.waiting += 1
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(pool.slots.acquire(), pool.acquire_timeout)
+        except asyncio.TimeoutError:
+            pool.timeouts += 1
+            raise PoolTimeout("Database connection pool exhausted")
+        finally:
+            pool.waiting -= 1
+
+        try:
+            await super().__aenter__()
+        except BaseException:
+            pool.slots.release()
+            raise
+        pool.observe_acquire(time.perf_counter() - started)
+        pool.in_use += 1
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await super().__aexit__(*args)
+        if self._connection_counter == 0:
+            self._pool_stats.in_use -= 1
+            self._pool_stats.slots.release()
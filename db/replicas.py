@@ -0,0 +1,30 @@
+import itertools
+from typing import Sequence
+from databases import Database
+
+
+class ReplicaSet:
+    """
+    Реплики только для чтения. Репозитории берут реплику по кругу для запросов,
+    которым допустимо отставание репликации; без реплик читают с основной БД.
+    """
+
+    def __init__(self, replicas: Sequence[Database] = ()):
+        self.replicas = list(replicas)
+        self._counter = itertools.count()
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def choose(self, primary: Database) -> Database:
+        if not self.replicas:
+            return primary
+        return self.replicas[next(self._counter) % len(self.replicas)]
+
+    async def connect(self) -> None:
+        for replica in self.replicas:
+            await replica.connect()
+
+    async def disconnect(self) -> None:
+        for replica in self.replicas:
+            await replica.disconnect()
@@ -0,0 +1,146 @@
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Optional, Union
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import ClauseElement
+from sqlalchemy.sql.expression import Executable
+
+
+logger = logging.getLogger(__name__)
+
+# Планы снимаются только для запросов с данными; DDL, PRAGMA и управление транзакциями пропускаются
+EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN поверх готового выражения SQLAlchemy: параметры биндятся так же, как у самого запроса."""
+    inherit_cache = False
+    # Компилятор SQLAlchemy смотрит на них у корневого выражения, если внутри INSERT/UPDATE
+    _inline = False
+    _return_defaults = False
+
+    def __init__(self, statement: ClauseElement, prefix: str):
+        self.statement = statement
+        self.prefix = prefix
+
+
+@compiles(Explain)
+def _compile_explain(element: Explain, compiler, **kwargs) -> str:
+    return f"{element.prefix} {compiler.process(element.statement, **kwargs)}"
+
+
+def explain_prefix(dialect: str) -> str:
+    return "EXPLAIN QUERY PLAN" if dialect == "sqlite" else "EXPLAIN"
+
+
+def explain_statement(statement: Union[ClauseElement, str], dialect: str) -> Union[ClauseElement, str]:
+    prefix = explain_prefix(dialect)
+    if isinstance(statement, str):
+        return f"{prefix} {statement}"
+    return Explain(statement, prefix)
+
+
+def format_plan(rows: list, dialect: str) -> str:
+    if dialect != "sqlite":
+        # Postgres: одна колонка "QUERY PLAN", строка на узел с отступами
+        return "\n".join(str(next(iter(row._mapping.values()))) for row in rows)
+    # SQLite: (id, parent, notused, detail) — дерево восстанавливается по parent
+    depth = {0: -1}
+    lines = []
+    for row in rows:
+        mapping = row._mapping
+        depth[mapping["id"]] = depth.get(mapping["parent"], -1) + 1
+        lines.append("  " * depth[mapping["id"]] + mapping["detail"])
+    return "\n".join(lines)
+
+
+def statement_shape(statement: Union[ClauseElement, str], values: Any) -> tuple[str, dict]:
+    """
+    SQL без значений и типы параметров. Списки IN остаются одним плейсхолдером (POSTCOMPILE),
+    поэтому запросы с разной длиной списка — одна форма.
+    """
+    if isinstance(statement, str):
+        sql, params = statement, {}
+    else:
+        compiled = statement.compile()
+        sql, params = str(compiled), compiled.params
+    if isinstance(values, dict):
+        params = {**params, **values}
+    return sql, {name: type(value).__name__ for name, value in params.items()}
+
+
+@dataclass
+class SlowQuery:
+    sql: str
+    params: dict
+    method: str
+    count: int = 0
+    total_duration: float = 0.0
+    max_duration: float = 0.0
+    last_duration: float = 0.0
+    last_seen: Optional[datetime] = None
+    plan: Optional[str] = None
+    # План снимается один раз на форму запроса, даже если медленных вызовов несколько одновременно
+    explained: bool = field(default=False, repr=False)
+
+    def summary(self) -> dict:
+        return {
+            "sql": self.sql, "params": self.params, "method": self.method, "count": self.count,
+            "total_ms": self.total_duration * 1000, "max_ms": self.max_duration * 1000,
+            "avg_ms": self.total_duration / self.count * 1000, "last_ms": self.last_duration * 1000,
+            "last_seen": self.last_seen, "plan": self.plan,
+        }
+
+
+class SlowQueryLog:
+    """
+    Запросы дольше threshold секунд, сгруппированные по форме (SQL без значений + вызвавший метод).
+    Хранятся maxsize форм; при переполнении вытесняется та, что дольше всех не повторялась.
+    Быстрые запросы платят одно сравнение; компиляция и EXPLAIN — только для медленных.
+    """
+
+    def __init__(self, threshold: float, maxsize: int = 100, explain: bool = True):
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.explain = explain
+        self._queries: "OrderedDict[tuple, SlowQuery]" = OrderedDict()
+
+    def record(self, statement: Union[ClauseElement, str], values: Any, duration: float, method: str) -> SlowQuery:
+        sql, params = statement_shape(statement, values)
+        key = (sql, method)
+        query = self._queries.get(key)
+        if query is None:
+            query = self._queries[key] = SlowQuery(sql, params, method)
+            if len(self._queries) > self.maxsize:
+                self._queries.popitem(last=False)
+        else:
+            self._queries.move_to_end(key)
+        query.count += 1
+        query.total_duration += duration
+        query.max_duration = max(query.max_duration, duration)
+        query.last_duration = duration
+        query.last_seen = datetime.now(timezone.utc)
+        logger.warning(
+            "Медленный запрос %.1f мс в %s: %s; параметры %s",
+            duration * 1000, method, " ".join(sql.split()), params,
+        )
+        return query
+
+    def needs_plan(self, query: SlowQuery) -> bool:
+        if not self.explain or query.explained:
+            return False
+        query.explained = True
+        return query.sql.lstrip().upper().startswith(EXPLAINABLE)
+
+    def set_plan(self, query: SlowQuery, plan: str) -> None:
+        query.plan = plan
+        logger.warning("План медленного запроса из %s:\n%s", query.method, plan)
+
+    def worst(self, limit: int = 20, order_by: str = "max") -> list[SlowQuery]:
+        keys = {"max": lambda q: q.max_duration, "total": lambda q: q.total_duration, "count": lambda q: q.count}
+        return sorted(self._queries.values(), key=keys[order_by], reverse=True)[:limit]
+
+    def clear(self) -> None:
+        self._queries.clear()
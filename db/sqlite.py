@@ -0,0 +1,100 @@
+from databases.backends import sqlite as sqlite_backend
+from core.config import (
+    SQLITE_JOURNAL_MODE, SQLITE_SYNCHRONOUS, SQLITE_MMAP_SIZE, SQLITE_CACHE_SIZE,
+    SQLITE_BUSY_TIMEOUT_MS, SQLITE_FOREIGN_KEYS,
+)
+
+
+def sqlite_pragmas() -> str:
+    """
+    Профиль SQLite для работы под нагрузкой. WAL: читатели не блокируют писателя и наоборот,
+    synchronous=NORMAL в WAL не теряет целостность, только последние транзакции при сбое питания.
+    journal_mode сохраняется в файле БД, остальные настройки действуют на одно соединение.
+    """
+    return (
+        f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE};"
+        f"PRAGMA synchronous={SQLITE_SYNCHRONOUS};"
+        f"PRAGMA mmap_size={SQLITE_MMAP_SIZE};"
+        f"PRAGMA cache_size={SQLITE_CACHE_SIZE};"
+        f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS};"
+        f"PRAGMA foreign_keys={'ON' if SQLITE_FOREIGN_KEYS else 'OFF'};"
+    )
+
+
+async def apply_sqlite_profile(raw_connection) -> None:
+    # Один вызов на новое соединение пула — все PRAGMA одним скриптом
+    await raw_connection.executescript(sqlite_pragmas())
+
+
+class ImmediateTransaction(sqlite_backend.SQLiteTransaction):
+    """
+    Транзакции приложения всегда что-то пишут. BEGIN IMMEDIATE берёт блокировку записи сразу
+    и ждёт её по busy_timeout; отложенный BEGIN при повышении блокировки с чтения на запись
+    получает SQLITE_BUSY мгновенно ("database is locked"), не дожидаясь таймаута.
+    """
+
+    async def start(self, is_root: bool, extra_options: dict) -> None:
+        if not is_root:
+            await super().start(is_root, extra_options)
+            return
+        self._is_root = True
+        async with self._connection._connection.execute("BEGIN IMMEDIATE") as cursor:
+            await cursor.close()
+
+
+class ImmediateConnection(sqlite_backend.SQLiteConnection):
+    def transaction(self) -> ImmediateTransaction:
+        return ImmediateTransaction(self)
+
+
+class SQLitePool(sqlite_backend.SQLitePool):
+    """
+    Пул databases открывает новое aiosqlite-соединение (и поток) на каждый захват и закрывает его
+    после запроса; закрытие последнего соединения ещё и сбрасывает WAL в основной файл.
+    Здесь до max_idle соединений остаются открытыми и переиспользуются, on_connect
+    (профиль PRAGMA) выполняется один раз при открытии соединения.
+    """
+
+    def __init__(self, url, **options):
+        super().__init__(url, **options)
+        self.on_connect = None
+        self.max_idle = 10
+        self._idle: list = []
+
+    async def acquire(self):
+        if self._idle:
+            return self._idle.pop()
+        connection = await super().acquire()
+        if self.on_connect is not None:
+            await self.on_connect(connection)
+        return connection
+
+    async def release(self, connection) -> None:
+        if connection.in_transaction:
+            # Транзакция брошена посреди (отмена задачи) — не отдаём её следующему владельцу
+            await connection.rollback()
+        if len(self._idle) < self.max_idle:
+            self._idle.append(connection)
+        else:
+            await super().release(connection)
+
+    async def close(self) -> None:
+        while self._idle:
+            await super().release(self._idle.pop())
+
+
+class SQLiteBackend(sqlite_backend.SQLiteBackend):
+    def __init__(self, database_url, **options):
+        super().__init__(database_url, **options)
+        self._pool = SQLitePool(self._database_url, **self._options)
+
+    def configure_pool(self, max_idle: int, on_connect=None) -> None:
+        self._pool.max_idle = max_idle
+        self._pool.on_connect = on_connect
+
+    def connection(self) -> ImmediateConnection:
+        return ImmediateConnection(self._pool, self._dialect)
+
+    async def disconnect(self) -> None:
+        await self._pool.close()
+        await super().disconnect()
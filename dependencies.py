@@ -1,27 +1,118 @@
+import hmac
+from typing import Optional
 from databases import Database
-from db.base import database
+from db.base import database, replicas, slow_query_log
+from db.slow_queries import SlowQueryLog
+from db.replicas import ReplicaSet
+from core.config import (
+    CACHE_MAXSIZE, CACHE_TTL_SECONDS, EMAIL_FROM, SMTP_HOST, SMTP_PORT, SMTP_USERNAME, SMTP_PASSWORD,
+    SMTP_STARTTLS, SMTP_POOL_SIZE, EMAIL_BATCH_SIZE, EMAIL_POLL_INTERVAL_SECONDS, EMAIL_MAX_ATTEMPTS,
+    EMAIL_RETRY_BASE_SECONDS, PROFILING_MAX_STORED, INTERNAL_API_TOKEN,
+)
 from repositories.user_repository import UserRepository
 from repositories.job_repository import JobRepository
+from repositories.email_outbox_repository import EmailOutboxRepository
 from services.user_service import UserService
 from services.job_service import JobService
-from fastapi import Depends
+from services.email_worker import EmailOutboxWorker
+from utils.cache import Cache, build_cache
+from utils.email import EmailTransport, LoggingTransport, SMTPTransport
+from utils.profiling import ProfileStore
+from fastapi import Depends, Header, HTTPException
+
+
+# Кэши живут весь процесс, сервисы создаются на каждый запрос
+job_cache = build_cache(CACHE_MAXSIZE, CACHE_TTL_SECONDS)
+user_cache = build_cache(CACHE_MAXSIZE, CACHE_TTL_SECONDS)
+
+
+def build_email_transport() -> EmailTransport:
+    if not SMTP_HOST:
+        return LoggingTransport()
+    return SMTPTransport(
+        SMTP_HOST, SMTP_PORT, EMAIL_FROM, SMTP_USERNAME or None, SMTP_PASSWORD or None,
+        starttls=SMTP_STARTTLS, pool_size=SMTP_POOL_SIZE,
+    )
+
+
+# Профили запросов (ProfilingMiddleware пишет, /internal/profiles читает)
+profile_store = ProfileStore(PROFILING_MAX_STORED)
+
+
+# Воркер очереди писем запускается в lifespan приложения
+email_worker = EmailOutboxWorker(
+    EmailOutboxRepository(database),
+    build_email_transport(),
+    batch_size=EMAIL_BATCH_SIZE,
+    poll_interval=EMAIL_POLL_INTERVAL_SECONDS,
+    max_attempts=EMAIL_MAX_ATTEMPTS,
+    retry_base_seconds=EMAIL_RETRY_BASE_SECONDS,
+)
 
 
 async def get_database() -> Database:
     return database
 
 
-def get_user_repository(db: Database = Depends(get_database)) -> UserRepository:
-    return UserRepository(db)
+def get_replicas() -> ReplicaSet:
+    return replicas
+
+
+def get_job_cache() -> Cache:
+    return job_cache
+
+
+def get_user_cache() -> Cache:
+    return user_cache
+
+
+def get_user_repository(
+    db: Database = Depends(get_database),
+    replicas: ReplicaSet = Depends(get_replicas)
+) -> UserRepository:
+    return UserRepository(db, replicas)
+
+
+def get_job_repository(
+    db: Database = Depends(get_database),
+    replicas: ReplicaSet = Depends(get_replicas)
+) -> JobRepository:
+    return JobRepository(db, replicas)
+
+
+def get_slow_query_log() -> Optional[SlowQueryLog]:
+    return slow_query_log
+
+
+def get_profile_store() -> ProfileStore:
+    return profile_store
+
+
+def get_email_worker() -> EmailOutboxWorker:
+    return email_worker
+
+
+def get_email_outbox_repository(db: Database = Depends(get_database)) -> EmailOutboxRepository:
+    return EmailOutboxRepository(db)
 
 
-def get_job_repository(db: Database = Depends(get_database)) -> JobRepository:
-    return JobRepository(db)
+def get_user_service(
+    repo: UserRepository = Depends(get_user_repository),
+    cache: Cache = Depends(get_user_cache)
+) -> UserService:
+    return UserService(repo, cache)
 
 
-def get_user_service(repo: UserRepository = Depends(get_user_repository)) -> UserService:
-    return UserService(repo)
+def get_job_service(
+    repo: JobRepository = Depends(get_job_repository),
+    cache: Cache = Depends(get_job_cache)
+) -> JobService:
+    return JobService(repo, cache)
 
 
-def get_job_service(repo: JobRepository = Depends(get_job_repository)) -> JobService:
-    return JobService(repo)
\ No newline at end of file
+def check_internal_token(x_internal_token: Optional[str] = Header(None, description="INTERNAL_API_TOKEN")):
+    # Служебные эндпоинты отдают SQL, профили и состояние пулов: без настроенного токена не отдаём никому
+    if not INTERNAL_API_TOKEN or not hmac.compare_digest(
+        (x_internal_token or "").encode(), INTERNAL_API_TOKEN.encode()
+    ):
+        raise HTTPException(status_code=403, detail="Invalid internal token")
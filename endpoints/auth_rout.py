@@ -1,20 +1,19 @@
-import os
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from jinja2 import FileSystemLoader, Environment
-from auth import create_verification_token, verify_verification_token, verify_password, create_access_token
+from auth import (
+    create_verification_token, verify_verification_token, verify_password_async, password_needs_rehash,
+    create_access_token, get_current_user, revoke_access_token, oauth2_scheme
+)
 from services.user_service import UserService
-from dependencies import get_user_service
-from schemas import Token
-from utils.email import send_verification_email
+from dependencies import get_user_service, get_email_outbox_repository, get_email_worker
+from schemas import CurrentUser, Token
+from repositories.email_outbox_repository import EmailOutboxRepository
+from services.email_worker import EmailOutboxWorker
+from core.config import BASE_URL
 
 
 router = APIRouter(tags=["Аутентификация пользователя"])
 
-# Настройка шаблонов
-template_dir = os.path.join(os.path.dirname(__file__), "..", "templates")
-env = Environment(loader=FileSystemLoader(template_dir))
-
 
 
 @router.post("/login", summary="Аутентификация пользователя",
@@ -22,11 +21,12 @@ env = Environment(loader=FileSystemLoader(template_dir))
                 "Проверяет, что email и пароль корректны, а также что email подтверждён. "
                 "В случае успеха возвращает JWT-токен.", response_model=Token)
 async def login(
+    background_tasks: BackgroundTasks,
     form_data: OAuth2PasswordRequestForm = Depends(),
     user_service: UserService = Depends(get_user_service)
 ):
     try:
-        user = await user_service.get_user_by_email(form_data.username)
+        user = await user_service.get_user_for_login(form_data.username)
     except ValueError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -41,19 +41,36 @@ async def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    if not verify_password(form_data.password, user.hashed_password):
+    if not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # Хеш с устаревшими параметрами Argon2 пересчитываем после отправки ответа
+    if password_needs_rehash(user.hashed_password):
+        background_tasks.add_task(user_service.rehash_password, user, form_data.password)
+
     access_token = create_access_token(
         data={"sub": str(user.id), "email": user.email, "name": user.name, "is_company": user.is_company}
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
 
+
+@router.post("/logout", summary="Выход из системы",
+    description="Отзывает текущий access-токен: повторные запросы с ним получают 401 до истечения срока токена. "
+                "Отзыв хранится в памяти процесса: при нескольких воркерах или экземплярах приложения "
+                "он действует только в том процессе, который обработал запрос.",
+    response_model=dict)
+async def logout(
+    token: str = Depends(oauth2_scheme),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    revoke_access_token(token)
+    return {"message": "Logged out"}
+
 @router.post("/resend-verification-email",
     summary="Повторно отправить письмо подтверждения",
     description="Отправляет повторное письмо для подтверждения email на указанный адрес. "
@@ -80,14 +97,26 @@ async def login(
 )
 async def resend_verification_email(
     email: str,
-    user_service: UserService = Depends(get_user_service)
+    user_service: UserService = Depends(get_user_service),
+    outbox: EmailOutboxRepository = Depends(get_email_outbox_repository),
+    email_worker: EmailOutboxWorker = Depends(get_email_worker)
 ):
-    user = await user_service.get_user_by_email(email)
+    try:
+        user = await user_service.get_user_by_email(email)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if user.is_verified:
         raise HTTPException(status_code=400, detail="Email already verified")
 
+    # Письмо только ставится в очередь: рендер и SMTP — в фоновом воркере
     token = create_verification_token(email)
-    send_verification_email(email, user.name, token)
+    await outbox.enqueue(
+        email,
+        "Подтвердите ваш email",
+        "verify_email.html",
+        {"name": user.name, "verify_url": f"{BASE_URL}/verify-email?token={token}"},
+    )
+    email_worker.notify()
     return {"message": "Verification email sent"}
 
 
@@ -118,8 +147,11 @@ async def verify_email(
     token: str,
     user_service: UserService = Depends(get_user_service)
 ):
-    email = verify_verification_token(token)
-    await user_service.verify_user(email)
+    try:
+        email = verify_verification_token(token)
+        await user_service.verify_user(email)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return {"message": "Email verified successfully"}
 
 
@@ -0,0 +1,58 @@
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from utils.cache import Cache
+from db.slow_queries import SlowQueryLog
+from databases import Database
+from db.replicas import ReplicaSet
+from dependencies import get_database, get_replicas, get_job_cache, get_user_cache, get_slow_query_log, check_internal_token
+from auth import password_hasher, token_cache
+
+
+router = APIRouter(prefix="/internal", tags=["Служебное"], dependencies=[Depends(check_internal_token)])
+
+
+@router.get("/cache", summary="Статистика кэшей",
+    description="Возвращает размер, попадания, промахи и вытеснения кэшей вакансий, пользователей "
+                "и проверенных access-токенов. Используется для подбора CACHE_MAXSIZE, CACHE_TTL_SECONDS "
+                "и TOKEN_CACHE_MAXSIZE.", response_model=dict)
+async def cache_stats(
+    job_cache: Cache = Depends(get_job_cache),
+    user_cache: Cache = Depends(get_user_cache)
+):
+    return {"jobs": job_cache.stats(), "users": user_cache.stats(), "tokens": token_cache.stats()}
+
+
+@router.get("/password-hashing", summary="Нагрузка на хеширование паролей",
+    description="Возвращает размер пула Argon2, глубину очереди, число выполняющихся и выполненных операций, "
+                "отказы из-за переполнения очереди и суммарное время ожидания и вычисления.", response_model=dict)
+async def password_hashing_stats():
+    return password_hasher.stats()
+
+
+@router.get("/db-pool", summary="Состояние пула соединений с БД",
+    description="Возвращает предел пула, занятые и простаивающие соединения, число ожидающих, "
+                "таймауты ожидания и гистограмму времени получения соединения (мс). "
+                "Используется для подбора DB_POOL_MAX_SIZE и DB_POOL_ACQUIRE_TIMEOUT_SECONDS. "
+                "Для каждой реплики из DATABASE_REPLICA_URLS — отдельная статистика.", response_model=dict)
+async def db_pool_stats(
+    db: Database = Depends(get_database),
+    replicas: ReplicaSet = Depends(get_replicas)
+):
+    stats = db.pool_stats()
+    stats["replicas"] = [replica.pool_stats() for replica in replicas.replicas]
+    return stats
+
+
+@router.get("/slow-queries", summary="Медленные запросы к БД",
+    description="Худшие запросы дольше SLOW_QUERY_THRESHOLD_MS из последних SLOW_QUERY_MAX_STORED форм: SQL без значений, "
+                "типы параметров, вызвавший метод репозитория, число вызовов, максимальное, среднее и суммарное время "
+                "и план EXPLAIN (EXPLAIN QUERY PLAN для SQLite), снятый при первом медленном вызове.",
+    response_model=list[dict])
+async def slow_queries(
+    order_by: Literal["max", "total", "count"] = Query("max", description="Сортировка"),
+    limit: int = Query(20, ge=1, le=100, description="Сколько запросов вернуть"),
+    slow_query_log: Optional[SlowQueryLog] = Depends(get_slow_query_log)
+):
+    if slow_query_log is None:
+        raise HTTPException(status_code=404, detail="Slow query log is disabled")
+    return [query.summary() for query in slow_query_log.worst(limit, order_by)]
@@ -1,11 +1,36 @@
-from fastapi import APIRouter, HTTPException, Depends
+from datetime import date, datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response, Body
+from fastapi.responses import StreamingResponse
 from auth import get_current_user
-from schemas import JobCreate, Job, User
+from models.jobs import jobs
+from schemas import JobCreate, Job, JobPage, JobFilters, JobBulkResult, JobStats, CurrentUser
 from services.job_service import JobService
+from repositories.job_repository import BulkValidationError
 from dependencies import get_job_service
+from utils.export import ndjson_stream, csv_stream
+from utils.serialization import model_response
+from utils.http_cache import make_etag, validator_headers, is_conditional, is_not_modified, not_modified_response
 
 router = APIRouter(prefix="/jobs", tags=["Вакансии"])
 
+
+def get_job_filters(
+    is_active: Optional[bool] = Query(None, description="Только активные (true) или только закрытые (false)"),
+    salary_min: Optional[int] = Query(None, ge=0, description="Вилка вакансии пересекается с [salary_min, ...]"),
+    salary_max: Optional[int] = Query(None, ge=0, description="Вилка вакансии пересекается с [..., salary_max]"),
+    user_id: Optional[int] = Query(None, description="Вакансии конкретного работодателя"),
+    created_after: Optional[datetime] = Query(None, description="Созданные не раньше указанного момента")
+) -> JobFilters:
+    return JobFilters(
+        is_active=is_active,
+        salary_min=salary_min,
+        salary_max=salary_max,
+        user_id=user_id,
+        created_after=created_after
+    )
+
+
 @router.post("/", summary="Создать новую вакансию",
     description="Создаёт новую вакансию. Проверяет, что пользователь с указанным user_id существует, "
                 "и что значение 'salary_from' не превышает 'salary_to'. "
@@ -13,7 +38,7 @@ router = APIRouter(prefix="/jobs", tags=["Вакансии"])
 async def create_job(
     job: JobCreate,
     service: JobService = Depends(get_job_service),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     # Только авторизованные пользователи
     if job.user_id != current_user.id and not current_user.is_company:
@@ -25,25 +50,136 @@ async def create_job(
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/", summary="Получить список всех вакансий",
-    description="Возвращает список всех активных и неактивных вакансий, отсортированных по дате создания — сначала новые. "
-                "Если вакансий нет — возвращается пустой список.", response_model=list[Job])
-async def read_jobs(service: JobService = Depends(get_job_service)):
-    return await service.get_all_jobs()
+@router.post("/bulk", summary="Создать несколько вакансий",
+    description="Создаёт до 1000 вакансий одной транзакцией. Зарплатные вилки и существование пользователей "
+                "проверяются для всей пачки заранее. По умолчанию любая ошибка отменяет всю пачку (400 со списком ошибок); "
+                "с partial=true корректные вакансии создаются, а ошибки возвращаются по индексам.",
+    response_model=JobBulkResult)
+async def create_jobs_bulk(
+    new_jobs: list[JobCreate] = Body(..., min_length=1, max_length=1000),
+    partial: bool = Query(False, description="Создать корректные вакансии, даже если часть пачки с ошибками"),
+    service: JobService = Depends(get_job_service),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    if not current_user.is_company and any(job.user_id != current_user.id for job in new_jobs):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    try:
+        created, errors = await service.create_jobs_bulk(new_jobs, partial)
+    except BulkValidationError as e:
+        raise HTTPException(status_code=400, detail=[error.model_dump() for error in e.errors])
+    return JobBulkResult(created=created, errors=errors)
+
+
+@router.get("/", summary="Получить список вакансий",
+    description="Возвращает страницу активных и неактивных вакансий, отсортированных по дате создания — сначала новые. "
+                "Чтобы получить следующую страницу, передайте 'next_cursor' из ответа в параметр 'cursor'. "
+                "Если вакансий больше нет — 'next_cursor' равен null. "
+                "Список можно сузить фильтрами: активность, пересечение зарплатной вилки, работодатель, дата создания. "
+                "При передаче курсора фильтры должны совпадать с первым запросом. "
+                "Поддерживает If-None-Match: если список не менялся, возвращается 304 без тела.", response_model=JobPage)
+async def read_jobs(
+    request: Request,
+    limit: int = Query(20, ge=1, le=100, description="Количество вакансий на странице"),
+    cursor: Optional[str] = Query(None, description="Курсор из 'next_cursor' предыдущей страницы"),
+    filters: JobFilters = Depends(get_job_filters),
+    service: JobService = Depends(get_job_service)
+):
+    try:
+        page = await service.get_jobs_page(limit, cursor, filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # ETag страницы: параметры запроса + (id, updated_at) её строк и курсор следующей.
+    # Считается по уже прочитанной странице — без агрегата по всей выборке.
+    # Last-Modified не отдаём — удаление вакансии его не меняет
+    etag = make_etag(request.url.query, page.next_cursor, *(f"{job.id}:{job.updated_at.isoformat()}" for job in page.items))
+    if is_not_modified(request, etag, None):
+        return not_modified_response(etag, None)
+    return model_response(JobPage, page, headers=validator_headers(etag, None))
+
+
+@router.get("/export", summary="Выгрузка всех вакансий",
+    description="Потоково выгружает вакансии в формате NDJSON (по одной JSON-записи на строку) или CSV. "
+                "Таблица читается пачками по первичному ключу, поэтому память сервера не растёт с размером выгрузки. "
+                "Поддерживает те же фильтры, что и список вакансий.",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}, "text/csv": {}}}})
+async def export_jobs(
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="Формат выгрузки"),
+    filters: JobFilters = Depends(get_job_filters),
+    service: JobService = Depends(get_job_service)
+):
+    try:
+        batches = service.iterate_jobs(filters=filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if format == "csv":
+        return StreamingResponse(
+            csv_stream(batches, [column.name for column in jobs.columns]),
+            media_type="text/csv; charset=utf-8",
+            headers={"Content-Disposition": 'attachment; filename="jobs.csv"'}
+        )
+    return StreamingResponse(ndjson_stream(batches), media_type="application/x-ndjson")
+
+
+@router.get("/stats", summary="Статистика зарплат",
+    description="Возвращает количество активных вакансий, минимум, максимум и перцентили (25/50/75/90) "
+                "'salary_from' и 'salary_to' — в целом и по месяцам создания. Можно сузить до работодателя (user_id) "
+                "или слова из названия (keyword), но не обоих сразу. Данные берутся из заранее посчитанной сводки, "
+                "значения округлены вниз до 1000.", response_model=JobStats)
+async def read_job_stats(
+    user_id: Optional[int] = Query(None, description="Статистика по работодателю"),
+    keyword: Optional[str] = Query(None, min_length=2, description="Статистика по слову из названия вакансии"),
+    period_from: Optional[date] = Query(None, description="С месяца, содержащего эту дату"),
+    period_to: Optional[date] = Query(None, description="По эту дату включительно"),
+    service: JobService = Depends(get_job_service)
+):
+    try:
+        return await service.get_stats(user_id, keyword, period_from, period_to)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/search", summary="Полнотекстовый поиск вакансий",
+    description="Ищет вакансии по словам из названия и описания с помощью полнотекстового индекса. "
+                "Результаты отсортированы по релевантности (совпадения в названии важнее), "
+                "для постраничной выдачи используйте 'limit' и 'offset'.", response_model=list[Job])
+async def search_jobs(
+    q: str = Query(..., min_length=1, max_length=200, description="Поисковый запрос"),
+    limit: int = Query(20, ge=1, le=100, description="Количество вакансий на странице"),
+    offset: int = Query(0, ge=0, le=1000, description="Сколько результатов пропустить"),
+    service: JobService = Depends(get_job_service)
+):
+    return model_response(list[Job], await service.search_jobs(q, limit, offset))
 
 
 @router.get("/{job_id}", summary="Получить вакансию по ID",
     description="Возвращает данные вакансии по указанному идентификатору. "
-                "Если вакансия не найдена — возвращается ошибка 404.", response_model=Job)
+                "Если вакансия не найдена — возвращается ошибка 404. "
+                "Поддерживает If-None-Match и If-Modified-Since: если вакансия не менялась, возвращается 304 без тела.",
+    response_model=Job)
 async def read_job(
     job_id: int,
+    request: Request,
+    response: Response,
     service: JobService = Depends(get_job_service)
 ):
     try:
-        return await service.get_job_by_id(job_id)
+        if is_conditional(request):
+            # Для проверки валидатора хватает updated_at — строку целиком не читаем
+            updated_at = await service.get_job_updated_at(job_id)
+            etag = make_etag(job_id, updated_at)
+            if is_not_modified(request, etag, updated_at):
+                return not_modified_response(etag, updated_at)
+        job = await service.get_job_by_id(job_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+    response.headers.update(validator_headers(make_etag(job.id, job.updated_at), job.updated_at))
+    return job
+
 
 @router.put("/{job_id}", summary="Обновить данные вакансии",
     description="Изменяет существующую вакансию. Проверяет, что пользователь (user_id) существует "
@@ -0,0 +1,88 @@
+from fastapi import APIRouter, Depends, Response
+from databases import Database
+from db.pool import ACQUIRE_BUCKETS_MS
+from db.replicas import ReplicaSet
+from dependencies import get_database, get_replicas, job_cache, user_cache, email_worker
+from auth import password_hasher, token_cache
+from utils.metrics import CONTENT_TYPE, Counter, Gauge, Histogram, Metric, registry
+
+
+router = APIRouter(tags=["Служебное"])
+
+
+def cache_metrics() -> list[Metric]:
+    hits = Counter("cache_hits_total", "Cache hits", ("cache",))
+    misses = Counter("cache_misses_total", "Cache misses", ("cache",))
+    evictions = Counter("cache_evictions_total", "Entries evicted by size limit", ("cache",))
+    size = Gauge("cache_size", "Entries in cache", ("cache",))
+    ratio = Gauge("cache_hit_ratio", "Hits / lookups since start", ("cache",))
+    for name, cache in (("jobs", job_cache), ("users", user_cache), ("tokens", token_cache)):
+        stats = cache.stats()
+        if not stats["enabled"]:
+            continue
+        hits.inc(name, amount=stats["hits"])
+        misses.inc(name, amount=stats["misses"])
+        evictions.inc(name, amount=stats["evictions"])
+        size.set(stats["size"], name)
+        ratio.set(stats["hit_ratio"], name)
+    return [hits, misses, evictions, size, ratio]
+
+
+def password_hasher_metrics() -> list[Metric]:
+    stats = password_hasher.stats()
+    queued = Gauge("password_hash_queued", "Argon2 operations waiting for a worker thread")
+    queued.set(stats["queued"])
+    running = Gauge("password_hash_running", "Argon2 operations being computed")
+    running.set(stats["running"])
+    rejected = Counter("password_hash_rejected_total", "Operations rejected because the queue was full")
+    rejected.inc(amount=stats["rejected"])
+    wait = Counter("password_hash_wait_seconds_total", "Total time operations spent in the queue")
+    wait.inc(amount=stats["wait_seconds_total"])
+    return [queued, running, rejected, wait]
+
+
+def email_worker_metrics() -> list[Metric]:
+    stats = email_worker.stats()
+    emails = Counter("email_outbox_messages_total", "Outbox messages by delivery result", ("result",))
+    for result in ("sent", "retried", "failed"):
+        emails.inc(result, amount=stats[result])
+    return [emails]
+
+
+def pool_metrics(databases: dict[str, Database]) -> list[Metric]:
+    in_use = Gauge("db_pool_connections_in_use", "Connections checked out", ("database",))
+    idle = Gauge("db_pool_connections_idle", "Open idle connections", ("database",))
+    max_size = Gauge("db_pool_max_size", "Connection limit", ("database",))
+    waiting = Gauge("db_pool_waiting", "Tasks waiting for a connection", ("database",))
+    timeouts = Counter("db_pool_acquire_timeouts_total", "Acquire attempts that timed out", ("database",))
+    acquire = Histogram(
+        "db_pool_acquire_seconds", "Time to acquire a connection", ("database",),
+        buckets=[bound / 1000 for bound in ACQUIRE_BUCKETS_MS],
+    )
+    for name, database in databases.items():
+        stats = database.pool_stats()
+        in_use.set(stats["in_use"], name)
+        idle.set(stats["idle"], name)
+        max_size.set(stats["max_size"], name)
+        waiting.set(stats["waiting"], name)
+        timeouts.inc(name, amount=stats["timeouts"])
+        acquire.load(list(stats["acquire_ms_histogram"].values()), stats["acquire_seconds_total"], name)
+    return [in_use, idle, max_size, waiting, timeouts, acquire]
+
+
+registry.register_collector(cache_metrics)
+registry.register_collector(password_hasher_metrics)
+registry.register_collector(email_worker_metrics)
+
+
+@router.get("/metrics", summary="Метрики в формате Prometheus",
+    description="Число и длительность HTTP-запросов по шаблонам маршрутов, запросы в обработке, длительность "
+                "запросов к БД по методам репозиториев, время Argon2, попадания кэшей, состояние пула соединений "
+                "и очереди писем. Формат — Prometheus text exposition 0.0.4.")
+async def metrics(
+    db: Database = Depends(get_database),
+    replicas: ReplicaSet = Depends(get_replicas)
+):
+    databases = {"primary": db}
+    databases.update((f"replica-{index}", replica) for index, replica in enumerate(replicas.replicas))
+    return Response(registry.render(pool_metrics(databases)), media_type=CONTENT_TYPE)
@@ -0,0 +1,41 @@
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from utils.profiling import ProfileStore
+from dependencies import get_profile_store, check_internal_token
+
+
+# Подключается в main только при PROFILING_ENABLED
+router = APIRouter(prefix="/internal", tags=["Служебное"], dependencies=[Depends(check_internal_token)])
+
+
+@router.get("/profiles", summary="Профили запросов",
+    description="Список последних профилей запросов (PROFILING_ENABLED): id, маршрут, статус, длительность, режим. "
+                "Запрос профилируется по заголовку X-Profile с PROFILING_TOKEN или по доле PROFILING_SAMPLE_RATE; "
+                "id профиля приходит в заголовке ответа X-Profile-Id.",
+    response_model=list[dict])
+async def list_profiles(store: ProfileStore = Depends(get_profile_store)):
+    return [profile.summary() for profile in store.list()]
+
+
+@router.get("/profiles/{profile_id}", summary="Профиль запроса",
+    description="Профиль одного запроса. format=text — топ функций по cumulative time; format=pstats — файл "
+                "для pstats.Stats / snakeviz (режим cprofile); format=collapsed — свёрнутые стеки для "
+                "flamegraph.pl / speedscope (режим sample).")
+async def get_profile(
+    profile_id: str,
+    format: Literal["text", "pstats", "collapsed"] = Query("text", description="Формат профиля"),
+    store: ProfileStore = Depends(get_profile_store)
+):
+    profile = store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    if profile.mode == "cprofile":
+        if format == "pstats":
+            return Response(profile.pstats_bytes(), media_type="application/octet-stream",
+                            headers={"Content-Disposition": f'attachment; filename="{profile.id}.pstats"'})
+        if format == "text":
+            return Response(profile.text(), media_type="text/plain")
+    elif format in ("collapsed", "text"):
+        return Response(profile.collapsed(), media_type="text/plain")
+    raise HTTPException(status_code=400, detail=f"Format {format} is not available for {profile.mode} profiles")
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, HTTPException, Depends
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
 from starlette import status
-from schemas import UserCreate, User
+from schemas import UserCreate, User, UserPage
 from services.user_service import UserService
 from dependencies import get_user_service
+from utils.serialization import model_response
+from utils.http_cache import make_etag, validator_headers, is_conditional, is_not_modified, not_modified_response
 
 
 router = APIRouter(prefix="/users", tags=["Пользователи"])
@@ -34,25 +37,46 @@ async def create_user(
         )
 
 
-@router.get("/", summary="Получить список всех пользователей",
-    description="Возвращает список всех зарегистрированных пользователей. "
-                "Данные отсортированы по дате регистрации (от новых к старым).", response_model=list[User])
-async def read_users(service: UserService = Depends(get_user_service)):
-    return await service.get_all_users()
+@router.get("/", summary="Получить список пользователей",
+    description="Возвращает страницу публичных профилей пользователей (без email и служебных полей). "
+                "Данные отсортированы по дате регистрации (от новых к старым). "
+                "Для следующей страницы передайте 'next_cursor' из ответа в параметр 'cursor'.", response_model=UserPage)
+async def read_users(
+    limit: int = Query(50, ge=1, le=500, description="Количество пользователей на странице"),
+    cursor: Optional[str] = Query(None, description="Курсор из 'next_cursor' предыдущей страницы"),
+    service: UserService = Depends(get_user_service)
+):
+    try:
+        page = await service.get_users_page(limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return model_response(UserPage, page)
 
 
 @router.get("/{user_id}", summary="Получить пользователя по ID",
     description="Возвращает данные пользователя по указанному идентификатору. "
-                "Если пользователь не найден — возвращается ошибка 404.", response_model=User)
+                "Если пользователь не найден — возвращается ошибка 404. "
+                "Поддерживает If-None-Match и If-Modified-Since: если данные не менялись, возвращается 304 без тела.",
+    response_model=User)
 async def read_user(
     user_id: int,
+    request: Request,
+    response: Response,
     service: UserService = Depends(get_user_service)
 ):
     try:
-        return await service.get_user_by_id(user_id)
+        if is_conditional(request):
+            updated_at = await service.get_user_updated_at(user_id)
+            etag = make_etag(user_id, updated_at)
+            if is_not_modified(request, etag, updated_at):
+                return not_modified_response(etag, updated_at)
+        user = await service.get_user_by_id(user_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+    response.headers.update(validator_headers(make_etag(user.id, user.updated_at), user.updated_at))
+    return user
+
 
 @router.put("/{user_id}", summary="Обновить данные пользователя",
     description="Изменяет данные существующего пользователя. Проверяет, что email или имя не заняты. "
@@ -1,35 +1,109 @@
-from db.base import database, metadata, engine
-from fastapi import FastAPI, Depends, HTTPException, status
+import asyncio
+from db.base import database, replicas, metadata, create_sync_engine
+from fastapi import FastAPI, BackgroundTasks, Depends, HTTPException, Request, status
 from contextlib import asynccontextmanager
 from fastapi.security import OAuth2PasswordRequestForm
-from endpoints import jobs, users, auth_rout
+from endpoints import jobs, users, auth_rout, internal, metrics, profiles
 from schemas import Token
-from dependencies import get_user_service
+from dependencies import get_user_service, email_worker, profile_store
 from services.user_service import UserService
-from auth import verify_password, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from auth import verify_password_async, password_needs_rehash, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES, password_hasher
 from datetime import timedelta
+from utils.serialization import FastJSONResponse
+from utils.hashing import PasswordHasherBusy
+from db.instrumentation import QueryLogMiddleware
+from db.pool import PoolTimeout
+from db.migrations import check_migration_state, stamp_head
+from utils.metrics import MetricsMiddleware
+from utils.profiling import ProfilingMiddleware
+from core.config import (
+    DEBUG, DB_STARTUP_MODE, METRICS_ENABLED, PROFILING_ENABLED, PROFILING_TOKEN, PROFILING_SAMPLE_RATE,
+    PROFILING_MODE, PROFILING_SAMPLE_INTERVAL_MS,
+)
+
+
+def create_all() -> None:
+    engine = create_sync_engine()
+    try:
+        metadata.create_all(bind=engine)
+    finally:
+        engine.dispose()
+
+
+async def prepare_schema() -> None:
+    if DB_STARTUP_MODE == "check":
+        await check_migration_state(database)
+    elif DB_STARTUP_MODE == "create_all":
+        # Синхронный движок — в отдельном потоке, чтобы не блокировать цикл событий
+        await asyncio.to_thread(create_all)
+        await stamp_head(database)
+    elif DB_STARTUP_MODE != "none":
+        raise ValueError(f"Unknown DB_STARTUP_MODE: {DB_STARTUP_MODE}")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Профили отдаются только по токену: без него профилирование не включаем вовсе
+    if PROFILING_ENABLED and not PROFILING_TOKEN:
+        raise ValueError("PROFILING_ENABLED requires PROFILING_TOKEN")
 
-    print("Подключено к базе данных")
-    metadata.create_all(bind=engine)
     await database.connect()
+    try:
+        await prepare_schema()
+    except BaseException:
+        await database.disconnect()
+        raise
+    print("Подключено к базе данных")
+    await replicas.connect()
     app.state.database = database
+    email_worker.start()
 
     yield
 
+    await email_worker.stop()
     print("Отключено от базы данных")
+    await replicas.disconnect()
     await database.disconnect()
+    password_hasher.shutdown()
+
+
+app = FastAPI(lifespan=lifespan, summary="Биржа труда", debug=DEBUG, default_response_class=FastJSONResponse)
+app.add_middleware(QueryLogMiddleware, expose_headers=DEBUG)
+if PROFILING_ENABLED:
+    # Выключено — middleware нет в цепочке, и обычные запросы ничего за него не платят
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=profile_store,
+        token=PROFILING_TOKEN,
+        sample_rate=PROFILING_SAMPLE_RATE,
+        mode=PROFILING_MODE,
+        sample_interval=PROFILING_SAMPLE_INTERVAL_MS / 1000,
+    )
+if METRICS_ENABLED:
+    # Внешний слой: в длительность входит всё, включая журнал запросов
+    app.add_middleware(MetricsMiddleware)
 
 
-app = FastAPI(lifespan=lifespan, summary="Биржа труда", debug=True)
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    # Очередь Argon2 переполнена: отказываем сразу, а не копим ожидающие запросы
+    return FastJSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+
+@app.exception_handler(PoolTimeout)
+async def pool_timeout_handler(request: Request, exc: PoolTimeout):
+    # Все соединения заняты дольше DB_POOL_ACQUIRE_TIMEOUT_SECONDS — БД перегружена, повторить позже
+    return FastJSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
 
 
 app.include_router(users.router)
 app.include_router(auth_rout.router)
 app.include_router(jobs.router)
+app.include_router(internal.router)
+if METRICS_ENABLED:
+    app.include_router(metrics.router)
+if PROFILING_ENABLED:
+    app.include_router(profiles.router)
 
 @app.get("/")
 def root():
@@ -38,12 +112,13 @@ def root():
 
 @app.post("/login", summary="Получение токена", description="Для авторизации", response_model=Token)
 async def login_for_access_token(
+    background_tasks: BackgroundTasks,
     form_data: OAuth2PasswordRequestForm = Depends(),
     user_service: UserService = Depends(get_user_service)
 ):
     # Ищем пользователя
     try:
-        user = await user_service.get_user_by_email(form_data.username)
+        user = await user_service.get_user_for_login(form_data.username)
     except ValueError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -51,13 +126,17 @@ async def login_for_access_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    if not verify_password(form_data.password, user.hashed_password):
+    if not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # Хеш с устаревшими параметрами Argon2 пересчитываем после отправки ответа
+    if password_needs_rehash(user.hashed_password):
+        background_tasks.add_task(user_service.rehash_password, user, form_data.password)
+
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={
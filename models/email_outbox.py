@@ -0,0 +1,27 @@
+from sqlalchemy import Table, Column, Integer, String, Text, DateTime, Index
+from db.base import metadata
+
+# Исходящие письма. Обработчик запроса только добавляет строку, отправляет фоновый
+# services.email_worker.EmailOutboxWorker: пачками, с повтором по экспоненциальной задержке
+EMAIL_PENDING = "pending"
+EMAIL_SENT = "sent"
+EMAIL_FAILED = "failed"
+
+email_outbox = Table(
+    "email_outbox",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("recipient", String, nullable=False),
+    Column("subject", String, nullable=False),
+    Column("template", String, nullable=False),
+    # Контекст шаблона в JSON: письмо рендерится воркером, а не в обработчике запроса
+    Column("context", Text, nullable=False),
+    Column("status", String, nullable=False),
+    Column("attempts", Integer, nullable=False),
+    Column("next_attempt_at", DateTime, nullable=False),
+    Column("last_error", Text),
+    Column("created_at", DateTime, nullable=False),
+    Column("sent_at", DateTime),
+    # Выборка очередной пачки: status = 'pending' AND next_attempt_at <= now ORDER BY next_attempt_at
+    Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+)
@@ -0,0 +1,19 @@
+from sqlalchemy import Table, Column, Integer, String, Date, PrimaryKeyConstraint
+from db.base import metadata
+
+# Сводка зарплат активных вакансий: гистограмма с шагом SALARY_BUCKET_WIDTH
+# по срезу (всё / работодатель / слово из названия), месяцу создания и полю зарплаты.
+# Поддерживается JobRepository при каждой записи, пересобирается командой commands.rebuild_job_stats
+SALARY_BUCKET_WIDTH = 1000
+
+job_salary_stats = Table(
+    "job_salary_stats",
+    metadata,
+    Column("dimension", String, nullable=False),
+    Column("dimension_value", String, nullable=False),
+    Column("period", Date, nullable=False),
+    Column("field", String, nullable=False),
+    Column("bucket", Integer, nullable=False),
+    Column("count", Integer, nullable=False, default=0),
+    PrimaryKeyConstraint("dimension", "dimension_value", "period", "field", "bucket"),
+)
@@ -1,4 +1,4 @@
-from sqlalchemy import Table, Column, Integer, String, Text, DateTime, Boolean, ForeignKey
+from sqlalchemy import Table, Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Index, DDL, event
 from db.base import metadata
 from datetime import datetime, timezone
 
@@ -11,7 +11,52 @@ jobs = Table(
     Column("description", Text),
     Column("salary_from", Integer),
     Column("salary_to", Integer),
+    # Требуемый опыт, лет (миграция 9d2936f5605d)
+    Column("experience", Integer, nullable=True),
     Column("is_active", Boolean, default=True, nullable=False),
     Column("created_at", DateTime, default=lambda: datetime.now(timezone.utc)),
     Column("updated_at", DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc)),
-)
\ No newline at end of file
+    # Keyset-пагинация: ORDER BY created_at DESC, id DESC
+    Index("ix_jobs_created_at_id", "created_at", "id"),
+    # Фильтры /jobs/: вакансии работодателя и только активные — в порядке выдачи, без сортировки;
+    # "платят не меньше X" — диапазон по salary_to среди активных
+    Index("ix_jobs_user_id_created_at_id", "user_id", "created_at", "id"),
+    Index("ix_jobs_is_active_created_at_id", "is_active", "created_at", "id"),
+    Index("ix_jobs_is_active_salary_to", "is_active", "salary_to"),
+)
+
+# Полнотекстовый индекс по title/description.
+# SQLite: внешняя FTS5-таблица поверх jobs, синхронизируется триггерами.
+# PostgreSQL: GIN-индекс по выражению JOBS_TSVECTOR (поиск обязан использовать то же выражение).
+JOBS_FTS_TABLE = "jobs_fts"
+SQLITE_FTS_TRIGGERS = ("jobs_fts_ai", "jobs_fts_ad", "jobs_fts_au")
+POSTGRES_FTS_INDEX = "ix_jobs_fts"
+
+JOBS_TSVECTOR = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+
+SQLITE_FTS_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {JOBS_FTS_TABLE} USING fts5("
+    "title, description, content='jobs', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TRIGGERS[0]} AFTER INSERT ON jobs BEGIN "
+    f"INSERT INTO {JOBS_FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TRIGGERS[1]} AFTER DELETE ON jobs BEGIN "
+    f"INSERT INTO {JOBS_FTS_TABLE}({JOBS_FTS_TABLE}, rowid, title, description) "
+    f"VALUES ('delete', old.id, old.title, old.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TRIGGERS[2]} AFTER UPDATE OF title, description ON jobs BEGIN "
+    f"INSERT INTO {JOBS_FTS_TABLE}({JOBS_FTS_TABLE}, rowid, title, description) "
+    f"VALUES ('delete', old.id, old.title, old.description); "
+    f"INSERT INTO {JOBS_FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+]
+
+POSTGRES_FTS_DDL = [
+    f"CREATE INDEX IF NOT EXISTS {POSTGRES_FTS_INDEX} ON jobs USING GIN (({JOBS_TSVECTOR}))",
+]
+
+for statement in SQLITE_FTS_DDL:
+    event.listen(jobs, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(jobs, "before_drop", DDL(f"DROP TABLE IF EXISTS {JOBS_FTS_TABLE}").execute_if(dialect="sqlite"))
+for statement in POSTGRES_FTS_DDL:
+    event.listen(jobs, "after_create", DDL(statement).execute_if(dialect="postgresql"))
@@ -1,4 +1,4 @@
-from sqlalchemy import Table, Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Table, Column, Integer, String, Boolean, DateTime, Index
 from db.base import metadata
 from datetime import datetime, timezone
 
@@ -13,4 +13,6 @@ users = Table(
     Column("is_verified", Boolean, default=False, nullable=False),
     Column("created_at", DateTime, default=lambda: datetime.now(timezone.utc)),
     Column("updated_at", DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc)),
+    # Keyset-пагинация списка пользователей: ORDER BY created_at DESC, id DESC
+    Index("ix_users_created_at_id", "created_at", "id"),
 )
\ No newline at end of file
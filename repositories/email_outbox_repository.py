@@ -0,0 +1,77 @@
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from databases import Database
+from sqlalchemy import select
+from models.email_outbox import email_outbox, EMAIL_PENDING, EMAIL_SENT, EMAIL_FAILED
+
+
+class EmailOutboxRepository:
+    def __init__(self, database: Database):
+        self.database = database
+
+    async def enqueue(self, recipient: str, subject: str, template: str, context: dict) -> int:
+        # Единственный запрос на пути HTTP-запроса — письмо отправит фоновый воркер
+        now = datetime.now(timezone.utc)
+        query = email_outbox.insert().values(
+            recipient=recipient,
+            subject=subject,
+            template=template,
+            context=json.dumps(context, ensure_ascii=False),
+            status=EMAIL_PENDING,
+            attempts=0,
+            next_attempt_at=now,
+            created_at=now,
+        )
+        return await self.database.execute(query)
+
+    async def claim_batch(self, limit: int, lease_seconds: float) -> list:
+        """
+        Забирает до limit писем, которым пора уйти, и сдвигает их next_attempt_at на время аренды —
+        другой воркер их не возьмёт, а если этот упадёт, письма вернутся в очередь сами.
+        """
+        now = datetime.now(timezone.utc)
+        due = (
+            select(email_outbox.c.id)
+            .where(email_outbox.c.status == EMAIL_PENDING)
+            .where(email_outbox.c.next_attempt_at <= now)
+            .order_by(email_outbox.c.next_attempt_at)
+            .limit(limit)
+        )
+        if self.database.url.dialect == "postgresql":
+            due = due.with_for_update(skip_locked=True)
+        query = (
+            email_outbox.update()
+            .where(email_outbox.c.id.in_(due.scalar_subquery()))
+            .values(next_attempt_at=now + timedelta(seconds=lease_seconds))
+            .returning(*email_outbox.c)
+        )
+        rows = await self.database.fetch_all(query)
+        return sorted(rows, key=lambda row: row["id"])
+
+    async def mark_sent(self, ids: list[int]) -> None:
+        if not ids:
+            return
+        query = (
+            email_outbox.update()
+            .where(email_outbox.c.id.in_(ids))
+            .values(
+                status=EMAIL_SENT,
+                attempts=email_outbox.c.attempts + 1,
+                sent_at=datetime.now(timezone.utc),
+                last_error=None,
+            )
+        )
+        await self.database.execute(query)
+
+    async def mark_failed_attempt(self, message_id: int, error: str, retry_at: Optional[datetime]) -> None:
+        # retry_at=None — попытки исчерпаны, письмо больше не отправляется
+        values = {"attempts": email_outbox.c.attempts + 1, "last_error": error[:1000]}
+        if retry_at is None:
+            values["status"] = EMAIL_FAILED
+        else:
+            values["next_attempt_at"] = retry_at
+        await self.database.execute(email_outbox.update().where(email_outbox.c.id == message_id).values(**values))
+
+    async def get_message(self, message_id: int):
+        return await self.database.fetch_one(email_outbox.select().where(email_outbox.c.id == message_id))
@@ -1,78 +1,311 @@
+import re
+from collections import Counter
+from typing import AsyncIterator, Optional
 from databases import Database
-from models import jobs
+from db.replicas import ReplicaSet
+from sqlalchemy import tuple_, select, table, column, func, literal, literal_column
+from models.jobs import jobs, JOBS_FTS_TABLE, JOBS_TSVECTOR
 from models.user import users
-from schemas import JobCreate, Job
-from datetime import datetime, timezone
+from db.errors import INTEGRITY_ERRORS
+from repositories.job_stats_repository import JobStatsRepository, stats_delta, stats_keys
+from schemas import JobCreate, Job, JobPage, JobFilters, JobBulkError, JobStats
+from utils.pagination import encode_cursor, decode_cursor
+from utils.serialization import get_adapter
+from datetime import date, datetime, timezone
+
+
+jobs_fts = table(JOBS_FTS_TABLE, column("rowid"))
+
+
+def _fts5_match_expression(q: str) -> str:
+    # Каждое слово — отдельная фраза в кавычках: пользовательский ввод не ломает синтаксис MATCH
+    return " ".join(f'"{word}"' for word in re.findall(r"\w+", q))
+
+
+class BulkValidationError(ValueError):
+    def __init__(self, errors: list[JobBulkError]):
+        super().__init__("Bulk validation failed")
+        self.errors = errors
 
 
 class JobRepository:
-    def __init__(self, database: Database):
+    def __init__(self, database: Database, replicas: Optional[ReplicaSet] = None):
         self.database = database
+        self.replicas = replicas or ReplicaSet()
+        # Сводка зарплат обновляется в той же транзакции, что и сама вакансия
+        self.stats = JobStatsRepository(database, self.replicas)
 
-    async def create_job(self, job: JobCreate):
-        # Проверка существования пользователя
-        query = users.select().where(users.c.id == job.user_id)
-        user = await self.database.fetch_one(query)
-        if not user:
-            raise ValueError("User not found")
+    @property
+    def read_database(self) -> Database:
+        # Чтения, которым допустимо отставание реплики. Записи и чтения внутри транзакций — только self.database
+        return self.replicas.choose(self.database)
 
+    async def create_job(self, job: JobCreate):
         # Проверка зарплаты
         if job.salary_from > job.salary_to:
             raise ValueError("salary_from cannot be greater than salary_to")
 
-        # Создание вакансии
-        insert_query = jobs.insert().values(
-            user_id=job.user_id,
-            title=job.title,
-            description=job.description,
-            salary_from=job.salary_from,
-            salary_to=job.salary_to,
-            is_active=job.is_active or True,
+        # INSERT ... SELECT ... WHERE EXISTS RETURNING: проверка пользователя, вставка и чтение
+        # созданной строки за один запрос (databases не применяет Python-default колонок — даты ставим явно)
+        now = datetime.now(timezone.utc)
+        values = {
+            "user_id": job.user_id,
+            "title": job.title,
+            "description": job.description,
+            "salary_from": job.salary_from,
+            "salary_to": job.salary_to,
+            "is_active": job.is_active,
+            "created_at": now,
+            "updated_at": now,
+        }
+        source = select(*(literal(value, jobs.c[name].type) for name, value in values.items())).where(
+            select(users.c.id).where(users.c.id == job.user_id).exists()
         )
-        last_record_id = await self.database.execute(insert_query)
-        return await self.get_job_by_id(last_record_id)
+        query = jobs.insert().from_select(list(values), source).returning(*jobs.c)
+        try:
+            async with self.database.transaction():
+                row = await self.database.fetch_one(query)
+                if row:
+                    await self.stats.apply_change(None, row)
+        except INTEGRITY_ERRORS:
+            # Пользователя удалили между проверкой и вставкой — сработал FOREIGN KEY
+            row = None
+        if not row:
+            raise ValueError("User not found")
+        return Job(**dict(row))
+
+    async def create_jobs_bulk(
+        self, new_jobs: list[JobCreate], partial: bool = False
+    ) -> tuple[list[Job], list[JobBulkError]]:
+        # Проверка зарплаты — до любых запросов к БД
+        errors = [
+            JobBulkError(index=index, detail="salary_from cannot be greater than salary_to")
+            for index, job in enumerate(new_jobs)
+            if job.salary_from > job.salary_to
+        ]
+        failed = {error.index for error in errors}
+
+        # Каждый user_id проверяется один раз, одним запросом на всю пачку
+        user_ids = {job.user_id for index, job in enumerate(new_jobs) if index not in failed}
+        rows = await self.database.fetch_all(select(users.c.id).where(users.c.id.in_(user_ids))) if user_ids else []
+        existing = {row[0] for row in rows}
+        for index, job in enumerate(new_jobs):
+            if index not in failed and job.user_id not in existing:
+                errors.append(JobBulkError(index=index, detail="User not found"))
+                failed.add(index)
+
+        errors.sort(key=lambda error: error.index)
+        if errors and not partial:
+            raise BulkValidationError(errors)
+
+        now = datetime.now(timezone.utc)
+        values = [
+            {
+                "user_id": job.user_id,
+                "title": job.title,
+                "description": job.description,
+                "salary_from": job.salary_from,
+                "salary_to": job.salary_to,
+                "is_active": job.is_active,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for index, job in enumerate(new_jobs)
+            if index not in failed
+        ]
+        if not values:
+            return [], errors
+
+        # Одна транзакция и один многострочный INSERT ... RETURNING: созданные строки приходят сразу,
+        # без повторного SELECT
+        async with self.database.transaction():
+            rows = await self.database.fetch_all(jobs.insert().values(values).returning(*jobs.c))
+            delta = Counter()
+            for row in rows:
+                delta.update(stats_delta(None, row))
+            await self.stats.apply(delta)
+        created = sorted((Job(**dict(row)) for row in rows), key=lambda job: job.id)
+        return created, errors
 
-    async def get_all_jobs(self):
-        query = jobs.select().order_by(jobs.c.created_at.desc())
-        rows = await self.database.fetch_all(query)
-        return [Job(**dict(row)) for row in rows]
+    @staticmethod
+    def _apply_filters(query, filters: Optional[JobFilters]):
+        if filters is None:
+            return query
+        if (
+            filters.salary_min is not None
+            and filters.salary_max is not None
+            and filters.salary_min > filters.salary_max
+        ):
+            raise ValueError("salary_min cannot be greater than salary_max")
 
-    async def get_job_by_id(self, job_id: int):
+        if filters.is_active is not None:
+            query = query.where(jobs.c.is_active == filters.is_active)
+        if filters.user_id is not None:
+            query = query.where(jobs.c.user_id == filters.user_id)
+        # Пересечение вилок: [salary_from, salary_to] ∩ [salary_min, salary_max] не пусто
+        if filters.salary_min is not None:
+            query = query.where(jobs.c.salary_to >= filters.salary_min)
+        if filters.salary_max is not None:
+            query = query.where(jobs.c.salary_from <= filters.salary_max)
+        if filters.created_after is not None:
+            # created_at хранится как UTC без часового пояса
+            created_after = filters.created_after
+            if created_after.tzinfo is not None:
+                created_after = created_after.astimezone(timezone.utc).replace(tzinfo=None)
+            query = query.where(jobs.c.created_at >= created_after)
+        return query
+
+    async def get_jobs_page(
+        self, limit: int, cursor: Optional[str] = None, filters: Optional[JobFilters] = None
+    ) -> JobPage:
+        # Keyset-пагинация по индексу (created_at, id): цена страницы не зависит от глубины
+        query = jobs.select().order_by(jobs.c.created_at.desc(), jobs.c.id.desc())
+        query = self._apply_filters(query, filters)
+        if cursor:
+            created_at, job_id = decode_cursor(cursor)
+            query = query.where(tuple_(jobs.c.created_at, jobs.c.id) < tuple_(created_at, job_id))
+
+        # Берём на одну запись больше, чтобы понять, есть ли следующая страница
+        rows = await self.read_database.fetch_all(query.limit(limit + 1))
+        # Вся страница валидируется одним вызовом закэшированного TypeAdapter (pydantic-core)
+        items = get_adapter(list[Job]).validate_python([dict(row) for row in rows[:limit]])
+
+        next_cursor = None
+        if len(rows) > limit:
+            last = items[-1]
+            next_cursor = encode_cursor(last.created_at, last.id)
+        return JobPage.model_construct(items=items, next_cursor=next_cursor)
+
+    def iterate_jobs(self, batch_size: int = 1000, filters: Optional[JobFilters] = None) -> AsyncIterator[list]:
+        # Фильтры проверяются сразу, а не при первом next() — ошибка не должна прийти посреди потока
+        query = self._apply_filters(jobs.select().order_by(jobs.c.id).limit(batch_size), filters)
+        # Вся выгрузка читается с одной реплики
+        return self._iterate_batches(query, batch_size, self.read_database)
+
+    async def _iterate_batches(self, query, batch_size: int, database: Database) -> AsyncIterator[list]:
+        # Keyset по первичному ключу: в памяти не больше одной пачки, соединение не держится между пачками
+        last_id = 0
+        while True:
+            rows = await database.fetch_all(query.where(jobs.c.id > last_id))
+            if not rows:
+                return
+            yield rows
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1]["id"]
+
+    async def search_jobs(self, q: str, limit: int, offset: int = 0) -> list[Job]:
+        # Поиск идёт только по полнотекстовому индексу, результаты отсортированы по релевантности
+        if self.database.url.dialect == "postgresql":
+            tsvector = literal_column(f"({JOBS_TSVECTOR})")
+            tsquery = func.plainto_tsquery("simple", q)
+            query = (
+                jobs.select()
+                .where(tsvector.op("@@")(tsquery))
+                .order_by(func.ts_rank(tsvector, tsquery).desc(), jobs.c.id.desc())
+            )
+        else:
+            match = _fts5_match_expression(q)
+            if not match:
+                return []
+            query = (
+                select(jobs)
+                .select_from(jobs_fts.join(jobs, jobs.c.id == jobs_fts.c.rowid))
+                .where(literal_column(JOBS_FTS_TABLE).op("MATCH")(match))
+                # bm25: меньше — релевантнее; совпадение в заголовке весит больше, чем в описании
+                .order_by(func.bm25(literal_column(JOBS_FTS_TABLE), 10.0, 1.0), jobs.c.id.desc())
+            )
+
+        rows = await self.read_database.fetch_all(query.limit(limit).offset(offset))
+        return get_adapter(list[Job]).validate_python([dict(row) for row in rows])
+
+    async def get_job_updated_at(self, job_id: int) -> datetime:
+        query = select(jobs.c.updated_at).where(jobs.c.id == job_id)
+        row = await self.read_database.fetch_one(query)
+        if not row:
+            raise ValueError("Job not found")
+        return row[0]
+
+    async def get_job_by_id(self, job_id: int, primary: bool = False):
+        # primary=True — для наполнения кэша: строка с отстающей реплики вернула бы в него удалённую вакансию
         query = jobs.select().where(jobs.c.id == job_id)
-        row = await self.database.fetch_one(query)
+        row = await (self.database if primary else self.read_database).fetch_one(query)
         if not row:
             raise ValueError("Job not found")
         return Job(**dict(row))
 
     async def update_job(self, job_id: int, job: JobCreate):
-        # Проверка существования вакансии
-        await self.get_job_by_id(job_id)
-
-        # Проверка пользователя
-        query = users.select().where(users.c.id == job.user_id)
-        user = await self.database.fetch_one(query)
-        if not user:
-            raise ValueError("User not found")
-
         # Проверка зарплаты
         if job.salary_from > job.salary_to:
             raise ValueError("salary_from cannot be greater than salary_to")
 
-        # Обновление
-        query = jobs.update().where(jobs.c.id == job_id).values(
-            user_id=job.user_id,
-            title=job.title,
-            description=job.description,
-            salary_from=job.salary_from,
-            salary_to=job.salary_to,
-            is_active=job.is_active,
-            updated_at=datetime.now(timezone.utc)
+        # Обновление с проверкой пользователя и возвратом строки — один запрос.
+        # Прежние значения нужны сводке зарплат: читаем их с блокировкой строки в той же транзакции
+        query = (
+            jobs.update()
+            .where(jobs.c.id == job_id)
+            .where(select(users.c.id).where(users.c.id == job.user_id).exists())
+            .values(
+                user_id=job.user_id,
+                title=job.title,
+                description=job.description,
+                salary_from=job.salary_from,
+                salary_to=job.salary_to,
+                is_active=job.is_active,
+                updated_at=datetime.now(timezone.utc)
+            )
+            .returning(*jobs.c)
         )
-        await self.database.execute(query)
-        return await self.get_job_by_id(job_id)
+        async with self.database.transaction():
+            old = await self.database.fetch_one(jobs.select().where(jobs.c.id == job_id).with_for_update())
+            if not old:
+                raise ValueError("Job not found")
+            try:
+                row = await self.database.fetch_one(query)
+            except INTEGRITY_ERRORS:
+                row = None
+            if not row:
+                raise ValueError("User not found")
+            await self.stats.apply_change(old, row)
+        return Job(**dict(row))
 
     async def delete_job(self, job_id: int):
-        await self.get_job_by_id(job_id)
-        query = jobs.delete().where(jobs.c.id == job_id)
-        await self.database.execute(query)
-        return True
\ No newline at end of file
+        query = jobs.delete().where(jobs.c.id == job_id).returning(*jobs.c)
+        async with self.database.transaction():
+            row = await self.database.fetch_one(query)
+            if not row:
+                raise ValueError("Job not found")
+            await self.stats.apply_change(row, None)
+        return True
+
+    async def get_stats(
+        self,
+        user_id: Optional[int] = None,
+        keyword: Optional[str] = None,
+        period_from: Optional[date] = None,
+        period_to: Optional[date] = None,
+    ) -> JobStats:
+        if user_id is not None and keyword is not None:
+            raise ValueError("Specify either user_id or keyword, not both")
+        if user_id is not None:
+            return await self.stats.get_stats("employer", str(user_id), period_from, period_to)
+        if keyword is not None:
+            return await self.stats.get_stats("keyword", keyword.lower(), period_from, period_to)
+        return await self.stats.get_stats("all", "", period_from, period_to)
+
+    async def rebuild_stats(self, batch_size: int = 1000) -> int:
+        # Полная пересборка сводки по таблице jobs; возвращает число учтённых вакансий
+        processed = 0
+        async with self.database.transaction():
+            await self.stats.lock()
+            await self.stats.clear()
+            delta = Counter()
+            # Внутри транзакции — только основная БД
+            query = self._apply_filters(jobs.select().order_by(jobs.c.id).limit(batch_size), JobFilters(is_active=True))
+            async for batch in self._iterate_batches(query, batch_size, self.database):
+                for row in batch:
+                    # _mapping — строка драйвера без поколоночной обработки Record из databases
+                    delta.update(stats_keys(row._mapping))
+                processed += len(batch)
+            await self.stats.load(delta)
+        return processed
@@ -0,0 +1,181 @@
+import re
+from collections import Counter
+from datetime import date
+from typing import Iterable, Mapping, Optional
+from databases import Database
+from db.replicas import ReplicaSet
+from sqlalchemy import select, func
+from sqlalchemy.dialects import postgresql, sqlite
+from models.job_stats import job_salary_stats, SALARY_BUCKET_WIDTH
+from schemas import JobStats, JobStatsPeriod, SalaryStats
+
+
+SALARY_FIELDS = ("salary_from", "salary_to")
+PERCENTILES = (25, 50, 75, 90)
+# Сколько слов названия попадает в срез по ключевым словам
+MAX_TITLE_KEYWORDS = 10
+# Ограничение числа строк в одном INSERT (лимит параметров SQLite)
+UPSERT_CHUNK = 500
+
+
+def title_keywords(title: Optional[str]) -> list[str]:
+    words = []
+    for word in re.findall(r"\w+", (title or "").lower()):
+        if len(word) > 1 and word not in words:
+            words.append(word)
+    return words[:MAX_TITLE_KEYWORDS]
+
+
+def stats_keys(job: Mapping) -> Iterable[tuple]:
+    """
+    Ключи гистограммы, в которые попадает одна вакансия. Закрытые вакансии в сводку не входят.
+    """
+    created_at = job["created_at"]
+    if not job["is_active"] or created_at is None:
+        return
+    period = date(created_at.year, created_at.month, 1)
+    dimensions = [("all", ""), ("employer", str(job["user_id"]))]
+    dimensions += [("keyword", word) for word in title_keywords(job["title"])]
+    for field in SALARY_FIELDS:
+        if job[field] is None:
+            continue
+        bucket = job[field] // SALARY_BUCKET_WIDTH * SALARY_BUCKET_WIDTH
+        for dimension, value in dimensions:
+            yield dimension, value, period, field, bucket
+
+
+def stats_delta(old: Optional[Mapping], new: Optional[Mapping]) -> Counter:
+    delta = Counter()
+    if old is not None:
+        delta.subtract(stats_keys(old))
+    if new is not None:
+        delta.update(stats_keys(new))
+    return delta
+
+
+def _summarize(histogram: Mapping[int, int]) -> Optional[SalaryStats]:
+    buckets = sorted((bucket, count) for bucket, count in histogram.items() if count > 0)
+    total = sum(count for _, count in buckets)
+    if not total:
+        return None
+
+    percentiles = {}
+    cumulative = 0
+    targets = iter(PERCENTILES)
+    target = next(targets)
+    for bucket, count in buckets:
+        cumulative += count
+        while target is not None and cumulative * 100 >= target * total:
+            percentiles[f"p{target}"] = bucket
+            target = next(targets, None)
+
+    return SalaryStats(min=buckets[0][0], max=buckets[-1][0], **percentiles)
+
+
+class JobStatsRepository:
+    def __init__(self, database: Database, replicas: Optional[ReplicaSet] = None):
+        self.database = database
+        self.replicas = replicas or ReplicaSet()
+
+    def _upsert(self, rows: list[dict]):
+        insert = postgresql.insert if self.database.url.dialect == "postgresql" else sqlite.insert
+        query = insert(job_salary_stats).values(rows)
+        return query.on_conflict_do_update(
+            index_elements=["dimension", "dimension_value", "period", "field", "bucket"],
+            set_={"count": job_salary_stats.c.count + query.excluded.count},
+        )
+
+    async def apply(self, delta: Counter) -> None:
+        # Вызывается внутри транзакции записи вакансии. Строки идут в порядке ключа: параллельные
+        # транзакции блокируют общие строки сводки в одном порядке и не ловят дедлок (Postgres)
+        rows = [
+            {"dimension": dimension, "dimension_value": value, "period": period,
+             "field": field, "bucket": bucket, "count": count}
+            for (dimension, value, period, field, bucket), count in sorted(delta.items())
+            if count
+        ]
+        for start in range(0, len(rows), UPSERT_CHUNK):
+            await self.database.execute(self._upsert(rows[start:start + UPSERT_CHUNK]))
+
+    async def lock(self) -> None:
+        """
+        Для полной пересборки (внутри её транзакции). В Postgres конкурентная запись вакансии иначе может
+        закоммитить upsert нового ключа, пока пересборка сканирует jobs, и load упадёт на дубликате ключа.
+        EXCLUSIVE не мешает читать сводку, а записи ждут конца пересборки и применяют дельту поверх неё.
+        В SQLite писатель и так один: транзакция начинается с BEGIN IMMEDIATE.
+        """
+        if self.database.url.dialect == "postgresql":
+            await self.database.execute(f"LOCK TABLE {job_salary_stats.name} IN EXCLUSIVE MODE")
+
+    async def load(self, delta: Counter) -> None:
+        """
+        Заливает сводку в пустую таблицу (после clear) одним executemany драйвера: при полной пересборке
+        строк сотни тысяч, и компиляция upsert пачками по UPSERT_CHUNK занимает минуты.
+        """
+        postgres = self.database.url.dialect == "postgresql"
+        rows = [
+            (dimension, value, period if postgres else period.isoformat(), field, bucket, count)
+            for (dimension, value, period, field, bucket), count in delta.items()
+            if count
+        ]
+        placeholders = ", ".join(f"${i}" for i in range(1, 7)) if postgres else ", ".join("?" * 6)
+        query = (
+            f"INSERT INTO {job_salary_stats.name} (dimension, dimension_value, period, field, bucket, count) "
+            f"VALUES ({placeholders})"
+        )
+        async with self.database.connection() as connection:
+            await connection.raw_connection.executemany(query, rows)
+
+    async def apply_change(self, old: Optional[Mapping], new: Optional[Mapping]) -> None:
+        await self.apply(stats_delta(old, new))
+
+    async def get_stats(
+        self,
+        dimension: str = "all",
+        value: str = "",
+        period_from: Optional[date] = None,
+        period_to: Optional[date] = None,
+    ) -> JobStats:
+        # Читаем только сводку: объём работы зависит от числа корзин, а не от размера jobs
+        query = (
+            select(
+                job_salary_stats.c.period,
+                job_salary_stats.c.field,
+                job_salary_stats.c.bucket,
+                func.sum(job_salary_stats.c.count).label("count"),
+            )
+            .where(job_salary_stats.c.dimension == dimension)
+            .where(job_salary_stats.c.dimension_value == value)
+            .group_by(job_salary_stats.c.period, job_salary_stats.c.field, job_salary_stats.c.bucket)
+        )
+        if period_from is not None:
+            query = query.where(job_salary_stats.c.period >= date(period_from.year, period_from.month, 1))
+        if period_to is not None:
+            query = query.where(job_salary_stats.c.period <= period_to)
+        # Сводка допускает отставание реплики
+        rows = await self.replicas.choose(self.database).fetch_all(query)
+
+        totals = {field: Counter() for field in SALARY_FIELDS}
+        periods: dict[date, dict[str, Counter]] = {}
+        for row in rows:
+            period, field, bucket, count = row["period"], row["field"], row["bucket"], row["count"]
+            totals[field][bucket] += count
+            periods.setdefault(period, {name: Counter() for name in SALARY_FIELDS})[field][bucket] += count
+
+        return JobStats(
+            count=sum(count for count in totals["salary_from"].values() if count > 0),
+            salary_from=_summarize(totals["salary_from"]),
+            salary_to=_summarize(totals["salary_to"]),
+            periods=[
+                JobStatsPeriod(
+                    period=period,
+                    count=sum(count for count in histograms["salary_from"].values() if count > 0),
+                    salary_from=_summarize(histograms["salary_from"]),
+                    salary_to=_summarize(histograms["salary_to"]),
+                )
+                for period, histograms in sorted(periods.items())
+            ],
+        )
+
+    async def clear(self) -> None:
+        await self.database.execute(job_salary_stats.delete())
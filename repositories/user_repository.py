@@ -1,93 +1,134 @@
 from databases import Database
+from db.replicas import ReplicaSet
+from typing import Optional
+from sqlalchemy import select, exists, tuple_
 from models.user import users
-from schemas import UserCreate, User
+from models.jobs import jobs
+from db.errors import INTEGRITY_ERRORS
+from schemas import UserCreate, User, UserInDB, UserPage, UserPublic
 from datetime import datetime, timezone
-from auth import get_password_hash
+from auth import get_password_hash_async
+from utils.serialization import get_adapter
+from utils.pagination import encode_cursor, decode_cursor
 
 
 class UserRepository:
-    def __init__(self, database: Database):
+    def __init__(self, database: Database, replicas: Optional[ReplicaSet] = None):
         self.database = database
+        self.replicas = replicas or ReplicaSet()
 
-    async def create_user(self, user: UserCreate):
-        # Проверка уникальности email и name
-        query = users.select().where(
-            (users.c.email == user.email) | (users.c.name == user.name)
-        )
-        existing_user = await self.database.fetch_one(query)
-        if existing_user:
-            raise ValueError("Email or name already registered")
+    @property
+    def read_database(self) -> Database:
+        # Чтения, которым допустимо отставание реплики. Вход и подтверждение email читают основную БД
+        return self.replicas.choose(self.database)
 
-        # Вставляем нового пользователя
+    async def create_user(self, user: UserCreate):
+        # Уникальность email и name обеспечивают UNIQUE-индексы — отдельный SELECT не нужен.
+        # databases не применяет Python-default колонок — даты ставим явно
+        now = datetime.now(timezone.utc)
         insert_query = users.insert().values(
             email=user.email,
             name=user.name,
-            hashed_password=get_password_hash(user.password),
+            hashed_password=await get_password_hash_async(user.password),
             is_company=user.is_company,
             is_verified=False,
-        )
-        last_record_id = await self.database.execute(insert_query)
+            created_at=now,
+            updated_at=now,
+        ).returning(*users.c)
+        try:
+            row = await self.database.fetch_one(insert_query)
+        except INTEGRITY_ERRORS:
+            raise ValueError("Email or name already registered")
+        return User(**dict(row))
 
-        # Возвращаем созданного пользователя
-        return User(
-            id=last_record_id,
-            **user.model_dump(),
-            created_at=datetime.now(timezone.utc),
-            updated_at=datetime.now(timezone.utc)
-        )
+    async def get_users_page(self, limit: int, cursor: Optional[str] = None) -> UserPage:
+        # Только колонки публичного профиля (без hashed_password) и keyset по индексу (created_at, id)
+        columns = [users.c[name] for name in UserPublic.model_fields]
+        query = select(*columns).order_by(users.c.created_at.desc(), users.c.id.desc())
+        if cursor:
+            created_at, user_id = decode_cursor(cursor)
+            query = query.where(tuple_(users.c.created_at, users.c.id) < tuple_(created_at, user_id))
+
+        rows = await self.read_database.fetch_all(query.limit(limit + 1))
+        items = get_adapter(list[UserPublic]).validate_python([dict(row) for row in rows[:limit]])
 
-    async def get_all_users(self):
-        query = users.select()
-        rows = await self.database.fetch_all(query)
-        return [User(**dict(row)) for row in rows]
+        next_cursor = None
+        if len(rows) > limit:
+            last = items[-1]
+            next_cursor = encode_cursor(last.created_at, last.id)
+        return UserPage.model_construct(items=items, next_cursor=next_cursor)
 
-    async def get_user_by_id(self, user_id: int):
+    async def get_user_by_id(self, user_id: int, primary: bool = False):
+        # primary=True — для наполнения кэша: строка с отстающей реплики вернула бы в него удалённого пользователя
         query = users.select().where(users.c.id == user_id)
-        row = await self.database.fetch_one(query)
+        row = await (self.database if primary else self.read_database).fetch_one(query)
         if not row:
             raise ValueError("User not found")
-        return User(**dict(row))
+        return UserInDB(**dict(row))
 
-    async def update_user(self, user_id: int, user: UserCreate):
-        # Проверяем существование
-        await self.get_user_by_id(user_id)
-
-        # Проверка уникальности (кроме текущего пользователя)
-        query = users.select().where(
-            (users.c.id != user_id) &
-            ((users.c.email == user.email) | (users.c.name == user.name))
-        )
-        conflict = await self.database.fetch_one(query)
-        if conflict:
-            raise ValueError("Email or name already in use")
+    async def get_user_updated_at(self, user_id: int) -> datetime:
+        query = select(users.c.updated_at).where(users.c.id == user_id)
+        row = await self.read_database.fetch_one(query)
+        if not row:
+            raise ValueError("User not found")
+        return row[0]
 
-        # Обновляем пользователя
+    async def update_user(self, user_id: int, user: UserCreate):
+        # Конфликт email/name ловим по UNIQUE-индексу, существование — по числу обновлённых строк
         query = users.update().where(users.c.id == user_id).values(
             email=user.email,
             name=user.name,
-            hashed_password=user.password,
+            hashed_password=await get_password_hash_async(user.password),
             is_company=user.is_company,
             updated_at=datetime.now(timezone.utc)
+        ).returning(*users.c)
+        try:
+            row = await self.database.fetch_one(query)
+        except INTEGRITY_ERRORS:
+            raise ValueError("Email or name already in use")
+        if not row:
+            raise ValueError("User not found")
+        return UserInDB(**dict(row))
+
+    async def update_password_hash(self, user_id: int, old_hash: str, new_hash: str) -> bool:
+        # Compare-and-set: не затираем пароль, если его успели сменить параллельно.
+        # updated_at оставляем прежним явно: иначе databases подставит NULL вместо onupdate
+        query = (
+            users.update()
+            .where(users.c.id == user_id)
+            .where(users.c.hashed_password == old_hash)
+            .values(hashed_password=new_hash, updated_at=users.c.updated_at)
+            .returning(users.c.id)
         )
-        await self.database.execute(query)
-        return await self.get_user_by_id(user_id)
+        return await self.database.fetch_one(query) is not None
 
     async def delete_user(self, user_id: int):
-        # Проверка наличия активных вакансий
-        from models import jobs
-        job_query = jobs.select().where(jobs.c.user_id == user_id).where(jobs.c.is_active == True)
-        active_jobs = await self.database.fetch_all(job_query)
-        if active_jobs:
-            raise ValueError("Cannot delete user with active jobs")
+        # Проверка активных вакансий — подзапрос EXISTS в самом DELETE, без выборки вакансий
+        has_active_jobs = exists().where(jobs.c.user_id == user_id).where(jobs.c.is_active == True)
+        query = users.delete().where(users.c.id == user_id).where(~has_active_jobs).returning(users.c.id)
+        try:
+            if await self.database.fetch_one(query) is not None:
+                return True
+        except INTEGRITY_ERRORS:
+            # Закрытые вакансии ссылаются на пользователя (при включённых внешних ключах)
+            raise ValueError("Cannot delete user with jobs")
 
-        # Удаляем
-        query = users.delete().where(users.c.id == user_id)
-        await self.database.execute(query)
-        return True
+        # Ничего не удалено: второй запрос только на этом пути, чтобы объяснить причину
+        if await self.database.fetch_val(select(has_active_jobs)):
+            raise ValueError("Cannot delete user with active jobs")
+        return False
 
     async def get_user_by_email(self, email: str):
         query = users.select().where(users.c.email == email)
         row = await self.database.fetch_one(query)
         if not row:
             raise ValueError("User not found")
-        return User(**dict(row))
\ No newline at end of file
+        return UserInDB(**dict(row))
+
+    async def verify_user(self, email: str):
+        query = users.update().where(users.c.email == email).values(
+            is_verified=True,
+            updated_at=datetime.now(timezone.utc)
+        )
+        await self.database.execute(query)
+        return await self.get_user_by_email(email)
@@ -1,14 +1,17 @@
 from pydantic import BaseModel, ConfigDict, Field
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 
 
-class UserCreate(BaseModel):
+class UserBase(BaseModel):
     email: str = Field(..., min_length=5)
     name: str = Field(..., min_length=2)
-    password: str = Field(..., min_length=6)
     is_company: Optional[bool] = False
 
+
+class UserCreate(UserBase):
+    password: str = Field(..., min_length=6)
+
     model_config = ConfigDict(
         json_schema_extra={
             "examples": [
@@ -23,7 +26,7 @@ class UserCreate(BaseModel):
     )
 
 
-class User(UserCreate):
+class User(UserBase):
     id: int
     is_verified: bool = False
     created_at: datetime
@@ -47,6 +50,51 @@ class User(UserCreate):
     )
 
 
+class UserInDB(User):
+    hashed_password: str
+
+
+class UserPublic(BaseModel):
+    # Публичный профиль: только колонки, которые нужны списку пользователей
+    id: int
+    name: str
+    is_company: Optional[bool] = False
+    is_verified: bool = False
+    created_at: datetime
+
+
+class UserPage(BaseModel):
+    items: list[UserPublic]
+    next_cursor: Optional[str] = None
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "examples": [
+                {
+                    "items": [
+                        {
+                            "id": 1,
+                            "name": "JohnDoe",
+                            "is_company": False,
+                            "is_verified": True,
+                            "created_at": "2025-04-05T12:00:00Z"
+                        }
+                    ],
+                    "next_cursor": "WyIyMDI1LTA0LTA1VDEyOjAwOjAwIiwgMV0"
+                }
+            ]
+        }
+    )
+
+
+class CurrentUser(BaseModel):
+    # Пользователь из claims access-токена, без обращения к БД
+    id: int
+    email: Optional[str] = None
+    name: Optional[str] = None
+    is_company: bool = False
+
+
 class JobCreate(BaseModel):
     user_id: int
     title: str
@@ -96,6 +144,94 @@ class Job(JobCreate):
     )
 
 
+class JobBulkError(BaseModel):
+    index: int
+    detail: str
+
+
+class JobBulkResult(BaseModel):
+    created: list[Job]
+    errors: list[JobBulkError] = []
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "examples": [
+                {
+                    "created": [],
+                    "errors": [{"index": 1, "detail": "salary_from cannot be greater than salary_to"}]
+                }
+            ]
+        }
+    )
+
+
+class JobFilters(BaseModel):
+    is_active: Optional[bool] = None
+    salary_min: Optional[int] = None
+    salary_max: Optional[int] = None
+    user_id: Optional[int] = None
+    created_after: Optional[datetime] = None
+
+
+class JobPage(BaseModel):
+    items: list[Job]
+    next_cursor: Optional[str] = None
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "examples": [
+                {
+                    "items": [],
+                    "next_cursor": "WyIyMDI1LTA0LTA1VDEyOjAwOjAwIiwgMV0"
+                }
+            ]
+        }
+    )
+
+
+class SalaryStats(BaseModel):
+    min: int
+    max: int
+    p25: int
+    p50: int
+    p75: int
+    p90: int
+
+
+class JobStatsPeriod(BaseModel):
+    period: date
+    count: int
+    salary_from: Optional[SalaryStats] = None
+    salary_to: Optional[SalaryStats] = None
+
+
+class JobStats(BaseModel):
+    count: int
+    salary_from: Optional[SalaryStats] = None
+    salary_to: Optional[SalaryStats] = None
+    periods: list[JobStatsPeriod] = []
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "examples": [
+                {
+                    "count": 2,
+                    "salary_from": {"min": 100000, "max": 120000, "p25": 100000, "p50": 100000, "p75": 120000, "p90": 120000},
+                    "salary_to": {"min": 150000, "max": 180000, "p25": 150000, "p50": 150000, "p75": 180000, "p90": 180000},
+                    "periods": [
+                        {
+                            "period": "2025-04-01",
+                            "count": 2,
+                            "salary_from": {"min": 100000, "max": 120000, "p25": 100000, "p50": 100000, "p75": 120000, "p90": 120000},
+                            "salary_to": {"min": 150000, "max": 180000, "p25": 150000, "p50": 150000, "p75": 180000, "p90": 180000}
+                        }
+                    ]
+                }
+            ]
+        }
+    )
+
+
 class Token(BaseModel):
     access_token: str
     token_type: str
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from repositories.email_outbox_repository import EmailOutboxRepository
+from utils.email import EmailTransport, OutgoingEmail, render_email
+
+
+logger = logging.getLogger(__name__)
+
+# Потолок задержки между повторами
+MAX_RETRY_DELAY_SECONDS = 3600
+
+
+class EmailOutboxWorker:
+    """
+    Фоновая доставка писем из email_outbox: забирает пачку, рендерит письма из закэшированных
+    шаблонов, отправляет через транспорт и отмечает результат. Неудачные письма повторяются
+    с экспоненциальной задержкой, после max_attempts попыток помечаются failed.
+    """
+
+    def __init__(
+        self,
+        repository: EmailOutboxRepository,
+        transport: EmailTransport,
+        batch_size: int = 50,
+        poll_interval: float = 1.0,
+        max_attempts: int = 5,
+        retry_base_seconds: float = 5.0,
+        lease_seconds: float = 60.0,
+    ):
+        self.repository = repository
+        self.transport = transport
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.lease_seconds = lease_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+
+    def retry_delay(self, attempts: int) -> float:
+        delay = min(self.retry_base_seconds * 2 ** (attempts - 1), MAX_RETRY_DELAY_SECONDS)
+        # Небольшой разброс, чтобы повторы после сбоя SMTP не шли одной волной
+        return delay * random.uniform(1.0, 1.1)
+
+    async def run_once(self) -> int:
+        rows = await self.repository.claim_batch(self.batch_size, self.lease_seconds)
+        if not rows:
+            return 0
+
+        messages, errors = [], {}
+        for row in rows:
+            try:
+                html = render_email(row["template"], json.loads(row["context"]))
+            except Exception as e:
+                errors[row["id"]] = f"render: {type(e).__name__}: {e}"
+                continue
+            messages.append(OutgoingEmail(id=row["id"], recipient=row["recipient"], subject=row["subject"], html=html))
+
+        if messages:
+            errors.update(await self.transport.send_batch(messages))
+
+        sent_ids = [message.id for message in messages if message.id not in errors]
+        await self.repository.mark_sent(sent_ids)
+        self.sent += len(sent_ids)
+
+        attempts = {row["id"]: row["attempts"] + 1 for row in rows}
+        for message_id, error in errors.items():
+            if attempts[message_id] >= self.max_attempts:
+                retry_at = None
+                self.failed += 1
+                logger.warning("Письмо %s не доставлено после %s попыток: %s", message_id, attempts[message_id], error)
+            else:
+                retry_at = datetime.now(timezone.utc) + timedelta(seconds=self.retry_delay(attempts[message_id]))
+                self.retried += 1
+            await self.repository.mark_failed_attempt(message_id, error, retry_at)
+        return len(rows)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                processed = await self.run_once()
+            except Exception:
+                logger.exception("Ошибка обработки очереди писем")
+                processed = 0
+            # Полная пачка — в очереди, скорее всего, есть ещё; иначе ждём опроса или notify()
+            if processed < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.transport.close()
+
+    def stats(self) -> dict:
+        return {"sent": self.sent, "retried": self.retried, "failed": self.failed}
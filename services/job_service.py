@@ -1,22 +1,64 @@
+from datetime import date, datetime
+from typing import AsyncIterator, Optional
 from repositories.job_repository import JobRepository
-from schemas import Job, JobCreate
+from schemas import Job, JobCreate, JobPage, JobFilters, JobBulkError, JobStats
+from utils.cache import Cache, NullCache
 
 
 class JobService:
-    def __init__(self, job_repository: JobRepository):
+    def __init__(self, job_repository: JobRepository, cache: Optional[Cache] = None):
         self.job_repository = job_repository
+        self.cache = cache or NullCache()
 
     async def create_job(self, job: JobCreate) -> Job:
         return await self.job_repository.create_job(job)
 
-    async def get_all_jobs(self) -> list[Job]:
-        return await self.job_repository.get_all_jobs()
+    async def create_jobs_bulk(
+        self, new_jobs: list[JobCreate], partial: bool = False
+    ) -> tuple[list[Job], list[JobBulkError]]:
+        return await self.job_repository.create_jobs_bulk(new_jobs, partial)
+
+    async def get_jobs_page(
+        self, limit: int, cursor: Optional[str] = None, filters: Optional[JobFilters] = None
+    ) -> JobPage:
+        return await self.job_repository.get_jobs_page(limit, cursor, filters)
+
+    def iterate_jobs(self, batch_size: int = 1000, filters: Optional[JobFilters] = None) -> AsyncIterator[list]:
+        return self.job_repository.iterate_jobs(batch_size, filters)
+
+    async def search_jobs(self, q: str, limit: int, offset: int = 0) -> list[Job]:
+        return await self.job_repository.search_jobs(q, limit, offset)
+
+    async def get_stats(
+        self,
+        user_id: Optional[int] = None,
+        keyword: Optional[str] = None,
+        period_from: Optional[date] = None,
+        period_to: Optional[date] = None,
+    ) -> JobStats:
+        return await self.job_repository.get_stats(user_id, keyword, period_from, period_to)
+
+    async def get_job_updated_at(self, job_id: int) -> datetime:
+        job = self.cache.get(("job", job_id))
+        if job is not None:
+            return job.updated_at
+        return await self.job_repository.get_job_updated_at(job_id)
 
     async def get_job_by_id(self, job_id: int) -> Job:
-        return await self.job_repository.get_job_by_id(job_id)
+        job = self.cache.get(("job", job_id))
+        if job is None:
+            # Кэш наполняется только с основной БД, без кэша читаем реплику
+            job = await self.job_repository.get_job_by_id(job_id, primary=self.cache.enabled)
+            self.cache.set(("job", job_id), job)
+        return job
 
     async def update_job(self, job_id: int, job: JobCreate) -> Job:
-        return await self.job_repository.update_job(job_id, job)
+        updated = await self.job_repository.update_job(job_id, job)
+        # Кладём свежую версию из RETURNING: чтение с реплики сразу после записи может вернуть старую
+        self.cache.set(("job", job_id), updated)
+        return updated
 
     async def delete_job(self, job_id: int) -> bool:
-        return await self.job_repository.delete_job(job_id)
\ No newline at end of file
+        deleted = await self.job_repository.delete_job(job_id)
+        self.cache.delete(("job", job_id))
+        return deleted
@@ -1,25 +1,88 @@
+from datetime import datetime
+from typing import Optional
 from repositories.user_repository import UserRepository
-from schemas import User, UserCreate
+from schemas import User, UserCreate, UserInDB, UserPage
+from utils.cache import Cache, NullCache
+from utils.hashing import PasswordHasherBusy
+from auth import get_password_hash_async, revoke_user_tokens
 
 
 class UserService:
-    def __init__(self, user_repository: UserRepository):
+    def __init__(self, user_repository: UserRepository, cache: Optional[Cache] = None):
         self.user_repository = user_repository
+        self.cache = cache or NullCache()
+
+    def _cache_user(self, user: UserInDB) -> None:
+        # Пользователь хранится по id, email лишь ссылается на id
+        self.cache.set(("user", user.id), user)
+        self.cache.set(("user_email", user.email), user.id)
+
+    def _invalidate_user(self, user_id: int) -> None:
+        user = self.cache.get(("user", user_id))
+        if user is not None:
+            self.cache.delete(("user_email", user.email))
+        self.cache.delete(("user", user_id))
 
     async def create_user(self, user: UserCreate) -> User:
         return await self.user_repository.create_user(user)
 
-    async def get_all_users(self) -> list[User]:
-        return await self.user_repository.get_all_users()
+    async def get_users_page(self, limit: int, cursor: Optional[str] = None) -> UserPage:
+        return await self.user_repository.get_users_page(limit, cursor)
 
-    async def get_user_by_id(self, user_id: int) -> User:
-        return await self.user_repository.get_user_by_id(user_id)
+    async def get_user_by_id(self, user_id: int) -> UserInDB:
+        user = self.cache.get(("user", user_id))
+        if user is None:
+            # Кэш наполняется только с основной БД, без кэша читаем реплику
+            user = await self.user_repository.get_user_by_id(user_id, primary=self.cache.enabled)
+            self._cache_user(user)
+        return user
+
+    async def get_user_updated_at(self, user_id: int) -> datetime:
+        user = self.cache.get(("user", user_id))
+        if user is not None:
+            return user.updated_at
+        return await self.user_repository.get_user_updated_at(user_id)
 
     async def update_user(self, user_id: int, user: UserCreate) -> User:
-        return await self.user_repository.update_user(user_id, user)
+        updated = await self.user_repository.update_user(user_id, user)
+        # Свежая версия из RETURNING вместо сброса: реплика может ещё отдавать старую
+        self._cache_user(updated)
+        return updated
 
     async def delete_user(self, user_id: int) -> bool:
-        return await self.user_repository.delete_user(user_id)
+        deleted = await self.user_repository.delete_user(user_id)
+        self._invalidate_user(user_id)
+        revoke_user_tokens(user_id)
+        return deleted
+
+    async def get_user_by_email(self, email: str) -> UserInDB:
+        user_id = self.cache.get(("user_email", email))
+        if user_id is not None:
+            user = self.cache.get(("user", user_id))
+            # Ссылка могла устареть после смены email
+            if user is not None and user.email == email:
+                return user
+
+        user = await self.user_repository.get_user_by_email(email)
+        self._cache_user(user)
+        return user
+
+    async def get_user_for_login(self, email: str) -> UserInDB:
+        # Вход — мимо кэша, с основной БД: удалённый или сменивший пароль пользователь не получит токен
+        user = await self.user_repository.get_user_by_email(email)
+        self._cache_user(user)
+        return user
+
+    async def verify_user(self, email: str) -> User:
+        user = await self.user_repository.verify_user(email)
+        self._invalidate_user(user.id)
+        return user
 
-    async def get_user_by_email(self, email: str) -> User:
-        return await self.user_repository.get_user_by_email(email)
\ No newline at end of file
+    async def rehash_password(self, user: UserInDB, password: str) -> None:
+        # Вызывается в фоне после успешного входа, когда параметры хеша устарели
+        try:
+            new_hash = await get_password_hash_async(password)
+        except PasswordHasherBusy:
+            return  # пересчитаем при следующем входе
+        if await self.user_repository.update_password_hash(user.id, user.hashed_password, new_hash):
+            self._invalidate_user(user.id)
@@ -1,6 +1,10 @@
+import jwt
 import pytest
+from datetime import datetime, timedelta, timezone
 from httpx import AsyncClient
-from sqlalchemy import update
+from passlib.context import CryptContext
+from sqlalchemy import select, update
+from auth import ALGORITHM, SECRET_KEY, password_needs_rehash, pwd_context, token_cache
 from models.user import users
 from main import app
 import uuid
@@ -37,4 +41,80 @@ async def test_login_wrong_password(client: AsyncClient):
 
     # 4. Проверка
     assert response.status_code == 401, "Ожидался 401 при неверном пароле"
-    assert response.json()["detail"] == "Incorrect email or password"
\ No newline at end of file
+    assert response.json()["detail"] == "Incorrect email or password"
+
+@pytest.mark.anyio
+async def test_login_rehashes_outdated_password(client: AsyncClient):
+    email = random_email()
+    password = "correct123"
+    response = await client.post("/users/", json={
+        "email": email,
+        "name": f"User_{uuid.uuid4().hex[:6]}",
+        "password": password,
+        "is_company": False
+    })
+    assert response.status_code == 200, response.json()
+
+    # Хеш со старыми (слабыми) параметрами Argon2
+    old_context = CryptContext(schemes=["argon2"], argon2__time_cost=1, argon2__memory_cost=8192, argon2__parallelism=1)
+    old_hash = old_context.hash(password)
+    database = app.state.database
+    await database.execute(update(users).where(users.c.email == email).values(
+        is_verified=True, hashed_password=old_hash, updated_at=users.c.updated_at
+    ))
+    assert password_needs_rehash(old_hash)
+
+    response = await client.post("/login", data={"username": email, "password": password})
+    assert response.status_code == 200, response.json()
+
+    row = await database.fetch_one(select(users.c.hashed_password, users.c.updated_at).where(users.c.email == email))
+    new_hash = row["hashed_password"]
+    assert new_hash != old_hash
+    assert row["updated_at"] is not None
+    assert not password_needs_rehash(new_hash)
+    assert pwd_context.verify(password, new_hash)
+
+
+@pytest.mark.anyio
+async def test_verify_email_invalid_token(client: AsyncClient):
+    # Подписанный токен без email — verify_verification_token отклоняет его ValueError
+    token = jwt.encode({"exp": datetime.now(timezone.utc) + timedelta(minutes=5)}, SECRET_KEY, algorithm=ALGORITHM)
+    response = await client.get("/verify-email", params={"token": token})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid token"
+
+
+@pytest.mark.anyio
+async def test_token_cache_and_logout(client: AsyncClient):
+    email = random_email()
+    password = "correct123"
+    response = await client.post("/users/", json={
+        "email": email,
+        "name": f"User_{uuid.uuid4().hex[:6]}",
+        "password": password,
+        "is_company": True
+    })
+    user_id = response.json()["id"]
+    await app.state.database.execute(update(users).where(users.c.email == email).values(
+        is_verified=True, updated_at=users.c.updated_at
+    ))
+    token = (await client.post("/login", data={"username": email, "password": password})).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    job = {"user_id": user_id, "title": "Job", "description": "Test", "salary_from": 1, "salary_to": 2}
+
+    # Второй запрос с тем же токеном берёт пользователя из кэша
+    for _ in range(2):
+        response = await client.post("/jobs/", json=job, headers=headers)
+        assert response.status_code == 200, response.json()
+    assert token_cache.stats()["hits"] >= 1
+
+    response = await client.post("/logout", headers=headers)
+    assert response.status_code == 200, response.json()
+    response = await client.post("/jobs/", json=job, headers=headers)
+    assert response.status_code == 401
+
+
+@pytest.mark.anyio
+async def test_invalid_token_is_rejected(client: AsyncClient):
+    response = await client.post("/logout", headers={"Authorization": "Bearer not-a-token"})
+    assert response.status_code == 401
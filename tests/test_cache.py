@@ -0,0 +1,106 @@
+import pytest
+import time
+from utils.cache import LRUCache, NullCache, build_cache
+from utils.token_cache import TokenCache
+
+
+@pytest.mark.anyio
+async def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" теперь самый старый
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+
+
+@pytest.mark.anyio
+async def test_lru_cache_ttl(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr("utils.cache.time.monotonic", lambda: now)
+    cache = LRUCache(maxsize=10, ttl=5)
+    cache.set("a", 1)
+
+    now += 4
+    assert cache.get("a") == 1
+    now += 2
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+@pytest.mark.anyio
+async def test_build_cache_disabled():
+    assert isinstance(build_cache(0, 60), NullCache)
+
+
+@pytest.mark.anyio
+async def test_token_cache_expires_at_token_exp_and_revokes():
+    cache = TokenCache(maxsize=10, max_ttl=3600)
+    cache.set("token-a", 1, "user-1", exp=time.time() + 60)
+    cache.set("token-b", 1, "user-1", exp=time.time() - 1)  # уже истёк — не кэшируется
+    cache.set("token-c", 2, "user-2", exp=time.time() + 60)
+
+    assert cache.get("token-a") == "user-1"
+    assert cache.get("token-b") is None
+
+    cache.revoke_token("token-c", exp=time.time() + 60)
+    assert cache.get("token-c") is None
+    assert cache.is_revoked("token-c", 2, issued_at=time.time())
+
+    cache.revoke_user(1)
+    assert cache.get("token-a") is None
+    assert cache.is_revoked("token-a", 1, issued_at=time.time() - 10)
+    assert not cache.is_revoked("token-new", 1, issued_at=time.time() + 10)
+    assert cache.stats()["revocations"] == 2
+
+
+@pytest.mark.anyio
+async def test_token_revocations_not_bounded_by_maxsize(monkeypatch):
+    cache = TokenCache(maxsize=2, max_ttl=3600)
+    now = time.time()
+    for i in range(5):
+        cache.revoke_token(f"token-{i}", exp=now + 60 + i)
+    # Больше maxsize отзывов — все токены по-прежнему отозваны
+    assert all(cache.is_revoked(f"token-{i}", 1, issued_at=now) for i in range(5))
+    assert cache.stats()["revoked_tokens"] == 5
+
+    # Запись удаляется только после exp токена
+    monkeypatch.setattr(time, "time", lambda: now + 62.5)
+    cache.revoke_token("token-late", exp=now + 120)
+    assert cache.stats()["revoked_tokens"] == 3  # token-3, token-4 и token-late
+    assert cache.is_revoked("token-4", 1, issued_at=now)
+
+
+@pytest.mark.anyio
+async def test_user_revocations_expire_after_token_lifetime(monkeypatch):
+    cache = TokenCache(maxsize=10, max_ttl=3600, token_lifetime=60)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+    for user_id in range(5):
+        cache.revoke_user(user_id)
+    assert cache.stats()["revoked_users"] == 5
+    assert cache.is_revoked("token", 0, issued_at=now - 30)
+
+    # Через token_lifetime все токены, выданные до отзыва, истекли — отзыв больше не нужен
+    monkeypatch.setattr(time, "time", lambda: now + 30)
+    cache.revoke_user(0)  # повторный отзыв переносит пользователя в конец
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    cache.revoke_user(10)
+    assert cache.stats()["revoked_users"] == 2  # 0 (отозван повторно) и 10
+    assert cache.is_revoked("token", 0, issued_at=now + 20)
+    # Токен, выданный до отзыва, истёк сам (exp <= iat + token_lifetime)
+    assert not cache.is_revoked("token", 1, issued_at=now - 1)
+
+
+@pytest.mark.anyio
+async def test_token_revocation_with_cache_disabled():
+    cache = TokenCache(maxsize=0, max_ttl=3600)
+    cache.revoke_token("token", exp=time.time() + 60)
+    assert cache.is_revoked("token", 1, issued_at=time.time())
@@ -0,0 +1,142 @@
+import pytest
+import socketserver
+import threading
+import uuid
+from datetime import datetime, timezone
+from httpx import AsyncClient
+from sqlalchemy import select
+from main import app
+from models.email_outbox import email_outbox, EMAIL_PENDING, EMAIL_SENT, EMAIL_FAILED
+from repositories.email_outbox_repository import EmailOutboxRepository
+from services.email_worker import EmailOutboxWorker
+from utils.email import EmailTransport, OutgoingEmail, SMTPTransport
+
+
+class RecordingTransport(EmailTransport):
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.sent: list[OutgoingEmail] = []
+
+    async def send_batch(self, messages: list[OutgoingEmail]) -> dict[int, str]:
+        if self.fail:
+            return {message.id: "SMTPServerDisconnected: test" for message in messages}
+        self.sent.extend(messages)
+        return {}
+
+
+async def register(client: AsyncClient) -> str:
+    email = f"user_{uuid.uuid4()}@test.com"
+    await client.post("/users/", json={
+        "email": email,
+        "name": f"User_{uuid.uuid4().hex[:6]}",
+        "password": "secret123",
+        "is_company": False
+    })
+    return email
+
+
+@pytest.mark.anyio
+async def test_resend_verification_only_enqueues(client: AsyncClient, query_budget):
+    email = await register(client)
+
+    # Поиск пользователя и один INSERT в очередь — без рендера и SMTP
+    with query_budget(2):
+        response = await client.post("/resend-verification-email", params={"email": email})
+    assert response.status_code == 200, response.json()
+
+    row = await app.state.database.fetch_one(select(email_outbox).where(email_outbox.c.recipient == email))
+    assert row["status"] == EMAIL_PENDING
+    assert row["template"] == "verify_email.html"
+
+    response = await client.post("/resend-verification-email", params={"email": "missing@test.com"})
+    assert response.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_outbox_worker_sends_batch(client: AsyncClient):
+    repository = EmailOutboxRepository(app.state.database)
+    ids = [
+        await repository.enqueue(f"user{i}@test.com", "Тема", "verify_email.html", {"name": f"User{i}", "verify_url": "http://x/v"})
+        for i in range(3)
+    ]
+    transport = RecordingTransport()
+    worker = EmailOutboxWorker(repository, transport, batch_size=2)
+
+    assert await worker.run_once() == 2
+    assert await worker.run_once() == 1
+    assert await worker.run_once() == 0
+
+    assert sorted(message.id for message in transport.sent) == ids
+    assert "User0" in transport.sent[0].html and "http://x/v" in transport.sent[0].html
+    for message_id in ids:
+        row = await repository.get_message(message_id)
+        assert row["status"] == EMAIL_SENT
+        assert row["attempts"] == 1
+
+
+@pytest.mark.anyio
+async def test_outbox_worker_retries_with_backoff(client: AsyncClient):
+    repository = EmailOutboxRepository(app.state.database)
+    message_id = await repository.enqueue("user@test.com", "Тема", "verify_email.html", {"name": "U", "verify_url": "u"})
+    worker = EmailOutboxWorker(repository, RecordingTransport(fail=True), max_attempts=2, retry_base_seconds=60)
+
+    assert await worker.run_once() == 1
+    row = await repository.get_message(message_id)
+    assert row["status"] == EMAIL_PENDING
+    assert row["attempts"] == 1
+    assert row["next_attempt_at"] > datetime.now(timezone.utc).replace(tzinfo=None)
+    # Следующая попытка ещё не наступила
+    assert await worker.run_once() == 0
+
+    await app.state.database.execute(
+        email_outbox.update().where(email_outbox.c.id == message_id).values(next_attempt_at=datetime(2000, 1, 1))
+    )
+    assert await worker.run_once() == 1
+    row = await repository.get_message(message_id)
+    assert row["status"] == EMAIL_FAILED
+    assert row["attempts"] == 2
+    assert "SMTPServerDisconnected" in row["last_error"]
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    # Минимальный SMTP-сервер для тестов: принимает всё и запоминает получателей
+    def handle(self):
+        self.server.connections += 1
+        self.wfile.write(b"220 test\r\n")
+        while line := self.rfile.readline():
+            command = line.decode().strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                self.wfile.write(b"250 test\r\n")
+            elif command.startswith("RCPT TO:"):
+                self.server.recipients.append(line.decode().strip()[8:].strip("<>"))
+                self.wfile.write(b"250 OK\r\n")
+            elif command == "DATA":
+                self.wfile.write(b"354 go\r\n")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                self.wfile.write(b"250 OK\r\n")
+            elif command == "QUIT":
+                self.wfile.write(b"221 bye\r\n")
+                return
+            else:
+                self.wfile.write(b"250 OK\r\n")
+
+
+@pytest.mark.anyio
+async def test_smtp_transport_reuses_pooled_connections():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), SMTPHandler)
+    server.daemon_threads = True
+    server.connections, server.recipients = 0, []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    transport = SMTPTransport("127.0.0.1", server.server_address[1], "noreply@test.com", pool_size=2)
+    try:
+        for batch in range(2):
+            messages = [OutgoingEmail(id=i, recipient=f"u{batch}{i}@test.com", subject="S", html="<p>x</p>") for i in range(3)]
+            assert await transport.send_batch(messages) == {}
+        assert len(server.recipients) == 6
+        # Две пачки по трём письмам — всего два соединения на весь пул
+        assert server.connections == 2
+    finally:
+        await transport.close()
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+import pytest
+from auth import pwd_context
+from utils.hashing import PasswordHasher, PasswordHasherBusy
+
+
+class BlockingContext:
+    def __init__(self):
+        self.release = threading.Event()
+
+    def hash(self, password: str) -> str:
+        self.release.wait(timeout=5)
+        return f"hashed:{password}"
+
+
+@pytest.mark.anyio
+async def test_password_hasher_roundtrip():
+    hasher = PasswordHasher(pwd_context, max_workers=2)
+    try:
+        hashed = await hasher.hash("secret123")
+        assert await hasher.verify("secret123", hashed)
+        assert not await hasher.verify("wrong", hashed)
+        assert hasher.stats()["completed"] == 3
+    finally:
+        hasher.shutdown()
+
+
+@pytest.mark.anyio
+async def test_password_hasher_bounded_queue():
+    context = BlockingContext()
+    hasher = PasswordHasher(context, max_workers=1, max_queue=1)
+    try:
+        running = asyncio.ensure_future(hasher.hash("a"))
+        while hasher.stats()["running"] != 1:
+            await asyncio.sleep(0.01)
+        queued = asyncio.ensure_future(hasher.hash("b"))
+        await asyncio.sleep(0.01)
+        assert hasher.stats()["queued"] == 1
+
+        # Пул занят, очередь полна — отказ сразу, event loop не ждёт
+        with pytest.raises(PasswordHasherBusy):
+            await hasher.hash("c")
+
+        context.release.set()
+        assert await running == "hashed:a"
+        assert await queued == "hashed:b"
+        assert hasher.stats()["rejected"] == 1
+    finally:
+        context.release.set()
+        hasher.shutdown()
+
+
+@pytest.mark.anyio
+async def test_password_hasher_cancelled_jobs_free_queue():
+    context = BlockingContext()
+    hasher = PasswordHasher(context, max_workers=1, max_queue=3)
+    try:
+        running = asyncio.ensure_future(hasher.hash("a"))
+        while hasher.stats()["running"] != 1:
+            await asyncio.sleep(0.01)
+        queued = [asyncio.ensure_future(hasher.hash(str(i))) for i in range(3)]
+        await asyncio.sleep(0.01)
+        assert hasher.stats()["queued"] == 3
+
+        # Клиенты отключились, пока задачи ждали в очереди
+        for task in queued:
+            task.cancel()
+        await asyncio.gather(*queued, return_exceptions=True)
+        assert hasher.stats()["queued"] == 0
+
+        # Очередь снова принимает задачи
+        waiting = asyncio.ensure_future(hasher.hash("b"))
+        context.release.set()
+        assert await running == "hashed:a"
+        assert await waiting == "hashed:b"
+        stats = hasher.stats()
+        assert (stats["queued"], stats["running"], stats["completed"]) == (0, 0, 2)
+    finally:
+        context.release.set()
+        hasher.shutdown()
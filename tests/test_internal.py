@@ -0,0 +1,21 @@
+import pytest
+from httpx import AsyncClient
+import dependencies
+
+INTERNAL_ENDPOINTS = ("/internal/cache", "/internal/password-hashing", "/internal/db-pool", "/internal/slow-queries")
+
+
+@pytest.mark.anyio
+async def test_internal_endpoints_require_token(client: AsyncClient, monkeypatch):
+    # Токен не настроен — служебные эндпоинты закрыты для всех
+    monkeypatch.setattr(dependencies, "INTERNAL_API_TOKEN", "")
+    for path in INTERNAL_ENDPOINTS:
+        assert (await client.get(path)).status_code == 403, path
+        assert (await client.get(path, headers={"X-Internal-Token": ""})).status_code == 403, path
+
+    monkeypatch.setattr(dependencies, "INTERNAL_API_TOKEN", "internal-secret")
+    for path in INTERNAL_ENDPOINTS:
+        assert (await client.get(path)).status_code == 403, path
+        assert (await client.get(path, headers={"X-Internal-Token": "wrong"})).status_code == 403, path
+        response = await client.get(path, headers={"X-Internal-Token": "internal-secret"})
+        assert response.status_code == 200, path
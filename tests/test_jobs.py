@@ -1,6 +1,20 @@
+import csv
+import io
+import json
 import uuid
 import pytest
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
 from httpx import AsyncClient
+from models.jobs import jobs
+from models.user import users
+from db.instrumentation import capture_queries
+from repositories.job_repository import JobRepository
+from repositories.job_stats_repository import JobStatsRepository
+from auth import get_current_user
+from schemas import User
+from main import app
 
 
 def random_email():
@@ -16,4 +30,375 @@ async def test_create_job_unauthorized(client: AsyncClient):
         "salary_from": 100000,
         "salary_to": 150000
     })
-    assert response.status_code == 401
\ No newline at end of file
+    assert response.status_code == 401
+
+async def create_jobs(count: int):
+    database = app.state.database
+    user_id = await database.execute(users.insert().values(
+        email=random_email(),
+        name=f"Company_{uuid.uuid4().hex[:6]}",
+        hashed_password="x",
+        is_company=True,
+        is_verified=True,
+    ))
+    # Одинаковое время создания — порядок внутри определяется id
+    created_at = datetime.now(timezone.utc)
+    for i in range(count):
+        await database.execute(jobs.insert().values(
+            user_id=user_id,
+            title=f"Job {i}",
+            description="Test",
+            salary_from=100000,
+            salary_to=150000,
+            is_active=True,
+            created_at=created_at,
+            updated_at=created_at,
+        ))
+    return user_id
+
+
+@pytest.mark.anyio
+async def test_read_jobs_cursor_pagination(client: AsyncClient):
+    await create_jobs(5)
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get("/jobs/", params=params)
+        assert response.status_code == 200, response.json()
+        data = response.json()
+        assert len(data["items"]) <= 2
+        seen.extend(job["id"] for job in data["items"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    # Все вакансии ровно по одному разу, сначала новые
+    assert len(seen) == 5
+    assert seen == sorted(seen, reverse=True)
+
+
+@pytest.mark.anyio
+async def test_read_jobs_invalid_cursor(client: AsyncClient):
+    response = await client.get("/jobs/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+@pytest.mark.anyio
+async def test_search_jobs_ranked(client: AsyncClient):
+    database = app.state.database
+    user_id = await create_jobs(2)
+    created_at = datetime.now(timezone.utc)
+    for title, description in [
+        ("Python разработчик", "FastAPI, PostgreSQL"),
+        ("Аналитик данных", "Нужен опыт с Python и SQL"),
+    ]:
+        await database.execute(jobs.insert().values(
+            user_id=user_id,
+            title=title,
+            description=description,
+            salary_from=100000,
+            salary_to=150000,
+            is_active=True,
+            created_at=created_at,
+            updated_at=created_at,
+        ))
+
+    response = await client.get("/jobs/search", params={"q": "python"})
+    assert response.status_code == 200, response.json()
+    titles = [job["title"] for job in response.json()]
+    # Совпадение в заголовке выше совпадения в описании
+    assert titles == ["Python разработчик", "Аналитик данных"]
+
+    response = await client.get("/jobs/search", params={"q": "РАЗРАБОТЧИК"})
+    assert [job["title"] for job in response.json()] == ["Python разработчик"]
+
+    # Индекс поддерживается триггерами при обновлении и удалении
+    await database.execute(jobs.update().where(jobs.c.title == "Аналитик данных").values(description="SQL"))
+    await database.execute(jobs.delete().where(jobs.c.title == "Python разработчик"))
+    response = await client.get("/jobs/search", params={"q": "python"})
+    assert response.json() == []
+
+
+@pytest.mark.anyio
+async def test_search_jobs_special_characters(client: AsyncClient):
+    await create_jobs(1)
+    response = await client.get("/jobs/search", params={"q": 'c++ "OR'})
+    assert response.status_code == 200
+
+
+@pytest.mark.anyio
+async def test_read_jobs_filters(client: AsyncClient):
+    database = app.state.database
+    employer_id = await create_jobs(0)
+    other_id = await create_jobs(1)
+    created_at = datetime.now(timezone.utc)
+    for salary_from, salary_to, is_active in [(50000, 80000, True), (90000, 120000, True), (150000, 200000, False)]:
+        await database.execute(jobs.insert().values(
+            user_id=employer_id,
+            title=f"Job {salary_from}",
+            description="Test",
+            salary_from=salary_from,
+            salary_to=salary_to,
+            is_active=is_active,
+            created_at=created_at,
+            updated_at=created_at,
+        ))
+
+    response = await client.get("/jobs/", params={"user_id": employer_id, "is_active": True, "salary_min": 100000})
+    assert response.status_code == 200, response.json()
+    assert [job["title"] for job in response.json()["items"]] == ["Job 90000"]
+
+    # Пересечение вилок: [70000, 95000] задевает обе активные вакансии работодателя
+    response = await client.get("/jobs/", params={
+        "user_id": employer_id, "is_active": True, "salary_min": 70000, "salary_max": 95000
+    })
+    assert {job["title"] for job in response.json()["items"]} == {"Job 50000", "Job 90000"}
+
+    response = await client.get("/jobs/", params={"user_id": other_id})
+    assert [job["user_id"] for job in response.json()["items"]] == [other_id]
+
+
+@pytest.mark.anyio
+async def test_read_jobs_invalid_salary_range(client: AsyncClient):
+    response = await client.get("/jobs/", params={"salary_min": 200000, "salary_max": 100000})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "salary_min cannot be greater than salary_max"
+
+
+@pytest.mark.anyio
+async def test_read_job_conditional(client: AsyncClient):
+    user_id = await create_jobs(1)
+    job = (await client.get("/jobs/")).json()["items"][0]
+
+    response = await client.get(f"/jobs/{job['id']}")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    last_modified = response.headers["last-modified"]
+
+    response = await client.get(f"/jobs/{job['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    response = await client.get(f"/jobs/{job['id']}", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
+
+    response = await client.put(f"/jobs/{job['id']}", json={
+        "user_id": user_id,
+        "title": "Updated",
+        "description": "Test",
+        "salary_from": 100000,
+        "salary_to": 150000
+    })
+    assert response.status_code == 200, response.json()
+
+    response = await client.get(f"/jobs/{job['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["title"] == "Updated"
+    assert response.headers["etag"] != etag
+
+
+@pytest.mark.anyio
+async def test_read_jobs_conditional(client: AsyncClient):
+    await create_jobs(2)
+    response = await client.get("/jobs/", params={"limit": 1})
+    etag = response.headers["etag"]
+
+    response = await client.get("/jobs/", params={"limit": 1}, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    # Другая страница — другой валидатор
+    response = await client.get("/jobs/", params={"limit": 2}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+    await create_jobs(1)
+    response = await client.get("/jobs/", params={"limit": 1}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+
+@pytest.mark.anyio
+async def test_read_jobs_etag_from_page(client: AsyncClient, query_budget):
+    await create_jobs(3)
+    # ETag считается по самой странице — один запрос к БД, без агрегата по таблице
+    with query_budget(1):
+        response = await client.get("/jobs/", params={"limit": 2})
+    etag = response.headers["etag"]
+    first, second = response.json()["items"]
+
+    # Изменение строки на странице меняет ETag, изменение за её пределами — нет
+    database = app.state.database
+    await database.execute(jobs.update().where(jobs.c.id == 1).values(title="Other", updated_at=datetime.now(timezone.utc)))
+    assert first["id"] != 1 and second["id"] != 1
+    response = await client.get("/jobs/", params={"limit": 2}, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    await database.execute(jobs.update().where(jobs.c.id == first["id"]).values(
+        title="Changed", updated_at=datetime.now(timezone.utc) + timedelta(seconds=1)
+    ))
+    response = await client.get("/jobs/", params={"limit": 2}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+@pytest.mark.anyio
+async def test_export_jobs(client: AsyncClient):
+    await create_jobs(3)
+
+    response = await client.get("/jobs/export", params={"format": "ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["title"] for line in lines] == ["Job 0", "Job 1", "Job 2"]
+
+    response = await client.get("/jobs/export", params={"format": "csv"})
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 3
+    assert rows[0]["salary_from"] == "100000"
+
+
+@pytest.mark.anyio
+async def test_export_jobs_in_batches():
+    database = app.state.database
+    await create_jobs(5)
+    repository = JobRepository(database)
+    batches = [len(batch) async for batch in repository.iterate_jobs(batch_size=2)]
+    assert batches == [2, 2, 1]
+
+
+@pytest.mark.anyio
+async def test_create_jobs_bulk(client: AsyncClient):
+    company_id = await create_jobs(0)
+    app.dependency_overrides[get_current_user] = lambda: User(
+        id=company_id,
+        email="company@test.com",
+        name="Company",
+        is_company=True,
+        created_at=datetime.now(timezone.utc),
+        updated_at=datetime.now(timezone.utc),
+    )
+    payload = [
+        {"user_id": company_id, "title": "Bulk 1", "description": "Test", "salary_from": 1, "salary_to": 2},
+        {"user_id": company_id, "title": "Bulk 2", "description": "Test", "salary_from": 5, "salary_to": 2},
+        {"user_id": 999999, "title": "Bulk 3", "description": "Test", "salary_from": 1, "salary_to": 2},
+        {"user_id": company_id, "title": "Bulk 4", "description": "Test", "salary_from": 1, "salary_to": 2},
+    ]
+    try:
+        # Без partial пачка отклоняется целиком
+        response = await client.post("/jobs/bulk", json=payload)
+        assert response.status_code == 400
+        assert [error["index"] for error in response.json()["detail"]] == [1, 2]
+        assert (await client.get("/jobs/")).json()["items"] == []
+
+        response = await client.post("/jobs/bulk", params={"partial": True}, json=payload)
+        assert response.status_code == 200, response.json()
+        data = response.json()
+        assert [job["title"] for job in data["created"]] == ["Bulk 1", "Bulk 4"]
+        assert data["errors"] == [
+            {"index": 1, "detail": "salary_from cannot be greater than salary_to"},
+            {"index": 2, "detail": "User not found"},
+        ]
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.mark.anyio
+async def test_update_and_delete_job_errors(client: AsyncClient):
+    user_id = await create_jobs(1)
+    job_id = (await client.get("/jobs/")).json()["items"][0]["id"]
+    payload = {"user_id": user_id, "title": "Job", "description": "Test", "salary_from": 1, "salary_to": 2}
+
+    response = await client.put("/jobs/999999", json=payload)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Job not found"
+
+    response = await client.put(f"/jobs/{job_id}", json={**payload, "user_id": 999999})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "User not found"
+
+    response = await client.delete(f"/jobs/{job_id}")
+    assert response.status_code == 200
+    response = await client.delete(f"/jobs/{job_id}")
+    assert response.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_job_stats_maintained_on_writes(client: AsyncClient):
+    company_id = await create_jobs(0)
+    app.dependency_overrides[get_current_user] = lambda: User(
+        id=company_id,
+        email="company@test.com",
+        name="Company",
+        is_company=True,
+        created_at=datetime.now(timezone.utc),
+        updated_at=datetime.now(timezone.utc),
+    )
+    try:
+        response = await client.post("/jobs/bulk", json=[
+            {"user_id": company_id, "title": "Python dev", "description": "Test", "salary_from": salary, "salary_to": salary * 2}
+            for salary in (100000, 120000, 140000, 160000)
+        ])
+        assert response.status_code == 200, response.json()
+        created = response.json()["created"]
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+    response = await client.get("/jobs/stats")
+    assert response.status_code == 200, response.json()
+    stats = response.json()
+    assert stats["count"] == 4
+    assert stats["salary_from"]["min"] == 100000
+    assert stats["salary_from"]["max"] == 160000
+    assert stats["salary_from"]["p50"] == 120000
+    assert stats["salary_to"]["p90"] == 320000
+    assert len(stats["periods"]) == 1
+
+    # Закрытие и удаление вакансий сразу отражаются в сводке
+    job = created[-1]
+    response = await client.put(f"/jobs/{job['id']}", json={**{k: job[k] for k in (
+        "user_id", "title", "description", "salary_from", "salary_to")}, "is_active": False})
+    assert response.status_code == 200, response.json()
+    await client.delete(f"/jobs/{created[0]['id']}")
+
+    stats = (await client.get("/jobs/stats", params={"keyword": "PYTHON"})).json()
+    assert stats["count"] == 2
+    assert stats["salary_from"]["min"] == 120000
+    assert stats["salary_from"]["max"] == 140000
+
+    # Пересборка даёт ту же сводку
+    await JobRepository(app.state.database).rebuild_stats(batch_size=1)
+    assert (await client.get("/jobs/stats", params={"keyword": "python"})).json() == stats
+    assert (await client.get("/jobs/stats", params={"user_id": company_id})).json()["count"] == 2
+
+
+@pytest.mark.anyio
+async def test_job_stats_upsert_rows_in_key_order():
+    period = date(2024, 1, 1)
+    # Ключи добавлены в обратном порядке — в upsert они всё равно идут по возрастанию
+    delta = Counter({("all", "", period, "salary_from", bucket): 1 for bucket in (300000, 200000, 100000)})
+    with capture_queries() as log:
+        await JobStatsRepository(app.state.database).apply(delta)
+    [upsert] = log.queries
+    params = upsert.statement.compile().params
+    assert [params[f"bucket_m{i}"] for i in range(3)] == [100000, 200000, 300000]
+
+
+@pytest.mark.anyio
+async def test_job_stats_rebuild_lock_on_postgres():
+    class RecordingDatabase:
+        def __init__(self, dialect: str):
+            self.url = SimpleNamespace(dialect=dialect)
+            self.executed = []
+
+        async def execute(self, query):
+            self.executed.append(query)
+
+    # Postgres: записи сводки ждут конца пересборки; SQLite и так сериализует писателей BEGIN IMMEDIATE
+    postgres, sqlite = RecordingDatabase("postgresql"), RecordingDatabase("sqlite")
+    await JobStatsRepository(postgres).lock()
+    await JobStatsRepository(sqlite).lock()
+    assert postgres.executed == ["LOCK TABLE job_salary_stats IN EXCLUSIVE MODE"]
+    assert sqlite.executed == []
@@ -0,0 +1,69 @@
+import pytest
+from httpx import AsyncClient
+from tests.test_jobs import create_jobs
+from utils.metrics import Counter, Histogram, db_query_duration, http_request_duration, http_requests
+
+
+@pytest.mark.anyio
+async def test_histogram_render_is_cumulative():
+    histogram = Histogram("test_duration_seconds", "Test", ("route",), buckets=(0.1, 1))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(5, "/a")
+
+    lines = histogram.render()
+    assert lines[:2] == ["# HELP test_duration_seconds Test", "# TYPE test_duration_seconds histogram"]
+    assert 'test_duration_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'test_duration_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'test_duration_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'test_duration_seconds_sum{route="/a"} 5.55' in lines
+    assert 'test_duration_seconds_count{route="/a"} 3' in lines
+
+
+@pytest.mark.anyio
+async def test_label_values_escaped():
+    counter = Counter("test_total", "Test", ("path",))
+    counter.inc('a"b\\c')
+    assert counter.samples() == ['test_total{path="a\\"b\\\\c"} 1']
+
+
+@pytest.mark.anyio
+async def test_metrics_endpoint(client: AsyncClient):
+    await create_jobs(1)
+    requests_before = http_requests.value("GET", "/jobs/{job_id}", "200")
+    durations_before = http_request_duration.count("GET", "/jobs/{job_id}")
+    queries_before = db_query_duration.count("JobRepository.get_job_by_id")
+
+    response = await client.get("/jobs/1")
+    assert response.status_code == 200
+    await client.get("/no-such-path/123")
+
+    # Метка — шаблон маршрута, а не путь; запрос к БД подписан методом репозитория
+    assert http_requests.value("GET", "/jobs/{job_id}", "200") == requests_before + 1
+    assert http_request_duration.count("GET", "/jobs/{job_id}") == durations_before + 1
+    assert db_query_duration.count("JobRepository.get_job_by_id") == queries_before + 1
+    assert http_requests.value("GET", "unmatched", "404") >= 1
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/jobs/{job_id}"}' in text
+    assert 'db_query_duration_seconds_count{method="JobRepository.get_job_by_id"}' in text
+    assert 'cache_misses_total{cache="jobs"}' in text
+    assert 'db_pool_connections_in_use{database="primary"} 0' in text
+    assert "http_requests_in_flight 1" in text
+    assert "/no-such-path" not in text
+
+
+@pytest.mark.anyio
+async def test_unknown_methods_share_one_label(client: AsyncClient):
+    before = http_requests.value("other", "/jobs/", "405")
+    for method in ("FOO", "BAR", "QWERTY"):
+        response = await client.request(method, "/jobs/")
+        assert response.status_code == 405
+
+    # Произвольные методы не создают новых рядов
+    assert http_requests.value("other", "/jobs/", "405") == before + 3
+    text = (await client.get("/metrics")).text
+    assert "FOO" not in text and "QWERTY" not in text
@@ -0,0 +1,48 @@
+import asyncio
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from db.instrumentation import InstrumentedDatabase
+from db.pool import PoolTimeout
+from main import app
+from models.user import users
+
+
+@pytest.mark.anyio
+async def test_db_pool_stats_endpoint(client: AsyncClient, internal_headers: dict):
+    await client.get("/users/")
+    response = await client.get("/internal/db-pool", headers=internal_headers)
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["acquired"] >= 1
+    assert stats["in_use"] == 0
+    assert stats["waiting"] == 0
+    assert sum(stats["acquire_ms_histogram"].values()) == stats["acquired"]
+
+
+@pytest.mark.anyio
+async def test_db_pool_acquire_timeout(client: AsyncClient):
+    database = InstrumentedDatabase(str(app.state.database.url), pool_max_size=1, acquire_timeout=0.05)
+    await database.connect()
+    try:
+        held, release = asyncio.Event(), asyncio.Event()
+
+        async def hold_connection():
+            async with database.connection():
+                held.set()
+                await release.wait()
+
+        holder = asyncio.ensure_future(hold_connection())
+        await held.wait()
+        assert database.pool_stats()["in_use"] == 1
+
+        with pytest.raises(PoolTimeout):
+            await database.fetch_all(select(users.c.id))
+        assert database.pool_stats()["timeouts"] == 1
+
+        release.set()
+        await holder
+        assert await database.fetch_all(select(users.c.id)) == []
+        assert database.pool_stats()["in_use"] == 0
+    finally:
+        await database.disconnect()
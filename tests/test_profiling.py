@@ -0,0 +1,121 @@
+import io
+import marshal
+import pstats
+import threading
+import time
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+import dependencies
+from dependencies import profile_store
+from endpoints import profiles
+from main import app, lifespan
+from tests.test_jobs import create_jobs
+from utils.profiling import ProfilingMiddleware, StackSampler
+
+
+# Эндпоинты профилей подключаются в main только при PROFILING_ENABLED — в тестах отдельное приложение
+profiles_app = FastAPI()
+profiles_app.include_router(profiles.router)
+
+
+def profiled_client(**options) -> AsyncClient:
+    profiled_app = ProfilingMiddleware(app, profile_store, token="secret", **options)
+    return AsyncClient(transport=ASGITransport(app=profiled_app), base_url="http://test")
+
+
+@pytest.fixture
+def profiles_client(internal_headers: dict):
+    return AsyncClient(transport=ASGITransport(app=profiles_app), base_url="http://test", headers=internal_headers)
+
+
+@pytest.mark.anyio
+async def test_profile_by_header(profiles_client: AsyncClient):
+    profile_store.clear()
+    await create_jobs(3)
+    async with profiled_client() as client, profiles_client:
+        # Без заголовка и с чужим токеном — без профиля
+        response = await client.get("/jobs/")
+        assert "X-Profile-Id" not in response.headers
+        response = await client.get("/jobs/", headers={"X-Profile": "wrong"})
+        assert "X-Profile-Id" not in response.headers
+        assert profile_store.list() == []
+
+        response = await client.get("/jobs/", headers={"X-Profile": "secret"})
+        assert response.status_code == 200
+        profile_id = response.headers["X-Profile-Id"]
+
+        listing = (await profiles_client.get("/internal/profiles")).json()
+        assert [(item["id"], item["route"], item["status"]) for item in listing] == [(profile_id, "/jobs/", 200)]
+
+        text = await profiles_client.get(f"/internal/profiles/{profile_id}")
+        assert text.status_code == 200
+        assert "get_jobs_page" in text.text
+
+        # Файл pstats загружается стандартным pstats
+        response = await profiles_client.get(f"/internal/profiles/{profile_id}", params={"format": "pstats"})
+        stats = pstats.Stats(stream=io.StringIO())
+        stats.stats = marshal.loads(response.content)
+        assert any(name == "get_jobs_page" for _, _, name in stats.stats)
+
+        response = await profiles_client.get(f"/internal/profiles/{profile_id}", params={"format": "collapsed"})
+        assert response.status_code == 400
+        assert (await profiles_client.get("/internal/profiles/missing")).status_code == 404
+
+
+@pytest.mark.anyio
+async def test_profile_sampling_rate():
+    profile_store.clear()
+    async with profiled_client(sample_rate=1.0, mode="sample", sample_interval=0.001) as client:
+        response = await client.get("/")
+    assert profile_store.get(response.headers["X-Profile-Id"]).mode == "sample"
+
+
+@pytest.mark.anyio
+async def test_stack_sampler_collapsed():
+    def busy_wait(seconds: float):
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            pass
+
+    sampler = StackSampler(threading.get_ident(), 0.001)
+    sampler.start()
+    busy_wait(0.1)
+    stacks = sampler.stop()
+
+    assert stacks
+    stack, count = stacks.most_common(1)[0]
+    assert count > 0
+    assert stack.split(";")[-1].startswith("test_stack_sampler_collapsed.<locals>.busy_wait")
+
+
+@pytest.mark.anyio
+async def test_profiles_require_internal_token(monkeypatch):
+    async with AsyncClient(transport=ASGITransport(app=profiles_app), base_url="http://test") as client:
+        # Токен не настроен — профили не отдаются никому
+        monkeypatch.setattr(dependencies, "INTERNAL_API_TOKEN", "")
+        assert (await client.get("/internal/profiles")).status_code == 403
+        assert (await client.get("/internal/profiles", headers={"X-Internal-Token": ""})).status_code == 403
+
+        monkeypatch.setattr(dependencies, "INTERNAL_API_TOKEN", "internal-secret")
+        assert (await client.get("/internal/profiles")).status_code == 403
+        # Токен профилирования — не доступ к /internal
+        assert (await client.get("/internal/profiles", headers={"X-Profile": "internal-secret"})).status_code == 403
+        assert (await client.get("/internal/profiles", headers={"X-Internal-Token": "wrong"})).status_code == 403
+        response = await client.get("/internal/profiles", headers={"X-Internal-Token": "internal-secret"})
+        assert response.status_code == 200
+
+
+@pytest.mark.anyio
+async def test_profiles_not_mounted_when_disabled(client: AsyncClient, internal_headers: dict):
+    assert (await client.get("/internal/profiles", headers=internal_headers)).status_code == 404
+
+
+@pytest.mark.anyio
+async def test_profiling_without_token_refuses_to_start(monkeypatch):
+    import main
+    monkeypatch.setattr(main, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(main, "PROFILING_TOKEN", "")
+    with pytest.raises(ValueError, match="PROFILING_TOKEN"):
+        async with lifespan(app):
+            pass
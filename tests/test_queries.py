@@ -0,0 +1,68 @@
+import pytest
+import uuid
+from httpx import AsyncClient, ASGITransport
+from db.instrumentation import QueryLogMiddleware
+from main import app
+from tests.test_jobs import create_jobs
+
+
+def random_email():
+    return f"user_{uuid.uuid4()}@test.com"
+
+
+async def create_user(client: AsyncClient) -> int:
+    response = await client.post("/users/", json={
+        "email": random_email(),
+        "name": f"User_{uuid.uuid4().hex[:6]}",
+        "password": "secret123",
+        "is_company": False
+    })
+    return response.json()["id"]
+
+
+@pytest.mark.anyio
+async def test_create_user_query_budget(client: AsyncClient, query_budget):
+    with query_budget(1):
+        await create_user(client)
+
+
+@pytest.mark.anyio
+async def test_delete_user_query_budget(client: AsyncClient, query_budget):
+    user_id = await create_user(client)
+    with query_budget(1):
+        response = await client.delete(f"/users/{user_id}")
+    assert response.status_code == 200
+
+    company_id = await create_jobs(3)
+    with query_budget(2):
+        response = await client.delete(f"/users/{company_id}")
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Cannot delete user with active jobs"
+
+
+@pytest.mark.anyio
+async def test_job_read_and_update_query_budget(client: AsyncClient, query_budget):
+    user_id = await create_jobs(1)
+    job_id = (await client.get("/jobs/")).json()["items"][0]["id"]
+
+    with query_budget(1):
+        assert (await client.get(f"/jobs/{job_id}")).status_code == 200
+    # Повторное чтение обслуживает кэш
+    with query_budget(0):
+        assert (await client.get(f"/jobs/{job_id}")).status_code == 200
+
+    payload = {"user_id": user_id, "title": "Job", "description": "Test", "salary_from": 1, "salary_to": 2}
+    # SELECT старой версии, UPDATE ... RETURNING и одна пачка upsert в сводку зарплат
+    with query_budget(3):
+        assert (await client.put(f"/jobs/{job_id}", json=payload)).status_code == 200
+
+
+@pytest.mark.anyio
+async def test_query_headers_in_debug_mode():
+    transport = ASGITransport(app=QueryLogMiddleware(app, expose_headers=True))
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        await create_jobs(2)
+        response = await client.get("/jobs/")
+    assert response.status_code == 200
+    assert int(response.headers["X-DB-Queries"]) >= 1
+    assert response.headers["Server-Timing"].startswith("db;dur=")
@@ -0,0 +1,94 @@
+import os
+import uuid
+from datetime import datetime, timezone
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import create_engine, func, select
+from db.base import metadata
+from db.instrumentation import InstrumentedDatabase
+from db.replicas import ReplicaSet
+from utils.cache import NullCache
+from dependencies import get_job_cache, get_replicas, user_cache
+from main import app
+from models.jobs import jobs
+from models.user import users
+
+
+@pytest.fixture
+async def replica():
+    # Вторая SQLite-база в роли реплики: схема та же, данные — только то, что положит тест
+    path = f"test_replica_{uuid.uuid4().hex}.db"
+    engine = create_engine(f"sqlite:///./{path}")
+    metadata.create_all(engine)
+    engine.dispose()
+    database = InstrumentedDatabase(f"sqlite+aiosqlite:///./{path}")
+    await database.connect()
+    app.dependency_overrides[get_replicas] = lambda: ReplicaSet([database])
+    yield database
+    app.dependency_overrides.pop(get_replicas, None)
+    await database.disconnect()
+    os.remove(path)
+
+
+async def insert_job(database, title: str) -> int:
+    now = datetime.now(timezone.utc)
+    return await database.execute(jobs.insert().values(
+        user_id=1, title=title, description="Test", salary_from=1, salary_to=2,
+        is_active=True, created_at=now, updated_at=now,
+    ))
+
+
+@pytest.mark.anyio
+async def test_reads_go_to_replica_and_writes_to_primary(client: AsyncClient, replica):
+    primary = app.state.database
+    job_id = await insert_job(replica, "Only on replica")
+
+    response = await client.get("/jobs/")
+    assert [job["title"] for job in response.json()["items"]] == ["Only on replica"]
+    # С кэшем чтение по id наполняет его с основной БД, без кэша — идёт на реплику
+    assert (await client.get(f"/jobs/{job_id}")).status_code == 404
+    app.dependency_overrides[get_job_cache] = NullCache
+    try:
+        assert (await client.get(f"/jobs/{job_id}")).status_code == 200
+    finally:
+        app.dependency_overrides.pop(get_job_cache)
+
+    response = await client.post("/users/", json={
+        "email": f"user_{uuid.uuid4()}@test.com",
+        "name": f"User_{uuid.uuid4().hex[:6]}",
+        "password": "secret123",
+        "is_company": False
+    })
+    assert response.status_code == 200, response.json()
+    assert await primary.fetch_val(select(func.count()).select_from(users)) == 1
+    assert await replica.fetch_val(select(func.count()).select_from(users)) == 0
+
+
+@pytest.mark.anyio
+async def test_deleted_user_not_recached_from_lagging_replica(client: AsyncClient, replica):
+    primary = app.state.database
+    email = f"user_{uuid.uuid4()}@test.com"
+    response = await client.post("/users/", json={
+        "email": email, "name": f"User_{uuid.uuid4().hex[:6]}", "password": "secret123", "is_company": False
+    })
+    user_id = response.json()["id"]
+    await primary.execute(users.update().where(users.c.id == user_id).values(is_verified=True, updated_at=users.c.updated_at))
+    # Реплика ещё не применила удаление: строка пользователя на ней остаётся
+    row = await primary.fetch_one(users.select().where(users.c.id == user_id))
+    await replica.execute(users.insert().values(**dict(row._mapping)))
+    assert (await client.get(f"/users/{user_id}")).status_code == 200
+
+    assert (await client.delete(f"/users/{user_id}")).status_code == 200
+    assert user_cache.get(("user_email", email)) is None
+    assert (await client.get(f"/users/{user_id}")).status_code == 404
+    assert user_cache.get(("user", user_id)) is None
+    response = await client.post("/login", data={"username": email, "password": "secret123"})
+    assert response.status_code == 401
+
+
+@pytest.mark.anyio
+async def test_replica_set_round_robin():
+    primary, first, second = object(), object(), object()
+    assert ReplicaSet().choose(primary) is primary
+    replicas = ReplicaSet([first, second])
+    assert [replicas.choose(primary) for _ in range(4)] == [first, second, first, second]
@@ -0,0 +1,108 @@
+import os
+import uuid
+import pytest
+from collections import Counter
+from httpx import AsyncClient
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.dialects import postgresql
+import commands.seed_data
+from commands.seed_data import build_parser, seed, sequence_resets
+from conftest import SYNC_DATABASE_URL
+from db.base import metadata
+from main import app
+from models.jobs import jobs, SQLITE_FTS_TRIGGERS
+from models.user import users
+from repositories.job_repository import JobRepository
+from repositories.job_stats_repository import JobStatsRepository, stats_keys
+
+
+def seed_into(monkeypatch, url: str, *argv: str) -> None:
+    # Небольшой прогон: пересборку сводки тест делает сам через JobRepository
+    monkeypatch.setattr(commands.seed_data, "create_sync_engine", lambda: create_engine(url))
+    seed(build_parser().parse_args([
+        "--users", "50", "--jobs", "500", "--seed", "7", "--until", "2026-01-01",
+        "--batch-size", "128", "--skip-stats", *argv,
+    ]))
+
+
+def table_rows(url: str, table) -> list:
+    engine = create_engine(url)
+    try:
+        with engine.connect() as connection:
+            # Соль в хеше пароля случайна — сравниваются остальные колонки
+            columns = [column for column in table.c if column.name != "hashed_password"]
+            return [tuple(row) for row in connection.execute(select(*columns).order_by(table.c.id))]
+    finally:
+        engine.dispose()
+
+
+@pytest.mark.anyio
+async def test_seed_is_deterministic(monkeypatch):
+    # Вторая пустая база рядом с тестовой
+    path = f"test_seed_{uuid.uuid4().hex}.db"
+    other_url = f"sqlite:///./{path}"
+    engine = create_engine(other_url)
+    metadata.create_all(engine)
+    engine.dispose()
+    try:
+        seed_into(monkeypatch, SYNC_DATABASE_URL)
+        seed_into(monkeypatch, other_url, "--drop-indexes")
+        for table in (users, jobs):
+            rows = table_rows(SYNC_DATABASE_URL, table)
+            assert rows and rows == table_rows(other_url, table)
+    finally:
+        os.remove(path)
+
+
+@pytest.mark.anyio
+async def test_seed_run_twice(client: AsyncClient, monkeypatch):
+    database = app.state.database
+    seed_into(monkeypatch, SYNC_DATABASE_URL, "--drop-indexes")
+    seed_into(monkeypatch, SYNC_DATABASE_URL, "--drop-indexes")
+
+    # Второй прогон продолжает id после первого
+    for table, count in ((users, 100), (jobs, 1000)):
+        row = await database.fetch_one(select(
+            func.count().label("count"), func.min(table.c.id).label("min"), func.max(table.c.id).label("max")
+        ))
+        assert dict(row) == {"count": count, "min": 1, "max": count}
+    owners = await database.fetch_val(select(func.count(func.distinct(jobs.c.user_id))))
+    assert owners > 1
+
+    # Индексы и FTS-триггеры на месте, поиск находит загруженные вакансии
+    names = {row[0] for row in await database.fetch_all("SELECT name FROM sqlite_master WHERE tbl_name = 'jobs'")}
+    assert {index.name for index in jobs.indexes} | set(SQLITE_FTS_TRIGGERS) <= names
+    title = await database.fetch_val(select(jobs.c.title).where(jobs.c.id == 1000))
+    word = title.split()[-1]
+    found = (await client.get("/jobs/search", params={"q": word, "limit": 100})).json()
+    assert found and all(word in job["title"] for job in found)
+
+    # Сводка, залитая пересборкой через load(), совпадает с применённой upsert'ами по каждой вакансии
+    repository = JobRepository(database)
+    assert await repository.rebuild_stats(batch_size=200) == await database.fetch_val(
+        select(func.count()).select_from(jobs).where(jobs.c.is_active)
+    )
+    employer = await database.fetch_val(select(jobs.c.user_id).where(jobs.c.id == 1))
+    slices = [(), (employer,), (None, word.lower())]
+    rebuilt = [await repository.get_stats(*args) for args in slices]
+    assert rebuilt[0].count > 0
+
+    stats = JobStatsRepository(database)
+    await stats.clear()
+    delta = Counter()
+    for row in await database.fetch_all(jobs.select()):
+        delta.update(stats_keys(row._mapping))
+    await stats.apply(delta)
+    assert [await repository.get_stats(*args) for args in slices] == rebuilt
+
+
+@pytest.mark.anyio
+async def test_sequence_resets_for_postgres():
+    # Загрузка идёт с явными id — после неё последовательности users и jobs сдвигаются за max(id)
+    for query, table in zip(sequence_resets(), ("users", "jobs")):
+        compiled = query.compile(dialect=postgresql.dialect())
+        assert " ".join(str(compiled).split()) == (
+            "SELECT setval(pg_get_serial_sequence(%(pg_get_serial_sequence_1)s, %(pg_get_serial_sequence_2)s), "
+            f"coalesce(max({table}.id), %(coalesce_1)s), max({table}.id) IS NOT NULL) AS setval_1 FROM {table}"
+        )
+        assert compiled.params == {"pg_get_serial_sequence_1": table, "pg_get_serial_sequence_2": "id", "coalesce_1": 1}
@@ -0,0 +1,140 @@
+import logging
+import pytest
+import db.instrumentation
+from httpx import AsyncClient
+from db.slow_queries import SlowQueryLog
+from db.sqlite import ImmediateTransaction
+from dependencies import get_slow_query_log
+from main import app
+from models.jobs import jobs
+from repositories.job_repository import JobRepository
+from tests.test_jobs import create_jobs
+
+
+class LegacyJobRepository:
+    def __init__(self, database):
+        self.database = database
+
+    async def get_all_jobs(self):
+        # Сортировка по колонке без индекса — то, что журнал должен ловить
+        return await self.database.fetch_all(jobs.select().order_by(jobs.c.salary_from.desc()).limit(10))
+
+
+@pytest.fixture
+def slow_query_log():
+    database = app.state.database
+    log = SlowQueryLog(threshold=0.0)
+    database.slow_queries = log
+    yield log
+    database.slow_queries = None
+
+
+@pytest.mark.anyio
+async def test_slow_query_recorded_with_plan(slow_query_log: SlowQueryLog, caplog):
+    await create_jobs(3)
+    # При нулевом пороге медленные и вставки, их план тоже снимается
+    inserts = slow_query_log.worst()
+    assert inserts and all("EXPLAIN failed" not in query.plan for query in inserts)
+    slow_query_log.clear()
+    caplog.clear()
+    repository = LegacyJobRepository(app.state.database)
+
+    with caplog.at_level(logging.WARNING, logger="db.slow_queries"):
+        await repository.get_all_jobs()
+        await repository.get_all_jobs()
+
+    [query] = slow_query_log.worst()
+    assert query.method == "LegacyJobRepository.get_all_jobs"
+    assert query.count == 2
+    assert query.params == {"param_1": "int"}
+    assert "ORDER BY jobs.salary_from DESC" in query.sql
+    assert "SCAN jobs" in query.plan
+    assert "USE TEMP B-TREE FOR ORDER BY" in query.plan
+    # План снимается один раз на форму запроса, сам EXPLAIN в журнал не попадает
+    messages = [record.getMessage() for record in caplog.records]
+    assert len([message for message in messages if message.startswith("План")]) == 1
+    assert len([message for message in messages if message.startswith("Медленный")]) == 2
+    assert all("EXPLAIN" not in message for message in messages)
+
+
+@pytest.mark.anyio
+async def test_slow_query_shape_ignores_values(slow_query_log: SlowQueryLog):
+    await create_jobs(2)
+    slow_query_log.clear()
+    repository = JobRepository(app.state.database)
+    await repository.get_job_by_id(1)
+    await repository.get_job_by_id(2)
+
+    [query] = slow_query_log.worst()
+    assert query.method == "JobRepository.get_job_by_id"
+    assert query.count == 2
+    assert query.params == {"id_1": "int"}
+    assert "USING INTEGER PRIMARY KEY" in query.plan
+
+
+@pytest.mark.anyio
+async def test_failed_explain_keeps_caller_transaction(slow_query_log: SlowQueryLog, monkeypatch):
+    await create_jobs(2)
+    slow_query_log.clear()
+    database = app.state.database
+    started = []
+    start = ImmediateTransaction.start
+
+    async def record_start(self, is_root, extra_options):
+        started.append(is_root)
+        await start(self, is_root, extra_options)
+
+    monkeypatch.setattr(ImmediateTransaction, "start", record_start)
+    monkeypatch.setattr(db.instrumentation, "explain_statement", lambda query, dialect: "EXPLAIN QUERY PLAN SELEC 1")
+
+    async with database.transaction():
+        await database.execute(jobs.update().where(jobs.c.id == 1).values(title="В транзакции"))
+        await JobRepository(database).get_job_by_id(2)
+    # EXPLAIN UPDATE и SELECT внутри транзакции — каждый в своём savepoint, транзакция вызывающего коммитится
+    assert started == [True, False, False]
+    assert len(slow_query_log.worst()) == 2 and all(query.plan.startswith("EXPLAIN failed") for query in slow_query_log.worst())
+    assert await database.fetch_val(jobs.select().with_only_columns(jobs.c.title).where(jobs.c.id == 1)) == "В транзакции"
+
+    # Вне транзакции savepoint не нужен
+    started.clear()
+    slow_query_log.clear()
+    await JobRepository(database).get_job_by_id(2)
+    assert started == []
+
+
+@pytest.mark.anyio
+async def test_fast_queries_not_recorded(slow_query_log: SlowQueryLog):
+    slow_query_log.threshold = 60
+    await create_jobs(1)
+    await JobRepository(app.state.database).get_job_by_id(1)
+    assert slow_query_log.worst() == []
+
+
+@pytest.mark.anyio
+async def test_slow_queries_endpoint(client: AsyncClient, slow_query_log: SlowQueryLog, internal_headers: dict):
+    client.headers.update(internal_headers)
+    app.dependency_overrides[get_slow_query_log] = lambda: None
+    try:
+        response = await client.get("/internal/slow-queries")
+        assert response.status_code == 404
+    finally:
+        app.dependency_overrides.pop(get_slow_query_log)
+
+    app.dependency_overrides[get_slow_query_log] = lambda: slow_query_log
+    try:
+        await create_jobs(1)
+        slow_query_log.clear()
+        slow_query_log.record("SELECT 1", None, 0.5, "Fast.method")
+        slow_query_log.record("SELECT 2", None, 2.0, "Slow.method")
+        slow_query_log.record("SELECT 1", None, 0.5, "Fast.method")
+        slow_query_log.record("SELECT 1", None, 0.5, "Fast.method")
+
+        worst = (await client.get("/internal/slow-queries")).json()
+        assert [item["method"] for item in worst] == ["Slow.method", "Fast.method"]
+        assert worst[0]["max_ms"] == 2000
+
+        frequent = (await client.get("/internal/slow-queries", params={"order_by": "count", "limit": 1})).json()
+        assert [(item["method"], item["count"]) for item in frequent] == [("Fast.method", 3)]
+    finally:
+        app.dependency_overrides.pop(get_slow_query_log)
+
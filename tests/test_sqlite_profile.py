@@ -0,0 +1,52 @@
+import os
+import uuid
+from datetime import datetime, timezone
+import pytest
+from sqlalchemy import create_engine
+from db.base import metadata
+from db.instrumentation import InstrumentedDatabase
+from db.sqlite import apply_sqlite_profile
+from repositories.user_repository import UserRepository
+from models.jobs import jobs
+from models.user import users
+
+
+@pytest.fixture
+async def profiled_database():
+    path = f"test_profile_{uuid.uuid4().hex}.db"
+    engine = create_engine(f"sqlite:///./{path}")
+    metadata.create_all(engine)
+    engine.dispose()
+    database = InstrumentedDatabase(f"sqlite+aiosqlite:///./{path}", on_connect=apply_sqlite_profile)
+    await database.connect()
+    yield database
+    await database.disconnect()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+@pytest.mark.anyio
+async def test_sqlite_profile_applied_on_every_connection(profiled_database):
+    assert await profiled_database.fetch_val("PRAGMA journal_mode") == "wal"
+    # synchronous=NORMAL — 1, настройки соединения действуют и на следующем захвате
+    assert await profiled_database.fetch_val("PRAGMA synchronous") == 1
+    assert await profiled_database.fetch_val("PRAGMA foreign_keys") == 1
+    assert await profiled_database.fetch_val("PRAGMA busy_timeout") == 5000
+    # Соединение вернулось в пул открытым и переиспользуется
+    assert profiled_database.pool_stats()["idle"] == 1
+
+
+@pytest.mark.anyio
+async def test_delete_user_with_closed_jobs_under_foreign_keys(profiled_database):
+    now = datetime.now(timezone.utc)
+    user_id = await profiled_database.execute(users.insert().values(
+        email="fk@test.com", name="FK", hashed_password="x", is_company=True, is_verified=True,
+        created_at=now, updated_at=now,
+    ))
+    await profiled_database.execute(jobs.insert().values(
+        user_id=user_id, title="Closed", description="Test", salary_from=1, salary_to=2,
+        is_active=False, created_at=now, updated_at=now,
+    ))
+    with pytest.raises(ValueError, match="Cannot delete user with jobs"):
+        await UserRepository(profiled_database).delete_user(user_id)
@@ -0,0 +1,183 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import pytest
+from datetime import datetime
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, MetaData, String, Table, Text, inspect
+from db.base import create_sync_engine, metadata
+from db.migrations import MigrationStateError, check_migration_state, current_revisions, expected_heads, stamp_head
+from main import app
+
+
+# Холодный старт процесса: импорт main и вход в lifespan (подключение к БД, проверка ревизии).
+# Сейчас около 1 с; бюджет с запасом на медленные CI-машины
+COLD_START_BUDGET_SECONDS = 3.0
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Схема, которую создавал create_all при старте до появления миграций в приложении
+legacy_metadata = MetaData()
+Table(
+    "users", legacy_metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("email", String, unique=True, index=True),
+    Column("name", String, unique=True, index=True),
+    Column("hashed_password", String),
+    Column("is_company", Boolean),
+    Column("is_verified", Boolean, nullable=False),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+)
+Table(
+    "jobs", legacy_metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("title", String, index=True),
+    Column("description", Text),
+    Column("salary_from", Integer),
+    Column("salary_to", Integer),
+    Column("is_active", Boolean, nullable=False),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+)
+
+COLD_START_SCRIPT = """
+import time
+started = time.perf_counter()
+import asyncio
+import main
+
+async def start():
+    async with main.lifespan(main.app):
+        pass
+
+asyncio.run(start())
+print(time.perf_counter() - started)
+"""
+
+
+@pytest.mark.anyio
+async def test_check_fails_without_alembic_version():
+    # Тестовая БД создана через create_all и ревизией не отмечена
+    with pytest.raises(MigrationStateError, match="alembic upgrade head"):
+        await check_migration_state(app.state.database)
+
+
+@pytest.mark.anyio
+async def test_check_fails_on_old_revision():
+    await stamp_head(app.state.database)
+    await app.state.database.execute("UPDATE alembic_version SET version_num = '9d2936f5605d'")
+
+    with pytest.raises(MigrationStateError, match="9d2936f5605d"):
+        await check_migration_state(app.state.database)
+
+
+@pytest.mark.anyio
+async def test_check_passes_at_head():
+    await stamp_head(app.state.database)
+
+    await check_migration_state(app.state.database)
+    rows = await app.state.database.fetch_all("SELECT version_num FROM alembic_version")
+    assert {row["version_num"] for row in rows} == expected_heads()
+
+
+@pytest.mark.anyio
+async def test_cold_start_under_budget(tmp_path):
+    path = tmp_path / "startup.db"
+    engine = create_sync_engine(f"sqlite:///{path}")
+    metadata.create_all(engine)
+    engine.dispose()
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL PRIMARY KEY)")
+        connection.executemany("INSERT INTO alembic_version VALUES (?)", [(head,) for head in expected_heads()])
+    connection.close()
+
+    env = {**os.environ, "DATABASE_URL": f"sqlite+aiosqlite:///{path}", "DB_STARTUP_MODE": "check"}
+    result = subprocess.run(
+        [sys.executable, "-c", COLD_START_SCRIPT],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env, capture_output=True, text=True, timeout=60,
+    )
+
+    assert result.returncode == 0, result.stderr
+    elapsed = float(result.stdout.strip().splitlines()[-1])
+    assert elapsed < COLD_START_BUDGET_SECONDS, f"cold start took {elapsed:.2f}s"
+
+
+def alembic_upgrade_head(path) -> None:
+    env = {**os.environ, "DATABASE_URL": f"sqlite+aiosqlite:///{path}"}
+    result = subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+
+
+def assert_schema_matches_models(path) -> None:
+    engine = create_sync_engine(f"sqlite:///{path}")
+    try:
+        inspector = inspect(engine)
+        for table in metadata.sorted_tables:
+            assert {column["name"] for column in inspector.get_columns(table.name)} == set(table.columns.keys())
+            indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            assert {index.name for index in table.indexes} <= indexes, table.name
+        with engine.connect() as connection:
+            revisions = {row[0] for row in connection.exec_driver_sql("SELECT version_num FROM alembic_version")}
+        assert revisions == expected_heads()
+    finally:
+        engine.dispose()
+
+
+@pytest.mark.anyio
+async def test_upgrade_empty_database(tmp_path):
+    path = tmp_path / "empty.db"
+    alembic_upgrade_head(path)
+    assert_schema_matches_models(path)
+
+
+@pytest.mark.anyio
+async def test_upgrade_legacy_create_all_database(tmp_path):
+    path = tmp_path / "legacy.db"
+    engine = create_sync_engine(f"sqlite:///{path}")
+    legacy_metadata.create_all(engine)
+    engine.dispose()
+    with sqlite3.connect(path) as connection:
+        connection.execute(
+            "INSERT INTO users (id, email, name, hashed_password, is_company, is_verified, created_at, updated_at) "
+            "VALUES (1, 'a@test.com', 'A', 'x', 1, 1, ?, ?)", (datetime(2025, 1, 1), datetime(2025, 1, 1)),
+        )
+        connection.execute(
+            "INSERT INTO jobs (id, user_id, title, description, salary_from, salary_to, is_active, created_at, updated_at) "
+            "VALUES (1, 1, 'Python dev', 'Test', 100, 200, 1, ?, ?)", (datetime(2025, 1, 1), datetime(2025, 1, 1)),
+        )
+    connection.close()
+
+    alembic_upgrade_head(path)
+    assert_schema_matches_models(path)
+    with sqlite3.connect(path) as connection:
+        assert connection.execute("SELECT title, experience FROM jobs").fetchall() == [("Python dev", None)]
+        # Уже существующие вакансии попали в полнотекстовый индекс
+        assert connection.execute("SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH 'python'").fetchall() == [(1,)]
+    connection.close()
+
+
+@pytest.mark.anyio
+async def test_upgrade_current_create_all_database(tmp_path):
+    path = tmp_path / "current.db"
+    engine = create_sync_engine(f"sqlite:///{path}")
+    metadata.create_all(engine)
+    engine.dispose()
+
+    alembic_upgrade_head(path)
+    assert_schema_matches_models(path)
+
+
+@pytest.mark.anyio
+async def test_locked_database_is_not_reported_as_unmigrated():
+    class LockedDatabase:
+        async def fetch_all(self, query):
+            raise sqlite3.OperationalError("database is locked")
+
+    with pytest.raises(sqlite3.OperationalError, match="locked"):
+        await current_revisions(LockedDatabase())
@@ -1,6 +1,8 @@
 import pytest
 from httpx import AsyncClient
 import uuid
+from auth import create_verification_token
+from dependencies import user_cache
 
 
 def random_email():
@@ -45,4 +47,80 @@ async def test_create_user_duplicate_email(client: AsyncClient):
         "is_company": False
     })
     assert response.status_code == 400
-    assert "already registered" in response.json()["detail"]
\ No newline at end of file
+    assert "already registered" in response.json()["detail"]
+
+@pytest.mark.anyio
+async def test_verify_email_invalidates_cached_user(client: AsyncClient):
+    email = random_email()
+    response = await client.post("/users/", json={
+        "email": email,
+        "name": f"User_{uuid.uuid4().hex[:6]}",
+        "password": "secret123",
+        "is_company": False
+    })
+    user_id = response.json()["id"]
+
+    # Первое чтение кладёт пользователя в кэш, второе берёт из кэша
+    response = await client.get(f"/users/{user_id}")
+    assert response.status_code == 200, response.json()
+    assert response.json()["is_verified"] is False
+    assert "hashed_password" not in response.json()
+    response = await client.get(f"/users/{user_id}")
+    assert response.json()["is_verified"] is False
+    assert user_cache.stats()["hits"] >= 1
+
+    response = await client.get("/verify-email", params={"token": create_verification_token(email)})
+    assert response.status_code == 200, response.json()
+
+    response = await client.get(f"/users/{user_id}")
+    assert response.json()["is_verified"] is True
+
+
+@pytest.mark.anyio
+async def test_update_user_conflicts(client: AsyncClient):
+    first = {"email": random_email(), "name": f"User_{uuid.uuid4().hex[:6]}", "password": "secret123"}
+    second = {"email": random_email(), "name": f"User_{uuid.uuid4().hex[:6]}", "password": "secret123"}
+    await client.post("/users/", json=first)
+    user_id = (await client.post("/users/", json=second)).json()["id"]
+
+    # Email занят другим пользователем — ловится UNIQUE-индексом
+    response = await client.put(f"/users/{user_id}", json={**second, "email": first["email"]})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Email or name already in use"
+
+    response = await client.put("/users/999999", json=second)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "User not found"
+
+    response = await client.put(f"/users/{user_id}", json={**second, "name": "Renamed"})
+    assert response.status_code == 200, response.json()
+    assert response.json()["name"] == "Renamed"
+
+
+@pytest.mark.anyio
+async def test_read_users_paginated(client: AsyncClient, query_budget):
+    created_ids = []
+    for _ in range(3):
+        response = await client.post("/users/", json={
+            "email": random_email(),
+            "name": f"User_{uuid.uuid4().hex[:6]}",
+            "password": "secret123",
+            "is_company": False
+        })
+        created_ids.append(response.json()["id"])
+
+    with query_budget(1):
+        response = await client.get("/users/", params={"limit": 2})
+    assert response.status_code == 200, response.json()
+    page = response.json()
+    assert [user["id"] for user in page["items"]] == created_ids[::-1][:2]
+    assert set(page["items"][0]) == {"id", "name", "is_company", "is_verified", "created_at"}
+    assert page["next_cursor"]
+
+    response = await client.get("/users/", params={"limit": 2, "cursor": page["next_cursor"]})
+    page = response.json()
+    assert [user["id"] for user in page["items"]] == created_ids[:1]
+    assert page["next_cursor"] is None
+
+    response = await client.get("/users/", params={"cursor": "garbage"})
+    assert response.status_code == 400
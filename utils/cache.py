@@ -0,0 +1,118 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class Cache(ABC):
+    """
+    Интерфейс кэша между сервисами и репозиториями.
+    get возвращает None при промахе, поэтому None в кэше не хранится.
+    """
+    enabled = True
+
+    @abstractmethod
+    def get(self, key: Hashable) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, key: Hashable) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    @abstractmethod
+    def stats(self) -> dict:
+        ...
+
+
+class NullCache(Cache):
+    """Кэш выключен: всегда промах, ничего не хранит."""
+    enabled = False
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        return None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        pass
+
+    def delete(self, key: Hashable) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {"enabled": False}
+
+
+class LRUCache(Cache):
+    """
+    In-process LRU с ограничением по размеру и TTL на запись.
+    Рассчитан на один event loop: блокировки не нужны, все операции O(1).
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": True,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def build_cache(maxsize: int, ttl: float) -> Cache:
+    if maxsize <= 0 or ttl <= 0:
+        return NullCache()
+    return LRUCache(maxsize=maxsize, ttl=ttl)
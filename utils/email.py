@@ -1,37 +1,172 @@
+import asyncio
+import logging
 import os
-from jinja2 import Environment, FileSystemLoader
+import smtplib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from email.message import EmailMessage
+from typing import Optional
+from jinja2 import Environment, FileSystemLoader, select_autoescape
 
 
-def send_verification_email(
-    email: str,
-    name: str,
-    token: str,
-    base_url: str = "http://127.0.0.1:8000"
-) -> None:
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "..", "templates")
+
+# Один Environment на процесс: шаблон компилируется при первом обращении и дальше берётся из кэша.
+# auto_reload выключен — не проверяем mtime файла на каждом письме
+_environment = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=select_autoescape(["html"]),
+    auto_reload=False,
+)
+
+
+def render_email(template_name: str, context: dict) -> str:
+    return _environment.get_template(template_name).render(**context)
+
+
+@dataclass
+class OutgoingEmail:
+    id: int
+    recipient: str
+    subject: str
+    html: str
+
+
+class EmailTransport(ABC):
+    """Способ доставки писем. send_batch возвращает ошибки по id письма; отсутствие id — успех."""
+
+    @abstractmethod
+    async def send_batch(self, messages: list[OutgoingEmail]) -> dict[int, str]:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+class LoggingTransport(EmailTransport):
+    """SMTP не настроен (разработка): письма только пишутся в лог, без тела."""
+
+    async def send_batch(self, messages: list[OutgoingEmail]) -> dict[int, str]:
+        for message in messages:
+            logger.info("Письмо для %s: %s", message.recipient, message.subject)
+        return {}
+
+
+class _SMTPSlot:
+    def __init__(self):
+        self.smtp: Optional[smtplib.SMTP] = None
+
+
+class SMTPTransport(EmailTransport):
     """
-    Отправляет письмо со ссылкой для верификации на указанный email.
-    В тестах — выводит в консоль, в продакшене можно заменить на SMTP.
+    Отправка через пул из pool_size постоянных SMTP-соединений. Пачка делится между соединениями,
+    каждое отправляет свою часть в отдельном потоке (smtplib блокирующий). Соединение переиспользуется
+    между пачками и переоткрывается, если сервер его закрыл.
     """
-    verify_url = f"{base_url}/verify-email?token={token}"
-    template_dir = os.path.join(os.path.dirname(__file__), "..", "templates")
-    env = Environment(loader=FileSystemLoader(template_dir))
-    template = env.get_template("verify_email.html")
-    html_content = template.render(name=name, verify_url=verify_url)
 
-    # Логируем письмо (в продакшене — отправка через SMTP)
-    print(f" Отправка письма на: {email}")
-    print(f"--- Тема: Подтвердите ваш email ---")
-    print(f"{html_content}")
-    print(f"--- Конец письма ---\n")
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        sender: str,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        starttls: bool = False,
+        pool_size: int = 2,
+        timeout: float = 10,
+    ):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self._slots: asyncio.Queue = asyncio.Queue()
+        for _ in range(pool_size):
+            self._slots.put_nowait(_SMTPSlot())
+        self.pool_size = pool_size
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            smtp.starttls()
+        if self.username:
+            smtp.login(self.username, self.password or "")
+        return smtp
+
+    def _build(self, message: OutgoingEmail) -> EmailMessage:
+        email = EmailMessage()
+        email["From"] = self.sender
+        email["To"] = message.recipient
+        email["Subject"] = message.subject
+        email.set_content(message.html, subtype="html")
+        return email
+
+    def _send_chunk(self, slot: _SMTPSlot, messages: list[OutgoingEmail]) -> dict[int, str]:
+        errors = {}
+        for message in messages:
+            # Одна повторная попытка на свежем соединении, если старое закрыто сервером
+            for reconnect in (False, True):
+                try:
+                    if slot.smtp is None or reconnect:
+                        self._drop(slot)
+                        slot.smtp = self._connect()
+                    slot.smtp.send_message(self._build(message))
+                    break
+                except (smtplib.SMTPServerDisconnected, ConnectionError) as e:
+                    if reconnect:
+                        errors[message.id] = f"{type(e).__name__}: {e}"
+                except (smtplib.SMTPException, OSError) as e:
+                    errors[message.id] = f"{type(e).__name__}: {e}"
+                    break
+        return errors
+
+    @staticmethod
+    def _drop(slot: _SMTPSlot) -> None:
+        if slot.smtp is not None:
+            try:
+                slot.smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            slot.smtp = None
+
+    async def _send_on_slot(self, messages: list[OutgoingEmail]) -> dict[int, str]:
+        slot = await self._slots.get()
+        try:
+            return await asyncio.to_thread(self._send_chunk, slot, messages)
+        finally:
+            self._slots.put_nowait(slot)
+
+    async def send_batch(self, messages: list[OutgoingEmail]) -> dict[int, str]:
+        chunks = [messages[i::self.pool_size] for i in range(self.pool_size)]
+        results = await asyncio.gather(*(self._send_on_slot(chunk) for chunk in chunks if chunk))
+        errors = {}
+        for result in results:
+            errors.update(result)
+        return errors
+
+    async def close(self) -> None:
+        for _ in range(self.pool_size):
+            slot = await self._slots.get()
+            await asyncio.to_thread(self._drop, slot)
+            self._slots.put_nowait(slot)
 
 
-# Пример для future: асинхронная отправка (можно расширить)
 async def send_email_async(
+    transport: EmailTransport,
     email: str,
     subject: str,
     template_name: str,
     context: dict,
-    base_url: str = "http://127.0.0.1:8000"
-):
-    # В будущем: использовать aiosmtplib, FastAPI BackgroundTasks
-    pass
\ No newline at end of file
+) -> None:
+    """
+    Немедленная отправка одного письма мимо очереди (служебные сценарии, проверка SMTP).
+    Обычный путь — EmailOutboxRepository.enqueue и фоновый воркер.
+    """
+    message = OutgoingEmail(id=0, recipient=email, subject=subject, html=render_email(template_name, context))
+    errors = await transport.send_batch([message])
+    if errors:
+        raise RuntimeError(errors[0])
@@ -0,0 +1,40 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Iterable, Mapping
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def ndjson_stream(batches: AsyncIterator[Iterable[Mapping]]) -> AsyncIterator[bytes]:
+    """
+    Одна JSON-строка на запись; каждая пачка уходит клиенту одним куском.
+    """
+    async for batch in batches:
+        chunk = "".join(
+            json.dumps({key: _encode_value(value) for key, value in dict(row).items()}, ensure_ascii=False) + "\n"
+            for row in batch
+        )
+        yield chunk.encode()
+
+
+async def csv_stream(batches: AsyncIterator[Iterable[Mapping]], columns: list[str]) -> AsyncIterator[bytes]:
+    """
+    CSV с заголовком; заголовок отправляется сразу, до первого запроса к БД.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue().encode()
+
+    async for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        for row in batch:
+            writer.writerow([_encode_value(row[column]) for column in columns])
+        yield buffer.getvalue().encode()
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+from passlib.context import CryptContext
+from utils.metrics import password_hash_duration
+
+
+class PasswordHasherBusy(Exception):
+    """Очередь хеширования переполнена — запрос лучше повторить позже."""
+
+
+class PasswordHasher:
+    """
+    Выполняет операции CryptContext (Argon2) в отдельном пуле потоков ограниченного размера,
+    не блокируя event loop. argon2-cffi отпускает GIL на время вычисления, поэтому потоки
+    считают хеши параллельно, а число одновременно занятых ядер не превышает max_workers.
+    """
+
+    def __init__(self, context: CryptContext, max_workers: int, max_queue: int = 0):
+        self.context = context
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.run_seconds_total = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="password-hasher")
+        return self._executor
+
+    def _run(self, func: Callable, args: tuple, submitted_at: float):
+        started_at = time.perf_counter()
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+            self.wait_seconds_total += started_at - submitted_at
+        try:
+            return func(*args)
+        finally:
+            finished_at = time.perf_counter()
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+                self.run_seconds_total += finished_at - started_at
+                password_hash_duration.observe(finished_at - started_at, func.__name__)
+
+    async def _submit(self, func: Callable, *args):
+        with self._lock:
+            if self.max_queue and self.queued >= self.max_queue:
+                self.rejected += 1
+                raise PasswordHasherBusy("Password hashing queue is full")
+            self.queued += 1
+        future = self._get_executor().submit(self._run, func, args, time.perf_counter())
+        # Отмена ожидающего запроса (клиент отключился, таймаут) снимает задачу из очереди пула;
+        # _run для неё не вызовется, поэтому место в очереди освобождаем здесь
+        future.add_done_callback(self._release_if_cancelled)
+        return await asyncio.wrap_future(future)
+
+    def _release_if_cancelled(self, future: Future) -> None:
+        if future.cancelled():
+            with self._lock:
+                self.queued -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(self.context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._submit(self.context.verify, password, hashed_password)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queued": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "wait_seconds_total": self.wait_seconds_total,
+                "run_seconds_total": self.run_seconds_total,
+            }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -0,0 +1,194 @@
+import cProfile
+import hmac
+import io
+import marshal
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional
+from uuid import uuid4
+from starlette.datastructures import MutableHeaders
+
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_MODES = ("cprofile", "sample")
+
+
+@dataclass
+class ProfileRecord:
+    id: str
+    mode: str
+    method: str
+    path: str
+    route: Optional[str]
+    status: int
+    duration: float
+    created_at: datetime
+    # cprofile: словарь pstats (тот же, что пишет dump_stats); sample: стеки "a;b;c" -> число сэмплов
+    stats: Optional[dict] = None
+    stacks: Counter = field(default_factory=Counter)
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id, "mode": self.mode, "method": self.method, "path": self.path, "route": self.route,
+            "status": self.status, "duration_ms": self.duration * 1000, "created_at": self.created_at,
+            "samples": sum(self.stacks.values()),
+        }
+
+    def pstats_bytes(self) -> bytes:
+        # Формат файла pstats: загружается через pstats.Stats(path), snakeviz, gprof2dot
+        return marshal.dumps(self.stats)
+
+    def text(self, limit: int = 50) -> str:
+        stream = io.StringIO()
+        stats = pstats.Stats(stream=stream)
+        stats.stats = self.stats
+        stats.get_top_level_stats()
+        stats.sort_stats("cumulative").print_stats(limit)
+        return stream.getvalue()
+
+    def collapsed(self) -> str:
+        # Свёрнутые стеки для flamegraph.pl / speedscope: "корень;...;лист число"
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfileStore:
+    """Последние maxsize профилей в памяти процесса."""
+
+    def __init__(self, maxsize: int):
+        self._profiles: deque[ProfileRecord] = deque(maxlen=maxsize)
+
+    def add(self, profile: ProfileRecord) -> None:
+        self._profiles.append(profile)
+
+    def get(self, profile_id: str) -> Optional[ProfileRecord]:
+        for profile in self._profiles:
+            if profile.id == profile_id:
+                return profile
+        return None
+
+    def list(self) -> list[ProfileRecord]:
+        return list(reversed(self._profiles))
+
+    def clear(self) -> None:
+        self._profiles.clear()
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Раз в interval секунд снимает стек потока thread_id из отдельного потока. Не требует
+    трассировки каждого вызова, поэтому почти не искажает время, но видит только то, что
+    выполнялось в моменты сэмплов.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        frame = sys._current_frames().get(self.thread_id)
+        names = []
+        while frame is not None:
+            names.append(_frame_name(frame))
+            frame = frame.f_back
+        if names:
+            self.stacks[";".join(reversed(names))] += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.stacks
+
+
+class ProfilingMiddleware:
+    """
+    ASGI-middleware профилирования отдельных запросов. Запрос профилируется, если в нём заголовок
+    X-Profile с токеном (при заданном token) или он попал в долю sample_rate. Профиль сохраняется
+    в store, его id возвращается в заголовке ответа X-Profile-Id.
+
+    Профилировщик видит весь поток event loop, поэтому в профиль попадает и работа параллельных
+    запросов; одновременно профилируется не больше одного запроса. Запрос без заголовка платит
+    только за поиск заголовка и random() — и ничего, если middleware не подключён (PROFILING_ENABLED).
+    """
+
+    def __init__(self, app, store: ProfileStore, token: str = "", sample_rate: float = 0.0,
+                 mode: str = "cprofile", sample_interval: float = 0.005):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        self.app = app
+        self.store = store
+        self.token = token.encode()
+        self.sample_rate = sample_rate
+        self.mode = mode
+        self.sample_interval = sample_interval
+        self._active = False
+
+    def _requested(self, scope) -> bool:
+        if self.token:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    return hmac.compare_digest(value, self.token)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self._active or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        self._active = True
+        profile = ProfileRecord(
+            id=uuid4().hex, mode=self.mode, method=scope["method"], path=scope["path"], route=None,
+            status=500, duration=0.0, created_at=datetime.now(timezone.utc),
+        )
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                MutableHeaders(scope=message).append("X-Profile-Id", profile.id)
+            await send(message)
+
+        if self.mode == "cprofile":
+            profiler = cProfile.Profile()
+        else:
+            profiler = StackSampler(threading.get_ident(), self.sample_interval)
+        started = time.perf_counter()
+        try:
+            if self.mode == "cprofile":
+                profiler.enable()
+            else:
+                profiler.start()
+            await self.app(scope, receive, send_with_id)
+        finally:
+            if self.mode == "cprofile":
+                profiler.disable()
+                profiler.create_stats()
+                profile.stats = profiler.stats
+            else:
+                profile.stacks = profiler.stop()
+            profile.duration = time.perf_counter() - started
+            profile.route = getattr(scope.get("route"), "path", None)
+            self.store.add(profile)
+            self._active = False
@@ -0,0 +1,30 @@
+from functools import lru_cache
+from typing import Any, Optional
+from fastapi.responses import JSONResponse
+from fastapi import Response
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse с кодировщиком pydantic-core (Rust) вместо json.dumps.
+    Регистрируется как default_response_class приложения.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+
+@lru_cache(maxsize=None)
+def get_adapter(tp: Any) -> TypeAdapter:
+    # Схема сериализации строится один раз на тип, а не на каждый запрос
+    return TypeAdapter(tp)
+
+
+def model_response(tp: Any, value: Any, headers: Optional[dict] = None) -> Response:
+    """
+    Отдаёт уже провалидированные модели сразу в JSON-байты,
+    минуя повторную валидацию FastAPI по response_model и промежуточные dict.
+    """
+    return Response(content=get_adapter(tp).dump_json(value), media_type="application/json", headers=headers)
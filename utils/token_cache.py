@@ -0,0 +1,143 @@
+import hashlib
+import heapq
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class TokenCache:
+    """
+    LRU проверенных access-токенов. Ключ — дайджест токена (сам токен в памяти не держим),
+    запись живёт до exp токена, но не дольше max_ttl. Повторный запрос с тем же токеном
+    не проверяет подпись и не собирает модель пользователя заново.
+
+    Отзыв действует в пределах процесса: отозванный токен помнится до своего exp независимо
+    от maxsize, у пользователя отзываются все токены, выданные до момента отзыва. Отзыв пользователя
+    помнится token_lifetime секунд — максимальное время жизни access-токена: выданные до отзыва
+    к этому моменту уже истекли.
+    """
+
+    def __init__(self, maxsize: int, max_ttl: float, token_lifetime: float = 3600):
+        self.maxsize = maxsize
+        self.max_ttl = max_ttl
+        self.token_lifetime = token_lifetime
+        # digest -> (expires_at по monotonic, user_id, значение)
+        self._data: OrderedDict = OrderedDict()
+        self._by_user: dict[int, set[bytes]] = {}
+        # digest -> exp (unix time); user_id -> момент отзыва (unix time), в порядке отзыва.
+        # Отозванные токены не ограничены maxsize — иначе вытесненный токен снова стал бы действительным;
+        # запись удаляется только после exp, куча (exp, digest) даёт ближайшую к истечению
+        self._revoked_tokens: dict[bytes, float] = {}
+        self._revoked_expiry: list[tuple[float, bytes]] = []
+        self._revoked_users: dict[int, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.revocations = 0
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    def _drop(self, digest: bytes) -> None:
+        entry = self._data.pop(digest, None)
+        if entry is None:
+            return
+        user_tokens = self._by_user.get(entry[1])
+        if user_tokens is not None:
+            user_tokens.discard(digest)
+            if not user_tokens:
+                del self._by_user[entry[1]]
+
+    def get(self, token: str) -> Optional[Any]:
+        digest = self.digest(token)
+        entry = self._data.get(digest)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry[0] <= time.monotonic():
+            self._drop(digest)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(digest)
+        self.hits += 1
+        return entry[2]
+
+    def set(self, token: str, user_id: int, value: Any, exp: float) -> None:
+        ttl = min(exp - time.time(), self.max_ttl)
+        if self.maxsize <= 0 or ttl <= 0:
+            return
+        digest = self.digest(token)
+        self._drop(digest)
+        self._data[digest] = (time.monotonic() + ttl, user_id, value)
+        self._by_user.setdefault(user_id, set()).add(digest)
+        while len(self._data) > self.maxsize:
+            self._drop(next(iter(self._data)))
+            self.evictions += 1
+
+    def is_revoked(self, token: str, user_id: int, issued_at: Optional[float]) -> bool:
+        revoked_at = self._revoked_users.get(user_id)
+        # Токены без iat выданы до появления отзыва — при отзыве пользователя они тоже недействительны
+        if revoked_at is not None and (issued_at is None or issued_at <= revoked_at):
+            return True
+        exp = self._revoked_tokens.get(self.digest(token))
+        return exp is not None and exp > time.time()
+
+    def _purge_revoked(self) -> None:
+        now = time.time()
+        while self._revoked_expiry and self._revoked_expiry[0][0] <= now:
+            exp, digest = heapq.heappop(self._revoked_expiry)
+            if self._revoked_tokens.get(digest) == exp:
+                del self._revoked_tokens[digest]
+        # Самые старые отзывы пользователей — в начале словаря
+        for user_id, revoked_at in list(self._revoked_users.items()):
+            if revoked_at + self.token_lifetime > now:
+                break
+            del self._revoked_users[user_id]
+
+    def revoke_token(self, token: str, exp: float) -> None:
+        digest = self.digest(token)
+        self._drop(digest)
+        self._purge_revoked()
+        if exp <= time.time():
+            return
+        self._revoked_tokens[digest] = exp
+        heapq.heappush(self._revoked_expiry, (exp, digest))
+        self.revocations += 1
+
+    def revoke_user(self, user_id: int) -> None:
+        for digest in list(self._by_user.get(user_id, ())):
+            self._drop(digest)
+        self._purge_revoked()
+        # Повторный отзыв переносит пользователя в конец — порядок словаря остаётся порядком отзыва
+        self._revoked_users.pop(user_id, None)
+        self._revoked_users[user_id] = time.time()
+        self.revocations += 1
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._by_user.clear()
+        self._revoked_tokens.clear()
+        self._revoked_expiry.clear()
+        self._revoked_users.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.maxsize > 0,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "max_ttl": self.max_ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "revocations": self.revocations,
+            "revoked_tokens": len(self._revoked_tokens),
+            "revoked_users": len(self._revoked_users),
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }